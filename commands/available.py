@@ -7,11 +7,14 @@ from utils.github import get_available_versions
 console = Console()
 
 @click.command()
-def available():
+@click.option('--offline', is_flag=True, help="Show the last known listing without contacting GitHub")
+@click.option('--refresh', is_flag=True, help="Revalidate the cached listing even if it is still fresh")
+def available(offline, refresh):
     """List available versions from GitHub."""
-    console.print("Fetching available versions from GitHub...", style="cyan")
+    if not offline:
+        console.print("Fetching available versions from GitHub...", style="cyan")
     
-    versions = get_available_versions()
+    versions = get_available_versions(offline=offline, refresh=refresh)
     
     if not versions:
         console.print("No versions available or couldn't fetch from GitHub", style="yellow")
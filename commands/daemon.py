@@ -0,0 +1,124 @@
+import os
+import time
+from datetime import datetime
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from utils.installer import get_logs_dir
+from utils.process import FG_ROOT
+from utils.daemon_client import request, is_daemon_running, get_socket_path, DaemonError
+
+console = Console()
+
+# Seconds to wait for the daemon to come up or go away
+STARTUP_TIMEOUT = 10
+
+@click.group()
+def daemon():
+    """Manage the fg supervisor daemon."""
+    pass
+
+@daemon.command()
+def run():
+    """Run the daemon in the foreground."""
+    from utils.daemon import run_daemon
+
+    if not run_daemon():
+        raise SystemExit(1)
+
+@daemon.command()
+def start():
+    """Start the daemon in the background."""
+    from utils.daemon import start_daemon
+
+    if is_daemon_running():
+        console.print("Daemon is already running", style="yellow")
+        return
+
+    process = start_daemon(FG_ROOT, os.path.join(get_logs_dir(), "daemon.log"))
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if is_daemon_running():
+            console.print(f"Daemon started (PID: {process.pid})", style="bold green")
+            return
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+
+    console.print(f"[bold red]Daemon failed to start, see {os.path.join(get_logs_dir(), 'daemon.log')}[/bold red]")
+
+@daemon.command()
+def stop():
+    """Stop the daemon; running instances keep running."""
+    try:
+        result = request("shutdown")
+    except DaemonError as e:
+        console.print(f"[bold red]Error stopping daemon: {str(e)}[/bold red]")
+        return
+
+    if result is None:
+        console.print("Daemon is not running", style="yellow")
+        return
+
+    # Wait until it stopped accepting requests
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while os.path.exists(get_socket_path()) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    console.print(f"Daemon (PID: {result['pid']}) stopped", style="bold green")
+
+@daemon.command()
+def status():
+    """Show whether the daemon is running."""
+    try:
+        result = request("ping", timeout=2)
+    except DaemonError:
+        result = None
+
+    if result is None:
+        console.print("Daemon is not running", style="yellow")
+    else:
+        console.print(f"Daemon is running (PID: {result['pid']})", style="bold green")
+
+@daemon.command()
+@click.option('--version', help="Only exits of this version")
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=20, show_default=True,
+              help="Number of exits to show")
+def history(version, limit):
+    """Show exit codes and restarts of supervised instances."""
+    from utils.registry import list_exits
+
+    exits = list_exits(version, limit)
+    if not exits:
+        console.print("No recorded exits", style="yellow")
+        return
+
+    table = Table(title="Instance Exits")
+    table.add_column("PID", style="cyan")
+    table.add_column("Version", style="green")
+    table.add_column("Exit Code", style="magenta")
+    table.add_column("Started", style="blue")
+    table.add_column("Exited", style="blue")
+    table.add_column("Restarted", style="yellow")
+
+    for entry in exits:
+        code = entry['exit_code']
+        if code is None:
+            code_text = "Unknown"
+        elif code < 0:
+            code_text = f"signal {-code}"
+        else:
+            code_text = str(code)
+
+        table.add_row(
+            str(entry['pid']),
+            entry['version'],
+            code_text,
+            datetime.fromtimestamp(entry['start_time']).strftime("%Y-%m-%d %H:%M:%S"),
+            datetime.fromtimestamp(entry['end_time']).strftime("%Y-%m-%d %H:%M:%S"),
+            "Yes" if entry['restarted'] else "No"
+        )
+
+    console.print(table)
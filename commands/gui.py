@@ -1,11 +1,10 @@
-import os
-import sys
+import queue
 import threading
 import tkinter as tk
 from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
 import click
 import customtkinter as ctk
-from tkinter import StringVar, Listbox
 from rich.console import Console
 
 from utils.github import get_available_versions, download_version
@@ -15,50 +14,239 @@ from utils.installer import (
     uninstall_version, 
     is_version_installed
 )
-from utils.process import start_application, stop_application, get_process_status
-from utils.config import get_version_config
+from utils.process import start_application, stop_applications, get_process_status
 
 console = Console()
 
-# Custom listbox implementation for customtkinter
-class CustomListbox(ctk.CTkFrame):
-    def __init__(self, master, **kwargs):
+# Height of a list row before scaling
+ROW_HEIGHT = 28
+
+# Pixels scrolled per mouse wheel step
+WHEEL_STEP = ROW_HEIGHT * 3
+
+SELECTED_COLOR = ("gray70", "gray30")
+
+# Modifier bits of tkinter event.state
+SHIFT_MASK = 0x0001
+CONTROL_MASK = 0x0004
+
+# Virtualized listbox for customtkinter
+class VirtualListbox(ctk.CTkFrame):
+    """
+    Listbox that only has widgets for the rows on screen
+    
+    Items live in a plain list; a small pool of row labels is placed over
+    the visible part and relabelled on scroll, so the cost of drawing does
+    not depend on the number of items.
+    
+    Click selects, Ctrl+click toggles and Shift+click extends the selection
+    (in multiple mode). Up/Down, Page Up/Down, Home and End move the cursor,
+    with Shift extending the selection.
+    """
+    
+    def __init__(self, master, multiple=False, **kwargs):
         super().__init__(master, **kwargs)
         
-        # Create a frame for the listbox
-        self.listbox_frame = ctk.CTkFrame(self)
-        self.listbox_frame.pack(fill="both", expand=True)
-        
-        # Create a scrollable frame
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.listbox_frame)
-        self.scrollable_frame.pack(fill="both", expand=True)
-        
-        # List to store the items
+        self.multiple = multiple
         self.items = []
-        self.selected_index = None
+        self.selected = set()
+        self.cursor = None
+        self.anchor = None
         self.callback = None
         
-    def insert(self, index, item):
-        """Insert an item at the specified index"""
-        if index == "end":
-            index = len(self.items)
-            
-        # Create a button for the item
-        btn = ctk.CTkButton(
-            self.scrollable_frame, 
-            text=item,
+        # Pixels scrolled from the top, in unscaled units
+        self._offset = 0
+        self._rows = []
+        self._row_items = []
+        self._row_states = []
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", lambda event: self._render())
+        self._bind_wheel(self.body)
+        
+        # CTkFrame.bind only reaches its canvas, keys go to the focused frame itself
+        for sequence, handler in (
+            ("<Up>", lambda event: self._move_cursor(-1, event)),
+            ("<Down>", lambda event: self._move_cursor(1, event)),
+            ("<Prior>", lambda event: self._move_cursor(-self._page_size(), event)),
+            ("<Next>", lambda event: self._move_cursor(self._page_size(), event)),
+            ("<Home>", lambda event: self._move_cursor(-len(self.items), event)),
+            ("<End>", lambda event: self._move_cursor(len(self.items), event)),
+            ("<space>", self._on_space),
+            ("<Control-a>", self._on_select_all),
+        ):
+            tk.Frame.bind(self, sequence, handler)
+    
+    def _scaling(self):
+        return ctk.ScalingTracker.get_widget_scaling(self)
+    
+    def _view_height(self):
+        """Height of the visible area in unscaled units"""
+        return self.body.winfo_height() / self._scaling()
+    
+    def _page_size(self):
+        return max(1, int(self._view_height() // ROW_HEIGHT))
+    
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        # X11 reports the wheel as buttons 4 and 5
+        widget.bind("<Button-4>", lambda event: self._scroll_by(-WHEEL_STEP))
+        widget.bind("<Button-5>", lambda event: self._scroll_by(WHEEL_STEP))
+    
+    def _create_row(self, slot):
+        row = ctk.CTkLabel(
+            self.body,
+            text="",
             anchor="w",
-            fg_color="transparent",
-            text_color=("black", "white"),
-            hover_color=("gray80", "gray20"),
+            height=ROW_HEIGHT,
             corner_radius=0,
-            height=30,
-            command=lambda i=len(self.items): self.select_item(i)
+            fg_color="transparent",
+            text_color=("black", "white")
         )
-        btn.pack(fill="x", padx=2, pady=1)
+        row.bind("<Button-1>", lambda event, slot=slot: self._on_click(slot, event))
+        self._bind_wheel(row)
+        self._rows.append(row)
+        self._row_items.append(None)
+        self._row_states.append(None)
+    
+    def _render(self):
+        """Show the items in view on the row pool"""
+        height = self._view_height()
+        total = len(self.items) * ROW_HEIGHT
+        self._offset = max(0, min(self._offset, total - height))
+        
+        first = int(self._offset // ROW_HEIGHT)
+        shift = self._offset - first * ROW_HEIGHT
+        visible = int(height // ROW_HEIGHT) + 2
+        
+        while len(self._rows) < visible:
+            self._create_row(len(self._rows))
+        
+        for slot, row in enumerate(self._rows):
+            index = first + slot
+            if slot >= visible or index >= len(self.items):
+                if self._row_items[slot] is not None:
+                    row.place_forget()
+                    self._row_items[slot] = None
+                    self._row_states[slot] = None
+                continue
+            
+            # Only touch widgets whose content changed
+            state = (self.items[index], index in self.selected)
+            if self._row_states[slot] != state:
+                row.configure(text=state[0], fg_color=SELECTED_COLOR if state[1] else "transparent")
+                self._row_states[slot] = state
+            row.place(x=0, y=slot * ROW_HEIGHT - shift, relwidth=1.0)
+            self._row_items[slot] = index
+        
+        if total > height:
+            self.scrollbar.set(self._offset / total, (self._offset + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _scroll_by(self, pixels):
+        self._offset += pixels
+        self._render()
+    
+    def _on_wheel(self, event):
+        self._scroll_by(-WHEEL_STEP if event.delta > 0 else WHEEL_STEP)
+    
+    def _on_scrollbar(self, action, value, units=None):
+        if action == "moveto":
+            self._offset = float(value) * len(self.items) * ROW_HEIGHT
+            self._render()
+        elif action == "scroll":
+            step = self._page_size() * ROW_HEIGHT if units == "pages" else ROW_HEIGHT
+            self._scroll_by(float(value) * step)
+    
+    def see(self, index):
+        """Scroll so an item is visible"""
+        top = index * ROW_HEIGHT
+        if top < self._offset:
+            self._offset = top
+        elif top + ROW_HEIGHT > self._offset + self._view_height():
+            self._offset = top + ROW_HEIGHT - self._view_height()
+        self._render()
+    
+    def _notify(self):
+        if self.callback and self.cursor is not None:
+            self.callback(self.items[self.cursor])
+    
+    def _select(self, index, toggle=False, extend=False):
+        """Update the selection for a click or key press on an item"""
+        if self.multiple and extend and self.anchor is not None:
+            low, high = sorted((self.anchor, index))
+            self.selected = set(range(low, high + 1))
+        elif self.multiple and toggle:
+            self.selected ^= {index}
+            self.anchor = index
+        else:
+            self.selected = {index}
+            self.anchor = index
+        self.cursor = index
+        self.see(index)
+        self._notify()
+    
+    def _on_click(self, slot, event):
+        index = self._row_items[slot]
+        if index is None:
+            return
+        self.focus_set()
+        self._select(index, toggle=bool(event.state & CONTROL_MASK), extend=bool(event.state & SHIFT_MASK))
+    
+    def _move_cursor(self, delta, event):
+        if not self.items:
+            return "break"
+        index = 0 if self.cursor is None else max(0, min(len(self.items) - 1, self.cursor + delta))
+        self._select(index, extend=bool(event.state & SHIFT_MASK))
+        return "break"
+    
+    def _on_space(self, event):
+        if self.cursor is not None:
+            self._select(self.cursor, toggle=True)
+        return "break"
+    
+    def _on_select_all(self, event):
+        if self.multiple:
+            self.selected = set(range(len(self.items)))
+            self._render()
+        return "break"
+    
+    def set_items(self, items):
+        """
+        Replace all items, keeping the selection of items that are still there
+        
+        Nothing is redrawn if the items did not change, and otherwise only
+        rows on screen whose text or selection changed are reconfigured.
+        
+        Args:
+            items (iterable): Item texts
+        """
+        items = list(items)
+        if items == self.items:
+            return
+        
+        selected = {self.items[i] for i in self.selected}
+        cursor = self.items[self.cursor] if self.cursor is not None else None
         
-        # Add the item to the list
-        self.items.append({"text": item, "button": btn})
+        self.items = items
+        self.selected = {i for i, item in enumerate(self.items) if item in selected}
+        positions = {item: i for i, item in enumerate(self.items)}
+        self.cursor = positions.get(cursor)
+        self.anchor = self.cursor
+        self._render()
+    
+    def insert(self, index, item):
+        """Insert an item at the specified index"""
+        if index == "end":
+            index = len(self.items)
+        self.items.insert(index, item)
+        self.selected = {i + 1 if i >= index else i for i in self.selected}
+        self._render()
     
     def delete(self, start, end=None):
         """Delete items from start to end"""
@@ -66,59 +254,161 @@ class CustomListbox(ctk.CTkFrame):
             end = len(self.items)
         elif end is None:
             end = start + 1
-            
-        # Remove the buttons
-        for i in range(start, end):
-            if i < len(self.items):
-                self.items[i]["button"].destroy()
-        
-        # Remove the items from the list
-        self.items = self.items[:start] + self.items[end:]
-        self.selected_index = None
-    
-    def select_item(self, index):
-        """Select an item"""
-        # Deselect the previously selected item
-        if self.selected_index is not None and self.selected_index < len(self.items):
-            self.items[self.selected_index]["button"].configure(
-                fg_color="transparent"
-            )
-        
-        # Select the new item
-        self.selected_index = index
-        self.items[index]["button"].configure(
-            fg_color=("gray70", "gray30")
-        )
         
-        # Call the callback
-        if self.callback:
-            self.callback(self.items[index]["text"])
+        del self.items[start:end]
+        self.selected = set()
+        self.cursor = None
+        self.anchor = None
+        self._render()
     
-    def bind(self, sequence, func, add=None):
+    def bind(self, sequence=None, command=None, add=True):
         """Bind an event to the listbox"""
-        # We only care about the command binding
+        # Selection changes are reported through the callback
         if sequence == "<<ListboxSelect>>":
-            self.callback = func
+            self.callback = command
+        else:
+            super().bind(sequence, command, add)
     
     def get(self, index=None):
-        """Get the selected item or item at index"""
+        """Get the item under the cursor or item at index"""
         if index is not None:
             if 0 <= index < len(self.items):
-                return self.items[index]["text"]
+                return self.items[index]
             return None
         
-        if self.selected_index is not None and 0 <= self.selected_index < len(self.items):
-            return self.items[self.selected_index]["text"]
-        
+        if self.cursor is not None and self.cursor in self.selected:
+            return self.items[self.cursor]
+        if self.selected:
+            return self.items[min(self.selected)]
         return None
     
+    def get_selected(self):
+        """Get all selected items"""
+        return [self.items[i] for i in sorted(self.selected)]
+    
     def configure(self, **kwargs):
         """Configure the listbox"""
         if "command" in kwargs:
-            self.callback = kwargs["command"]
+            self.callback = kwargs.pop("command")
         
         super().configure(**kwargs)
 
+# Worker threads for GUI actions
+TASK_WORKERS = 4
+
+# Milliseconds between checks for finished tasks, about one frame at 60 fps
+TASK_POLL_MS = 16
+
+# Milliseconds between background refreshes of the running instances
+RUNNING_POLL_MS = 2000
+
+class Task:
+    """Handle of an action queued on a TaskQueue"""
+    
+    def __init__(self, key):
+        self.key = key
+        self.future = None
+        self._cancelled = threading.Event()
+    
+    @property
+    def cancelled(self):
+        """Whether the task was cancelled; long actions check this between steps"""
+        return self._cancelled.is_set()
+    
+    def cancel(self):
+        """Cancel the task; a task that already started runs on but its result is dropped"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+class TaskQueue:
+    """
+    Runs blocking work on a worker pool and hands the results to the Tk thread
+    
+    Tkinter may only be used from the thread running the main loop, so
+    workers never touch widgets: finished tasks go on a queue that the main
+    loop drains every frame, and their callbacks run there. Submitting a
+    task with the key of a pending one cancels the pending one.
+    """
+    
+    def __init__(self, widget, workers=TASK_WORKERS):
+        self.widget = widget
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fg-gui")
+        self.results = queue.Queue()
+        self.pending = {}
+        self.closed = False
+        self.widget.after(TASK_POLL_MS, self._drain)
+    
+    def submit(self, key, function, *args, on_done=None, on_error=None):
+        """
+        Run function(task, *args) on a worker
+        
+        Args:
+            key (str): Identifies the action, None for actions that may run side by side
+            function (callable): Blocking work, gets the Task as first argument
+            on_done (callable, optional): Called on the Tk thread with the result
+            on_error (callable, optional): Called on the Tk thread with the exception
+        
+        Returns:
+            Task: Handle of the queued task
+        """
+        task = Task(key)
+        if key is None:
+            task.key = task
+        else:
+            self.cancel(key)
+        
+        self.pending[task.key] = task
+        task.future = self.executor.submit(self._run, task, function, args, on_done, on_error)
+        return task
+    
+    def _run(self, task, function, args, on_done, on_error):
+        if task.cancelled:
+            return
+        try:
+            result = function(task, *args)
+        except Exception as e:
+            self.results.put((task, on_error, e))
+        else:
+            self.results.put((task, on_done, result))
+    
+    def _drain(self):
+        """Run the callbacks of finished tasks, on the Tk thread"""
+        while True:
+            try:
+                task, callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            
+            if self.pending.get(task.key) is task:
+                del self.pending[task.key]
+            if task.cancelled:
+                continue
+            if callback is not None:
+                callback(value)
+            elif isinstance(value, Exception):
+                console.print(f"[bold red]Error in background task: {str(value)}[/bold red]")
+        
+        if not self.closed:
+            self.widget.after(TASK_POLL_MS, self._drain)
+    
+    def is_pending(self, key):
+        """Whether an action with this key is queued or running"""
+        return key in self.pending
+    
+    def cancel(self, key):
+        """Cancel the pending action with this key, if any"""
+        task = self.pending.pop(key, None)
+        if task is not None:
+            task.cancel()
+    
+    def shutdown(self):
+        """Cancel everything and stop the workers without waiting for them"""
+        self.closed = True
+        for key in list(self.pending):
+            self.cancel(key)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 class FgGui(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -150,11 +440,17 @@ class FgGui(ctk.CTk):
         self.installed_versions = []
         self.running_processes = []
         
-        # Status message label
-        self.status_text = None
+        # Status bar, shown while actions run
+        self.setup_status_bar()
+        self.activities = {}
+        
+        # Blocking work runs on workers so the window stays responsive
+        self.tasks = TaskQueue(self)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Initial data load
         self.refresh_data()
+        self.after(RUNNING_POLL_MS, self._poll_running)
     
     def setup_versions_tab(self):
         """Set up the versions tab UI"""
@@ -168,7 +464,7 @@ class FgGui(ctk.CTk):
         # Available versions list (left side)
         ctk.CTkLabel(frame_left, text="Available Versions", font=("Arial", 16, "bold")).pack(pady=5)
         
-        self.available_listbox = CustomListbox(frame_left)
+        self.available_listbox = VirtualListbox(frame_left)
         self.available_listbox.pack(fill="both", expand=True, padx=10, pady=10)
         
         btn_install = ctk.CTkButton(frame_left, text="Install Selected", command=self.install_selected)
@@ -180,7 +476,7 @@ class FgGui(ctk.CTk):
         # Installed versions list (right side)
         ctk.CTkLabel(frame_right, text="Installed Versions", font=("Arial", 16, "bold")).pack(pady=5)
         
-        self.installed_listbox = CustomListbox(frame_right)
+        self.installed_listbox = VirtualListbox(frame_right)
         self.installed_listbox.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Buttons for installed versions
@@ -202,7 +498,7 @@ class FgGui(ctk.CTk):
         # Running processes list
         ctk.CTkLabel(frame, text="Running Instances", font=("Arial", 16, "bold")).pack(pady=5)
         
-        self.running_listbox = CustomListbox(frame)
+        self.running_listbox = VirtualListbox(frame, multiple=True)
         self.running_listbox.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Buttons for running instances
@@ -215,84 +511,133 @@ class FgGui(ctk.CTk):
         btn_refresh_running = ctk.CTkButton(btn_frame, text="Refresh", command=self.refresh_running)
         btn_refresh_running.pack(side="right", padx=5, expand=True, fill="x")
     
+    def setup_status_bar(self):
+        """Set up the status bar with a button cancelling running actions"""
+        self.status_frame = ctk.CTkFrame(self)
+        
+        self.status_text = ctk.CTkLabel(self.status_frame, text="", font=("Arial", 12), anchor="w")
+        self.status_text.pack(side="left", fill="x", expand=True, padx=10, pady=5)
+        
+        btn_cancel = ctk.CTkButton(self.status_frame, text="Cancel", width=80, command=self.cancel_actions)
+        btn_cancel.pack(side="right", padx=10, pady=5)
+    
     def set_status(self, message):
         """Set or update status message"""
-        # Remove existing status if any
-        self.clear_status()
-        
-        # Create new status label
-        self.status_text = ctk.CTkLabel(self, text=message, font=("Arial", 12))
-        self.status_text.pack(side="bottom", fill="x", padx=10, pady=5)
-        self.update_idletasks()
+        self.status_text.configure(text=message)
+        if not self.status_frame.winfo_ismapped():
+            self.status_frame.pack(side="bottom", fill="x", padx=10, pady=5)
     
     def clear_status(self):
         """Clear the status message"""
-        if self.status_text is not None:
-            self.status_text.destroy()
-            self.status_text = None
-            self.update_idletasks()
+        self.status_text.configure(text="")
+        self.status_frame.pack_forget()
+    
+    def _update_status(self):
+        """Show the most recent running action in the status bar"""
+        if not self.activities:
+            self.clear_status()
+            return
+        
+        message = list(self.activities.values())[-1]
+        if len(self.activities) > 1:
+            message += f" (+{len(self.activities) - 1} more)"
+        self.set_status(message)
+    
+    def run_action(self, key, message, function, *args, on_done=None):
+        """
+        Run a blocking action in the background, showing it in the status bar
+        
+        Args:
+            key (str): Identifies the action; starting it again cancels the previous run.
+                None for actions that may run side by side
+            message (str): Status message while it runs
+            function (callable): Blocking work, gets the Task as first argument
+            on_done (callable, optional): Called on the Tk thread with the result
+        """
+        task = None
+        
+        def finish(callback, value):
+            self.activities.pop(task, None)
+            self._update_status()
+            if callback is not None:
+                callback(value)
+        
+        def fail(error):
+            self.show_message("Error", f"{message.rstrip('.')} failed: {str(error)}")
+        
+        task = self.tasks.submit(
+            key, function, *args,
+            on_done=lambda value: finish(on_done, value),
+            on_error=lambda error: finish(fail, error)
+        )
+        
+        # Activities are tracked per task, a run this one replaced goes away
+        for other in [other for other in self.activities if other.key == task.key]:
+            del self.activities[other]
+        self.activities[task] = message
+        self._update_status()
+    
+    def cancel_actions(self):
+        """Cancel every action shown in the status bar"""
+        for task in list(self.activities):
+            self.tasks.cancel(task.key)
+        self.activities.clear()
+        self._update_status()
+    
+    def on_close(self):
+        """Stop background work and close the window"""
+        self.tasks.shutdown()
+        self.destroy()
     
     def refresh_data(self):
         """Refresh data from GitHub and local installations"""
-        # Show loading status
-        self.set_status("Loading data...")
-        
-        # Start a thread to fetch data
-        threading.Thread(target=self._fetch_data, daemon=True).start()
+        self.run_action("refresh", "Loading data...", self._fetch_data, on_done=self._update_ui_with_data)
     
-    def _fetch_data(self):
+    def _fetch_data(self, task):
         """Fetch data in a background thread"""
-        # Get available versions
-        self.available_versions = get_available_versions()
-        
-        # Get installed versions
-        self.installed_versions = get_installed_versions()
-        
-        # Get running processes
-        self.running_processes = get_process_status()
-        
-        # Update UI
-        self.after(100, self._update_ui_with_data)
+        available_versions = get_available_versions()
+        if task.cancelled:
+            return None
+        return available_versions, get_installed_versions(), get_process_status()
     
-    def _update_ui_with_data(self):
+    def _update_ui_with_data(self, data):
         """Update the UI with fetched data"""
+        if data is None:
+            return
+        self.available_versions, self.installed_versions, running_processes = data
+        
         # Update available versions listbox
-        self.available_listbox.delete(0, "end")
-        for version_info in self.available_versions:
-            self.available_listbox.insert("end", version_info['version'])
+        self.available_listbox.set_items(version_info['version'] for version_info in self.available_versions)
         
         # Update installed versions listbox
-        self.installed_listbox.delete(0, "end")
-        for version in self.installed_versions:
-            self.installed_listbox.insert("end", version)
+        self.installed_listbox.set_items(self.installed_versions)
         
         # Update running processes listbox
-        self.refresh_running()
-        
-        # Clear status
-        self.clear_status()
+        self._show_running(running_processes)
     
-    def refresh_running(self):
-        """Refresh the list of running processes"""
-        self.running_processes = get_process_status()
-        self.running_listbox.delete(0, "end")
+    def _show_running(self, processes):
+        """Show running processes; only rows whose text changed are redrawn"""
+        self.running_processes = processes
         
+        items = []
         for proc in self.running_processes:
             status = "Running" if proc.get('running', False) else "Stopped"
-            display_text = f"PID: {proc['pid']} - Version: {proc['version']} - {status}"
-            self.running_listbox.insert("end", display_text)
+            items.append(f"PID: {proc['pid']} - Version: {proc['version']} - {status}")
+        self.running_listbox.set_items(items)
     
-    def on_available_select(self, selected_item):
-        """Handle selection of an available version"""
-        pass
-    
-    def on_installed_select(self, selected_item):
-        """Handle selection of an installed version"""
-        pass
+    def refresh_running(self):
+        """Refresh the list of running processes in the background"""
+        # A newer refresh replaces one that is still running
+        self.tasks.submit("running", lambda task: get_process_status(), on_done=self._show_running)
     
-    def on_running_select(self, selected_item):
-        """Handle selection of a running process"""
-        pass
+    def _poll_running(self):
+        """Periodically refresh the running processes"""
+        if self.tasks.closed:
+            return
+        # Skip a beat rather than queue up behind a slow status call
+        if not self.tasks.is_pending("running"):
+            self.refresh_running()
+        self.after(RUNNING_POLL_MS, self._poll_running)
     
     def install_selected(self):
         """Install the selected version"""
@@ -309,38 +654,30 @@ class FgGui(ctk.CTk):
             if not self.ask_confirmation(f"Version {version} is already installed. Reinstall?"):
                 return
         
-        # Download and install
-        self.set_status(f"Installing {version}...")
-        
-        # Install in a background thread
-        threading.Thread(target=self._install_version, args=(version,), daemon=True).start()
+        # Download and install in the background
+        self.run_action(f"install:{version}", f"Installing {version}...", self._install_version, version,
+                        on_done=lambda result: self._finish_installation(version, result))
     
-    def _install_version(self, version):
+    def _install_version(self, task, version):
         """Install a version in a background thread"""
         zip_path = download_version(version)
         
         if not zip_path:
-            self.after(100, lambda: self._handle_failed_download(version))
-            return
+            return "download failed"
         
-        success = install_from_zip(zip_path, version)
+        # Cancelling between the steps leaves the downloaded zip for next time
+        if task.cancelled:
+            return None
         
-        # Update UI
-        self.after(100, lambda: self._finish_installation(version, success))
+        return "installed" if install_from_zip(zip_path, version) else "install failed"
     
-    def _handle_failed_download(self, version):
-        """Handle failed download"""
-        self.clear_status()
-        self.show_message("Error", f"Failed to download version {version}")
-    
-    def _finish_installation(self, version, success):
+    def _finish_installation(self, version, result):
         """Handle installation completion"""
-        # Clear the status message first
-        self.clear_status()
-        
         # Show success/error message
-        if success:
+        if result == "installed":
             self.show_message("Success", f"Version {version} installed successfully")
+        elif result == "download failed":
+            self.show_message("Error", f"Failed to download version {version}")
         else:
             self.show_message("Error", f"Failed to install version {version}")
         
@@ -354,9 +691,12 @@ class FgGui(ctk.CTk):
             self.show_message("Error", "Please select a version to start")
             return
         
-        # Start the application
-        pid = start_application(selection)
-        
+        # Start the application in the background
+        self.run_action(None, f"Starting {selection}...", lambda task: start_application(selection),
+                        on_done=self._finish_start)
+    
+    def _finish_start(self, pid):
+        """Handle application start"""
         if pid:
             self.show_message("Success", f"Application started successfully. PID: {pid}")
             self.refresh_running()
@@ -364,23 +704,31 @@ class FgGui(ctk.CTk):
             self.show_message("Error", "Failed to start the application")
     
     def stop_selected(self):
-        """Stop the selected process"""
-        selection = self.running_listbox.get()
+        """Stop the selected processes"""
+        selection = self.running_listbox.get_selected()
         if not selection:
             self.show_message("Error", "Please select a process to stop")
             return
         
-        # Extract PID from the selection text
-        pid = selection.split(" - ")[0].replace("PID: ", "")
+        # Extract PIDs from the selection text
+        pids = [int(item.split(" - ")[0].replace("PID: ", "")) for item in selection]
         
-        # Stop the process
-        success = stop_application(pid)
+        # Stop all of them at once, in the background
+        self.run_action(None, f"Stopping {len(pids)} process(es)...", lambda task: stop_applications(pids),
+                        on_done=lambda result: self._finish_stop(pids, result))
+    
+    def _finish_stop(self, pids, result):
+        """Handle stop completion"""
+        failed = result['failed'] + result['unknown']
         
-        if success:
-            self.show_message("Success", f"Application (PID: {pid}) stopped successfully")
-            self.refresh_running()
+        self.refresh_running()
+        if not failed:
+            if len(pids) == 1:
+                self.show_message("Success", f"Application (PID: {pids[0]}) stopped successfully")
+            else:
+                self.show_message("Success", f"{len(pids)} applications stopped successfully")
         else:
-            self.show_message("Error", f"Failed to stop process {pid}")
+            self.show_message("Error", f"Failed to stop process(es) {', '.join(map(str, failed))}")
     
     def uninstall_selected(self):
         """Uninstall the selected version"""
@@ -393,14 +741,18 @@ class FgGui(ctk.CTk):
         if not self.ask_confirmation(f"Are you sure you want to uninstall version {selection}?"):
             return
         
-        # Uninstall the version
-        success = uninstall_version(selection)
-        
+        # Uninstall the version in the background
+        self.run_action(f"uninstall:{selection}", f"Uninstalling {selection}...",
+                        lambda task: uninstall_version(selection),
+                        on_done=lambda success: self._finish_uninstall(selection, success))
+    
+    def _finish_uninstall(self, version, success):
+        """Handle uninstall completion"""
         if success:
-            self.show_message("Success", f"Version {selection} uninstalled successfully")
+            self.show_message("Success", f"Version {version} uninstalled successfully")
             self.refresh_data()
         else:
-            self.show_message("Error", f"Failed to uninstall version {selection}")
+            self.show_message("Error", f"Failed to uninstall version {version}")
     
     def show_message(self, title, message):
         """Show a message dialog"""
@@ -1,15 +1,43 @@
 import click
 from rich.console import Console
 
-from utils.github import download_version
+from utils.github import download_version, get_available_versions
 from utils.installer import install_from_zip, is_version_installed
+from utils.downloader import DEFAULT_JOBS
+from utils.pipeline import DEFAULT_DOWNLOAD_JOBS, DEFAULT_EXTRACT_JOBS, install_versions
 
 console = Console()
 
 @click.command()
-@click.argument('version')
-def install(version):
-    """Install a specific version."""
+@click.argument('versions', nargs=-1)
+@click.option('--all-missing', is_flag=True, help="Install every available version that is not installed")
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=DEFAULT_JOBS, show_default=True,
+              help="Number of parallel dependency downloads")
+@click.option('--download-jobs', type=click.IntRange(min=1), default=DEFAULT_DOWNLOAD_JOBS, show_default=True,
+              help="Number of versions downloaded at once")
+@click.option('--extract-jobs', type=click.IntRange(min=1), default=DEFAULT_EXTRACT_JOBS, show_default=True,
+              help="Number of versions extracted at once")
+@click.option('--incremental', is_flag=True,
+              help="Link files that already exist in installed versions instead of extracting them")
+def install(versions, all_missing, jobs, download_jobs, extract_jobs, incremental):
+    """Install one or more versions."""
+    if all_missing:
+        available = get_available_versions()
+        if not available:
+            console.print("Failed to fetch versions from GitHub", style="bold red")
+            return
+        versions = [info['version'] for info in available if not is_version_installed(info['version'])]
+        if not versions:
+            console.print("All available versions are installed", style="green")
+            return
+    elif not versions:
+        raise click.UsageError("Give at least one version, or --all-missing")
+    
+    if len(versions) > 1:
+        install_many(list(versions), jobs, download_jobs, extract_jobs, incremental)
+        return
+    
+    version = versions[0]
     if is_version_installed(version):
         console.print(f"Version {version} is already installed", style="yellow")
         if click.confirm("Do you want to reinstall?", default=False):
@@ -26,9 +54,35 @@ def install(version):
         return
     
     # Install from the zip file
-    success = install_from_zip(zip_path, version)
+    success = install_from_zip(zip_path, version, jobs=jobs, incremental=incremental)
     
     if success:
         console.print(f"Version {version} installed successfully", style="bold green")
     else:
-        console.print(f"Failed to install version {version}", style="bold red") 
\ No newline at end of file
+        console.print(f"Failed to install version {version}", style="bold red")
+
+def install_many(versions, jobs, download_jobs, extract_jobs, incremental):
+    """Install several versions with the pipelined installer"""
+    installed = [version for version in versions if is_version_installed(version)]
+    if installed:
+        console.print(f"Already installed: {', '.join(installed)}", style="yellow")
+        if not click.confirm("Do you want to reinstall them?", default=False):
+            versions = [version for version in versions if version not in installed]
+            if not versions:
+                return
+    
+    console.print(f"Installing {len(versions)} version(s)...", style="cyan")
+    summary = install_versions(versions, jobs, download_jobs, extract_jobs, incremental)
+    
+    artifacts = summary['artifacts']
+    console.print(f"Dependencies: {artifacts['downloaded']} downloaded, {artifacts['cached']} from the "
+                  f"shared cache, {artifacts['shared']} shared between versions")
+    for version, jar_name, error in artifacts['failed']:
+        console.print(f"[red]  {version}: {jar_name}: {error}[/red]")
+    
+    if summary['installed']:
+        console.print(f"Installed {', '.join(summary['installed'])} in {summary['elapsed']:.1f}s",
+                      style="bold green")
+    if summary['failed']:
+        console.print(f"Failed to install {', '.join(summary['failed'])}", style="bold red")
+        raise SystemExit(1)
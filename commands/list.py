@@ -1,16 +1,21 @@
 import os
+from datetime import datetime
+
 import click
 from rich.console import Console
 from rich.table import Table
 
-from utils.installer import get_installed_versions, get_versions_dir
+from utils.installer import load_index, get_versions_dir
+from utils.downloader import format_size
 
 console = Console()
 
 @click.command()
-def list_installed():
+@click.option('--verbose', '-v', is_flag=True, help="Show install time, size, dependencies and checksums")
+def list_installed(verbose):
     """List installed versions."""
-    versions = get_installed_versions()
+    index = load_index()
+    versions = sorted(index)
     
     if not versions:
         console.print("No versions installed", style="yellow")
@@ -19,10 +24,29 @@ def list_installed():
     # Create a table to display installed versions
     table = Table(title="Installed Versions")
     table.add_column("Version", style="cyan")
+    if verbose:
+        table.add_column("Installed", style="blue")
+        table.add_column("Size", style="yellow")
+        table.add_column("Dependencies", style="magenta")
+        table.add_column("Manifest SHA-256", style="white")
+        table.add_column("Main Jar SHA-256", style="white")
     table.add_column("Location", style="green")
     
     for version in versions:
         version_dir = os.path.join(get_versions_dir(), version)
-        table.add_row(version, version_dir)
+        if not verbose:
+            table.add_row(version, version_dir)
+            continue
+        
+        entry = index[version]
+        table.add_row(
+            version,
+            datetime.fromtimestamp(entry['installed_at']).strftime("%Y-%m-%d %H:%M:%S"),
+            format_size(entry['size']),
+            str(entry['dependencies']),
+            entry['manifest_sha256'][:12],
+            entry['main_jar_sha256'][:12] if entry['main_jar_sha256'] else "N/A",
+            version_dir
+        )
     
     console.print(table) 
\ No newline at end of file
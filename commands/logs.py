@@ -1,21 +1,126 @@
+import os
+import re
+import sys
 import click
 from rich.console import Console
 from rich.syntax import Syntax
 
-from utils.process import get_logs
+from utils.process import get_logs, get_log_file
+from utils.logtail import tail_log, follow, copy_to_stdout, get_log_segments
+from utils.logsearch import DEFAULT_SEARCH_JOBS, parse_time, find_log_files, search_logs
 
 console = Console()
 
-@click.command()
+# Output larger than this is written plainly, syntax highlighting it is too slow
+PLAIN_OUTPUT_THRESHOLD = 1024 * 1024
+
+# Lines shown before following when --tail is not given
+FOLLOW_DEFAULT_TAIL = 10
+
+class DefaultCommandGroup(click.Group):
+    """Group that runs a default subcommand when the first argument is not a subcommand"""
+    
+    def __init__(self, *args, default_command=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+    
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+@click.group(cls=DefaultCommandGroup, default_command="show")
+def logs():
+    """View or search application logs."""
+
+@logs.command()
 @click.argument('pid')
 @click.option('--tail', '-t', type=int, help="Number of lines to show from the end")
-def logs(pid, tail):
-    """View logs for a specific process."""
+@click.option('--follow', '-f', is_flag=True, help="Keep streaming new log lines")
+@click.option('--plain', is_flag=True, help="Print without syntax highlighting (fast for large logs)")
+def show(pid, tail, follow, plain):
+    """View logs for a specific process (default)."""
+    log_file, error = get_log_file(pid)
+    if error:
+        console.print(error, style="yellow")
+        return
+    
+    if follow:
+        follow_logs(log_file, FOLLOW_DEFAULT_TAIL if tail is None else tail)
+        return
+    
+    size = sum(os.path.getsize(segment) for segment in get_log_segments(log_file))
+    if plain or (not tail and size > PLAIN_OUTPUT_THRESHOLD):
+        if tail:
+            sys.stdout.write(tail_log(log_file, tail))
+            sys.stdout.flush()
+        else:
+            copy_to_stdout(log_file)
+        return
+    
     log_content = get_logs(pid, tail)
     
     if log_content.startswith("No logs") or log_content.startswith("Log file not found") or log_content.startswith("Error"):
         console.print(log_content, style="yellow")
+    elif len(log_content) > PLAIN_OUTPUT_THRESHOLD:
+        sys.stdout.write(log_content)
     else:
         # Display logs with syntax highlighting
         syntax = Syntax(log_content, "text", theme="monokai", line_numbers=True)
-        console.print(syntax) 
\ No newline at end of file
+        console.print(syntax)
+
+def follow_logs(log_file, tail):
+    """Print the last lines of a log and then stream appended lines"""
+    if tail:
+        sys.stdout.write(tail_log(log_file, tail))
+        sys.stdout.flush()
+    
+    try:
+        for line in follow(log_file):
+            sys.stdout.write(line)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+
+def parse_time_option(ctx, param, value):
+    """Click callback parsing --since/--until"""
+    if value is None:
+        return None
+    try:
+        return parse_time(value)
+    except ValueError:
+        raise click.BadParameter("use a duration like 30m, 2h, 7d or a date like 2024-05-01T12:00:00")
+
+@logs.command()
+@click.argument('pattern')
+@click.option('--version', 'version', help="Only search logs of this version")
+@click.option('--pid', help="Only search logs of this process")
+@click.option('--since', callback=parse_time_option, help="Only lines at or after this time (e.g. 2h, 2024-05-01)")
+@click.option('--until', callback=parse_time_option, help="Only lines at or before this time")
+@click.option('--ignore-case', '-i', is_flag=True, help="Case-insensitive matching")
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=DEFAULT_SEARCH_JOBS, show_default=True,
+              help="Number of files searched in parallel")
+def grep(pattern, version, pid, since, until, ignore_case, jobs):
+    """Search all logs for a regular expression."""
+    log_file = None
+    if pid:
+        log_file, error = get_log_file(pid)
+        if error:
+            console.print(error, style="yellow")
+            return
+    
+    files = find_log_files(version=version, log_file=log_file, since=since, until=until)
+    if not files:
+        console.print("No log files to search", style="yellow")
+        return
+    
+    try:
+        matches = search_logs(pattern, files, since=since, until=until,
+                              ignore_case=ignore_case, jobs=jobs)
+        for path, line in matches:
+            sys.stdout.write(f"{os.path.basename(path)}: {line}\n")
+        sys.stdout.flush()
+    except re.error as e:
+        console.print(f"Invalid pattern: {str(e)}", style="bold red")
+    except KeyboardInterrupt:
+        pass
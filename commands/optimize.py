@@ -0,0 +1,46 @@
+import os
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from utils.installer import is_version_installed, get_versions_dir
+from utils.optimize import optimize_version, DEFAULT_TRAINING_DURATION
+
+console = Console()
+
+@click.command()
+@click.argument('version')
+@click.option('--duration', type=click.FloatRange(min=0), default=DEFAULT_TRAINING_DURATION, show_default=True,
+              help="Seconds the training run keeps going after it became ready")
+@click.option('--measure/--no-measure', default=True, show_default=True,
+              help="Measure startup time without and with the archive")
+@click.option('--remove', is_flag=True, help="Delete the archive instead of creating one")
+def optimize(version, duration, measure, remove):
+    """Create a class data sharing archive to speed up startup."""
+    if not is_version_installed(version):
+        console.print(f"Version {version} is not installed", style="bold red")
+        return
+    
+    if remove:
+        from utils.appcds import remove_archive
+        
+        remove_archive(os.path.join(get_versions_dir(), version))
+        console.print(f"Archive of version {version} removed", style="bold green")
+        return
+    
+    timings = optimize_version(version, duration, measure)
+    if timings is None:
+        console.print(f"Failed to optimize version {version}", style="bold red")
+        return
+    
+    console.print(f"Archive created for version {version}", style="bold green")
+    
+    if 'before' in timings and 'after' in timings:
+        table = Table(title="Startup Time")
+        table.add_column("Without Archive", style="yellow")
+        table.add_column("With Archive", style="green")
+        table.add_column("Speedup", style="cyan")
+        speedup = timings['before'] / timings['after'] if timings['after'] else 0
+        table.add_row(f"{timings['before']:.2f}s", f"{timings['after']:.2f}s", f"{speedup:.2f}x")
+        console.print(table)
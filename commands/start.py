@@ -1,5 +1,6 @@
 import click
 from rich.console import Console
+from rich.table import Table
 
 from utils.process import start_application
 from utils.installer import is_version_installed, get_installed_versions
@@ -8,7 +9,12 @@ console = Console()
 
 @click.command()
 @click.argument('version', required=False)
-def start(version):
+@click.option('--replicas', '-r', type=click.IntRange(min=1), default=1, show_default=True,
+              help="Number of instances to start concurrently")
+@click.option('--wait/--no-wait', default=True, show_default=True,
+              help="Wait for the readiness probe defined in the manifest")
+@click.option('--timeout', type=click.FloatRange(min=0), help="Seconds each replica gets to become ready")
+def start(version, replicas, wait, timeout):
     """Start an application."""
     installed_versions = get_installed_versions()
     
@@ -27,10 +33,62 @@ def start(version):
         console.print("Use 'fg install {version}' to install it", style="yellow")
         return
     
+    from utils.replicas import load_manifest
+    
+    manifest = load_manifest(version)
+    if replicas > 1 or 'replicas' in manifest or (wait and 'readiness' in manifest):
+        start_fleet(version, replicas, wait, timeout)
+        return
+    
     # Start the application
     pid = start_application(version)
     
     if pid:
         console.print(f"Application started successfully. PID: {pid}", style="bold green")
     else:
-        console.print("Failed to start the application", style="bold red") 
\ No newline at end of file
+        console.print("Failed to start the application", style="bold red")
+
+def start_fleet(version, replicas, wait, timeout):
+    """Start replicas concurrently and report how long each took to become ready"""
+    from utils.replicas import start_replicas
+    
+    try:
+        with console.status(f"Starting {replicas} replica(s) of {version}...") as status:
+            done = []
+            
+            def on_result(result):
+                done.append(result)
+                status.update(f"Starting {replicas} replica(s) of {version}... {len(done)}/{replicas} done")
+            
+            results = start_replicas(version, replicas, wait=wait, timeout=timeout, on_result=on_result)
+    except (RuntimeError, ValueError) as e:
+        console.print(f"[bold red]Error starting version {version}: {str(e)}[/bold red]")
+        return
+    
+    table = Table(title=f"Replicas of {version}")
+    table.add_column("Replica", style="cyan")
+    table.add_column("PID", style="cyan")
+    table.add_column("Port", style="blue")
+    table.add_column("Status", style="magenta")
+    table.add_column("Time to Ready", style="yellow")
+    
+    for result in results:
+        if result['ready']:
+            state = "[green]Ready[/green]" if wait else "[green]Started[/green]"
+        else:
+            state = f"[red]Failed: {result['error']}[/red]"
+        table.add_row(
+            str(result['replica']),
+            str(result['pid']) if result['pid'] else "N/A",
+            str(result['port']),
+            state,
+            f"{result['seconds']:.2f}s" if result['seconds'] is not None else "N/A"
+        )
+    
+    console.print(table)
+    
+    ready = sum(1 for result in results if result['ready'])
+    if ready == len(results):
+        console.print(f"All {ready} replica(s) {'ready' if wait else 'started'}", style="bold green")
+    else:
+        console.print(f"{len(results) - ready} of {len(results)} replica(s) failed", style="bold red")
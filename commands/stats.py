@@ -0,0 +1,90 @@
+import os
+import csv
+import time
+import click
+from rich.console import Console
+from rich.table import Table
+
+from utils.metrics import list_metric_files, RingBuffer, parse_duration, summarize
+from utils.downloader import format_size
+
+console = Console()
+
+DEFAULT_WINDOWS = ("5m", "1h", "24h")
+
+def load_samples(files):
+    """Read the samples of several metric files"""
+    samples = []
+    for path, version, create_time in files:
+        ring = RingBuffer(path)
+        try:
+            pid = os.path.basename(path).split("_", 1)[0]
+            samples.extend((timestamp, pid, version, cpu, rss) for timestamp, cpu, rss in ring.samples())
+        finally:
+            ring.close()
+    return sorted(samples)
+
+def parse_windows(ctx, param, value):
+    """Click callback parsing --window values"""
+    try:
+        return [(window, parse_duration(window)) for window in (value or DEFAULT_WINDOWS)]
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+def format_stat(summary, key, formatter):
+    return formatter(summary[key]) if summary else "-"
+
+@click.command()
+@click.argument('target')
+@click.option('--window', '-w', 'windows', multiple=True, callback=parse_windows,
+              help="Time window to summarize, e.g. 15m, 6h, 7d (repeatable)")
+@click.option('--csv', 'csv_path', type=click.Path(dir_okay=False, allow_dash=True),
+              help="Export the raw samples as CSV ('-' for stdout)")
+def stats(target, windows, csv_path):
+    """Show CPU and memory history of a PID or version."""
+    if target.isdigit():
+        # A PID may have been reused, show the most recent instance
+        files = list_metric_files(pid=int(target))[:1]
+        label = f"PID {target}"
+    else:
+        files = list_metric_files(version=target)
+        label = f"version {target} ({len(files)} instance(s))"
+    
+    if not files:
+        console.print(f"No metrics recorded for {target}", style="yellow")
+        return
+    
+    samples = load_samples(files)
+    
+    if csv_path:
+        with click.open_file(csv_path, 'w') as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["timestamp", "pid", "version", "cpu_percent", "rss_bytes"])
+            for timestamp, pid, version, cpu, rss in samples:
+                writer.writerow([f"{timestamp:.3f}", pid, version, f"{cpu:.2f}", rss])
+        if csv_path != '-':
+            console.print(f"Exported {len(samples)} samples to {csv_path}", style="green")
+        return
+    
+    table = Table(title=f"Resource usage of {label}")
+    table.add_column("Window", style="cyan")
+    table.add_column("Samples", style="blue")
+    for name in ("CPU % min", "avg", "p95", "max"):
+        table.add_column(name, style="yellow")
+    for name in ("RSS min", "avg", "p95", "max"):
+        table.add_column(name, style="red")
+    
+    now = time.time()
+    for name, seconds in list(windows) + [("all", None)]:
+        selected = [sample for sample in samples if seconds is None or sample[0] >= now - seconds]
+        cpu = summarize([sample[3] for sample in selected])
+        rss = summarize([sample[4] for sample in selected])
+        
+        table.add_row(
+            name,
+            str(len(selected)),
+            *[format_stat(cpu, key, lambda value: f"{value:.1f}") for key in ("min", "avg", "p95", "max")],
+            *[format_stat(rss, key, format_size) for key in ("min", "avg", "p95", "max")]
+        )
+    
+    console.print(table)
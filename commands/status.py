@@ -1,41 +1,156 @@
+import time
+from collections import deque
+
 import click
 from rich.console import Console
 from rich.table import Table
+from rich.live import Live
 
 from utils.process import get_process_status
+from utils.downloader import format_size
+from utils.sampler import ProcessSampler
 
 console = Console()
 
+# Samples kept per instance for the sparklines
+HISTORY_LENGTH = 30
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+SORT_KEYS = {
+    'pid': lambda proc: proc['pid'],
+    'version': lambda proc: (proc['version'], proc['pid']),
+    'cpu': lambda proc: -proc.get('cpu_percent', 0),
+    'rss': lambda proc: -proc.get('memory_mb', 0),
+}
+
+def sparkline(values):
+    """
+    Render values as a unicode sparkline
+
+    Args:
+        values (iterable): Numbers to plot, scaled between their minimum and maximum
+
+    Returns:
+        str: One character per value
+    """
+    values = list(values)
+    if not values:
+        return ""
+    low = min(values)
+    span = (max(values) - low) or 1
+    steps = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[int((value - low) / span * steps)] for value in values)
+
+def format_row(proc):
+    """Format the table cells of a process"""
+    status_text = "Running" if proc.get('running', False) else "Stopped"
+    cpu = f"{proc.get('cpu_percent', 0):.1f}" if 'cpu_percent' in proc else "N/A"
+    memory = f"{proc.get('memory_mb', 0):.1f}" if 'memory_mb' in proc else "N/A"
+    threads = str(proc['threads']) if proc.get('threads') is not None else "N/A"
+    fds = str(proc['open_fds']) if proc.get('open_fds') is not None else "N/A"
+    if proc.get('io_read_bytes') is not None:
+        io = f"{format_size(proc['io_read_bytes'])} / {format_size(proc['io_write_bytes'])}"
+    else:
+        io = "N/A"
+
+    return [
+        str(proc['pid']),
+        proc['version'],
+        status_text,
+        proc.get('start_time', 'Unknown'),
+        cpu,
+        memory,
+        threads,
+        fds,
+        io
+    ]
+
+def create_table(title, with_history=False):
+    """Create the status table with its columns"""
+    table = Table(title=title)
+    table.add_column("PID", style="cyan")
+    table.add_column("Version", style="green")
+    table.add_column("Status", style="magenta")
+    table.add_column("Start Time", style="blue")
+    table.add_column("CPU %", style="yellow")
+    table.add_column("Memory (MB)", style="red")
+    table.add_column("Threads", style="cyan")
+    table.add_column("FDs", style="cyan")
+    table.add_column("IO Read/Write", style="green")
+    if with_history:
+        table.add_column("CPU History", style="yellow", no_wrap=True)
+        table.add_column("Memory History", style="red", no_wrap=True)
+    return table
+
 @click.command()
-def status():
+@click.option('--watch', '-w', is_flag=True, help="Keep refreshing the table until interrupted")
+@click.option('--interval', '-n', type=click.FloatRange(min=0.2), default=2.0, show_default=True,
+              help="Seconds between refreshes in watch mode")
+@click.option('--sort', 'sort_by', type=click.Choice(sorted(SORT_KEYS)), default='pid', show_default=True,
+              help="Sort instances by this column")
+def status(watch, interval, sort_by):
     """Show status of running applications."""
+    if watch:
+        watch_status(interval, sort_by)
+        return
+
     processes = get_process_status()
-    
+
     if not processes:
         console.print("No running applications", style="yellow")
         return
-    
+
     # Create a table to display running processes
-    table = Table(title="Running Applications")
-    table.add_column("PID", style="cyan")
-    table.add_column("Version", style="green")
-    table.add_column("Status", style="magenta")
-    table.add_column("Start Time", style="blue")
-    table.add_column("CPU %", style="yellow")
-    table.add_column("Memory (MB)", style="red")
-    
-    for proc in processes:
-        status_text = "Running" if proc.get('running', False) else "Stopped"
-        cpu = f"{proc.get('cpu_percent', 0):.1f}" if 'cpu_percent' in proc else "N/A"
-        memory = f"{proc.get('memory_mb', 0):.1f}" if 'memory_mb' in proc else "N/A"
-        
-        table.add_row(
-            str(proc['pid']),
-            proc['version'],
-            status_text,
-            proc.get('start_time', 'Unknown'),
-            cpu,
-            memory
-        )
-    
-    console.print(table) 
\ No newline at end of file
+    table = create_table("Running Applications")
+    for proc in sorted(processes, key=SORT_KEYS[sort_by]):
+        table.add_row(*format_row(proc))
+
+    console.print(table)
+
+def watch_status(interval, sort_by):
+    """
+    Show a live status table
+
+    One sampler is kept for the whole session, so each refresh only reads
+    CPU deltas since the previous one instead of sampling from scratch.
+    """
+    sampler = ProcessSampler()
+    history = {}
+
+    with Live(console=console, auto_refresh=False, screen=False) as live:
+        try:
+            while True:
+                started = time.monotonic()
+                processes = get_process_status(sampler=sampler)
+
+                table = create_table(
+                    f"Running Applications (every {interval:g}s, sorted by {sort_by}, Ctrl+C to quit)",
+                    with_history=True
+                )
+
+                current = set()
+                for proc in sorted(processes, key=SORT_KEYS[sort_by]):
+                    pid = proc['pid']
+                    current.add(pid)
+
+                    cpu_history, memory_history = history.setdefault(
+                        pid, (deque(maxlen=HISTORY_LENGTH), deque(maxlen=HISTORY_LENGTH)))
+                    cpu_history.append(proc.get('cpu_percent', 0))
+                    memory_history.append(proc.get('memory_mb', 0))
+
+                    table.add_row(*format_row(proc), sparkline(cpu_history), sparkline(memory_history))
+
+                # Forget instances that went away
+                for pid in list(history):
+                    if pid not in current:
+                        history.pop(pid)
+
+                if not processes:
+                    live.update("No running applications", refresh=True)
+                else:
+                    live.update(table, refresh=True)
+
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            pass
@@ -1,17 +1,55 @@
 import click
 from rich.console import Console
 
-from utils.process import stop_application
+from utils.process import stop_application, stop_applications, STOP_TIMEOUT
 
 console = Console()
 
 @click.command()
-@click.argument('pid')
-def stop(pid):
-    """Stop a running application."""
-    success = stop_application(pid)
+@click.argument('pids', nargs=-1)
+@click.option('--all', 'stop_all', is_flag=True, help="Stop all running instances")
+@click.option('--version', help="Stop all instances of this version")
+@click.option('--timeout', type=click.FloatRange(min=0), default=STOP_TIMEOUT, show_default=True,
+              help="Seconds instances get to exit before they are killed")
+def stop(pids, stop_all, version, timeout):
+    """Stop running applications."""
+    if not pids and not stop_all and not version:
+        raise click.UsageError("Give PIDs to stop, --version or --all")
+    if stop_all and (pids or version):
+        raise click.UsageError("--all can't be combined with PIDs or --version")
     
-    if success:
-        console.print(f"Application (PID: {pid}) stopped successfully", style="bold green")
-    else:
-        console.print(f"Failed to stop application with PID {pid}", style="bold red") 
\ No newline at end of file
+    if len(pids) == 1 and not version:
+        pid = pids[0]
+        success = stop_application(pid, timeout)
+        
+        if success:
+            console.print(f"Application (PID: {pid}) stopped successfully", style="bold green")
+        else:
+            console.print(f"Failed to stop application with PID {pid}", style="bold red")
+        return
+    
+    try:
+        pid_list = [int(pid) for pid in pids] if pids else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="PIDS")
+    
+    result = stop_applications(pid_list, version=version, timeout=timeout)
+    print_stop_summary(result)
+
+def print_stop_summary(result):
+    """Print what happened to each instance of a bulk stop"""
+    stopped = len(result['stopped']) + len(result['killed'])
+    if not stopped and not result['not_running'] and not result['failed'] and not result['unknown']:
+        console.print("No running applications", style="yellow")
+        return
+    
+    if stopped:
+        console.print(f"Stopped {stopped} application(s)", style="bold green")
+    if result['killed']:
+        console.print(f"Killed after timeout: {', '.join(map(str, result['killed']))}", style="yellow")
+    if result['not_running']:
+        console.print(f"No longer running: {', '.join(map(str, result['not_running']))}", style="yellow")
+    if result['unknown']:
+        console.print(f"Not managed applications: {', '.join(map(str, result['unknown']))}", style="yellow")
+    if result['failed']:
+        console.print(f"Failed to stop: {', '.join(map(str, result['failed']))}", style="bold red")
@@ -1,18 +1,32 @@
+import os
 import click
 from rich.console import Console
 
-from utils.github import get_available_versions, download_version
+from utils.github import get_available_versions, download_version, get_download_path
+from utils.delta import install_delta, print_delta_summary
 from utils.installer import install_from_zip, get_installed_versions
+from utils.rollout import DEFAULT_BATCH_SIZE, DEFAULT_MAX_SURGE, rolling_update
 
 console = Console()
 
 @click.command()
-def update():
+@click.option('--offline', is_flag=True, help="Use the last known release listing")
+@click.option('--rolling', is_flag=True, help="Replace running instances with the new version without downtime")
+@click.option('--from', 'from_version', help="Only replace instances of this version")
+@click.option('--batch-size', type=click.IntRange(min=1), default=DEFAULT_BATCH_SIZE, show_default=True,
+              help="Instances replaced per batch")
+@click.option('--max-surge', type=click.IntRange(min=0), default=DEFAULT_MAX_SURGE, show_default=True,
+              help="Extra instances allowed while a batch starts")
+@click.option('--timeout', type=click.FloatRange(min=0),
+              help="Seconds a batch gets to become ready before rolling back")
+@click.option('--yes', '-y', is_flag=True, help="Don't ask for confirmation")
+@click.option('--full', is_flag=True, help="Download the whole archive instead of only the changed files")
+def update(offline, rolling, from_version, batch_size, max_surge, timeout, yes, full):
     """Update to the latest version."""
     console.print("Checking for updates...", style="cyan")
     
     # Get available versions from GitHub
-    versions = get_available_versions()
+    versions = get_available_versions(offline=offline)
     
     if not versions:
         console.print("Failed to fetch versions from GitHub", style="bold red")
@@ -26,22 +40,40 @@ def update():
     
     if latest_version in installed:
         console.print(f"Latest version ({latest_version}) is already installed", style="green")
-        return
-    
-    console.print(f"New version available: {latest_version}", style="cyan")
-    
-    if click.confirm(f"Do you want to install version {latest_version}?", default=True):
-        # Download the zip file
-        zip_path = download_version(latest_version)
+        if not rolling:
+            return
+    else:
+        console.print(f"New version available: {latest_version}", style="cyan")
         
-        if not zip_path:
-            console.print(f"Failed to download version {latest_version}", style="bold red")
+        if not yes and not click.confirm(f"Do you want to install version {latest_version}?", default=True):
             return
         
-        # Install from the zip file
-        success = install_from_zip(zip_path, latest_version)
+        # Fetch only what changed since the newest installed version, unless
+        # the whole archive is already here
+        summary = None
+        if not full and installed and not os.path.exists(get_download_path(latest_version)):
+            summary = install_delta(latest_version)
         
-        if success:
+        if summary:
+            print_delta_summary(summary)
             console.print(f"Version {latest_version} installed successfully", style="bold green")
         else:
-            console.print(f"Failed to install version {latest_version}", style="bold red") 
\ No newline at end of file
+            # Download the zip file
+            zip_path = download_version(latest_version)
+            
+            if not zip_path:
+                console.print(f"Failed to download version {latest_version}", style="bold red")
+                return
+            
+            # Install from the zip file
+            success = install_from_zip(zip_path, latest_version)
+            
+            if success:
+                console.print(f"Version {latest_version} installed successfully", style="bold green")
+            else:
+                console.print(f"Failed to install version {latest_version}", style="bold red")
+                return
+    
+    if rolling:
+        if not rolling_update(latest_version, from_version, batch_size, max_surge, timeout):
+            raise SystemExit(1) 
\ No newline at end of file
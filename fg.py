@@ -1,29 +1,67 @@
 #!/usr/bin/env python3
 import os
 import sys
+
+# Start profiling before anything else is imported
+_profiler = None
+if "--startup-profile" in sys.argv[1:]:
+    from utils.startup import ImportProfiler
+    _profiler = ImportProfiler()
+    _profiler.start()
+
+import time
+import importlib
 import click
-from rich.console import Console
 
-# Import commands
-from commands.available import available
-from commands.list import list_installed
-from commands.install import install
-from commands.update import update
-from commands.status import status
-from commands.logs import logs
-from commands.stop import stop
-from commands.uninstall import uninstall
-from commands.start import start
-from commands.gui import gui
-from commands.config import config
+# Commands are imported on first use, so a command only pays for the
+# modules it needs (e.g. `fg status` never loads the GUI toolkit)
+COMMANDS = {
+    "available": ("commands.available", "available"),
+    "list": ("commands.list", "list_installed"),
+    "install": ("commands.install", "install"),
+    "update": ("commands.update", "update"),
+    "status": ("commands.status", "status"),
+    "stats": ("commands.stats", "stats"),
+    "logs": ("commands.logs", "logs"),
+    "stop": ("commands.stop", "stop"),
+    "uninstall": ("commands.uninstall", "uninstall"),
+    "start": ("commands.start", "start"),
+    "gui": ("commands.gui", "gui"),
+    "config": ("commands.config", "config"),
+    "optimize": ("commands.optimize", "optimize"),
+    "daemon": ("commands.daemon", "daemon"),
+}
 
-console = Console()
+class LazyGroup(click.Group):
+    """Click group that imports subcommands when they are resolved"""
+    
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+    
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+    
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, attr = self.lazy_commands[cmd_name]
+            started = time.perf_counter()
+            command = getattr(importlib.import_module(module_name), attr)
+            if _profiler:
+                _profiler.add_phase(f"Load command '{cmd_name}'", time.perf_counter() - started)
+            self.add_command(command, name=cmd_name)
+        return super().get_command(ctx, cmd_name)
 
-@click.group()
-def cli():
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
+@click.option('--startup-profile', is_flag=True, help="Print an import-time breakdown after the command runs.")
+@click.pass_context
+def cli(ctx, startup_profile):
     """
     CLI tool for managing Java application versions.
     """
+    if startup_profile and _profiler:
+        ctx.call_on_close(_profiler.report)
+    
     # Create fg directory in user's home if it doesn't exist
     fg_dir = os.path.join(os.path.expanduser("~"), ".fg")
     os.makedirs(fg_dir, exist_ok=True)
@@ -32,18 +70,5 @@ def cli():
     os.makedirs(os.path.join(fg_dir, "versions"), exist_ok=True)
     os.makedirs(os.path.join(fg_dir, "logs"), exist_ok=True)
 
-# Register commands
-cli.add_command(available)
-cli.add_command(list_installed, name="list")
-cli.add_command(install)
-cli.add_command(update)
-cli.add_command(status)
-cli.add_command(logs)
-cli.add_command(stop)
-cli.add_command(uninstall)
-cli.add_command(start)
-cli.add_command(gui)
-cli.add_command(config)
-
 if __name__ == "__main__":
-    cli() 
\ No newline at end of file
+    cli()
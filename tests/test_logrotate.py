@@ -0,0 +1,63 @@
+import os
+import time
+
+import utils.registry
+from utils.logrotate import ORPHAN_LOG_GRACE, enforce_retention
+
+def write_file(path, size, age):
+    with open(path, 'wb') as f:
+        f.write(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+def live_logs(monkeypatch, paths):
+    monkeypatch.setattr(utils.registry, "list_processes", lambda: [{'log_file': path} for path in paths])
+
+def test_deletes_logs_of_dead_instances_with_their_segments(tmp_path, monkeypatch):
+    old = ORPHAN_LOG_GRACE + 3600
+    dead = write_file(tmp_path / "1.0_a.log", 1000, old)
+    dead_segment = write_file(tmp_path / "1.0_a.log.1.gz", 1000, old + 60)
+    running = write_file(tmp_path / "1.0_b.log", 1000, old)
+    own = write_file(tmp_path / "1.0_c.log", 1000, old)
+    live_logs(monkeypatch, [running])
+
+    enforce_retention(own, backup_count=10, budget=2500)
+
+    assert not os.path.exists(dead)
+    assert not os.path.exists(dead_segment)
+    assert os.path.exists(running)
+    assert os.path.exists(own)
+
+def test_keeps_recent_logs_nobody_owns(tmp_path, monkeypatch):
+    recent = write_file(tmp_path / "1.0_a.log", 1000, 0)
+    own = write_file(tmp_path / "1.0_b.log", 1000, 0)
+    live_logs(monkeypatch, [])
+
+    enforce_retention(own, backup_count=10, budget=100)
+
+    assert os.path.exists(recent)
+
+def test_stops_once_under_budget(tmp_path, monkeypatch):
+    old = ORPHAN_LOG_GRACE + 3600
+    oldest = write_file(tmp_path / "1.0_a.log", 1000, old + 60)
+    older = write_file(tmp_path / "1.0_b.log", 1000, old)
+    own = write_file(tmp_path / "1.0_c.log", 1000, 0)
+    live_logs(monkeypatch, [])
+
+    enforce_retention(own, backup_count=10, budget=2000)
+
+    assert not os.path.exists(oldest)
+    assert os.path.exists(older)
+
+def test_keeps_active_logs_when_registry_is_unavailable(tmp_path, monkeypatch):
+    dead = write_file(tmp_path / "1.0_a.log", 1000, ORPHAN_LOG_GRACE + 3600)
+    own = write_file(tmp_path / "1.0_b.log", 1000, 0)
+
+    def broken():
+        raise OSError("database is locked")
+    monkeypatch.setattr(utils.registry, "list_processes", broken)
+
+    enforce_retention(own, backup_count=10, budget=100)
+
+    assert os.path.exists(dead)
@@ -0,0 +1,60 @@
+import time
+from datetime import datetime
+
+import utils.logsearch
+from utils.logsearch import find_time_offset, search_logs
+
+def make_log(lines):
+    data = b"".join(line.encode() + b"\n" for line in lines)
+    starts = []
+    offset = 0
+    for line in lines:
+        starts.append(offset)
+        offset += len(line) + 1
+    return data, starts
+
+def hourly_log():
+    return make_log([f"2024-05-01 12:{minute:02d}:00 tick {minute}" for minute in range(60)])
+
+def test_since_finds_first_line_at_target():
+    data, starts = hourly_log()
+    offset = find_time_offset(data, len(data), datetime(2024, 5, 1, 12, 30))
+    assert offset == starts[30]
+
+def test_until_finds_first_line_after_target():
+    data, starts = hourly_log()
+    offset = find_time_offset(data, len(data), datetime(2024, 5, 1, 12, 30), after=True)
+    assert offset == starts[31]
+
+def test_all_lines_older_than_target():
+    data, _ = hourly_log()
+    assert find_time_offset(data, len(data), datetime(2024, 5, 1, 15, 0)) == len(data)
+    assert find_time_offset(data, len(data), datetime(2024, 5, 1, 15, 0), after=True) == len(data)
+
+def test_all_lines_newer_than_target():
+    data, _ = hourly_log()
+    assert find_time_offset(data, len(data), datetime(2024, 5, 1, 11, 0)) == 0
+
+def test_long_stack_trace_does_not_hide_entries():
+    lines = ["2024-05-01 12:00:00 start"]
+    lines += ["    at com.example.Frame.call(Frame.java:1)"] * 1000
+    lines += ["2024-05-01 12:10:00 after trace", "2024-05-01 12:20:00 last"]
+    data, starts = make_log(lines)
+    offset = find_time_offset(data, len(data), datetime(2024, 5, 1, 12, 5))
+    assert offset == starts[1001]
+
+def test_stopping_skips_files_not_started(monkeypatch):
+    searched = []
+
+    def slow_search(path, regex, since=None, until=None):
+        searched.append(path)
+        time.sleep(0.05)
+        yield "match"
+    monkeypatch.setattr(utils.logsearch, "search_file", slow_search)
+
+    files = [f"app_{number}.log" for number in range(50)]
+    matches = search_logs("match", files, jobs=1)
+    assert next(matches) == ("app_0.log", "match")
+    matches.close()
+
+    assert len(searched) < 5
@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+
+from rich.console import Console
+
+console = Console()
+
+# Class data sharing archive and its metadata, kept in the version directory
+ARCHIVE_NAME = "app.jsa"
+METADATA_NAME = "app.jsa.json"
+
+# Dynamic archives (-XX:ArchiveClassesAtExit) need JDK 13 or later
+MIN_JAVA_VERSION = 13
+
+JAVA_VERSION_PATTERN = re.compile(r'version "(\d+)(?:\.(\d+))?')
+
+def get_archive_path(version_dir):
+    """Returns the CDS archive path of a version"""
+    return os.path.join(version_dir, ARCHIVE_NAME)
+
+def get_metadata_path(version_dir):
+    """Returns the path of the archive metadata of a version"""
+    return os.path.join(version_dir, METADATA_NAME)
+
+# Names of the Java launcher in a run command
+JAVA_NAMES = ("java", "java.exe")
+
+def find_java_index(args):
+    """Index of the Java launcher in a command's arguments, None if there is none"""
+    for index, arg in enumerate(args):
+        if os.path.basename(arg).lower() in JAVA_NAMES:
+            return index
+    return None
+
+def find_java(args, cwd=None):
+    """
+    Find the Java binary a command uses
+
+    Args:
+        args (list): Command arguments
+        cwd (str, optional): Directory the command runs in, for relative paths
+
+    Returns:
+        str: Resolved path of the binary, or None if it can't be found
+    """
+    index = find_java_index(args)
+    if index is None:
+        return None
+    java = args[index]
+    if cwd and os.path.dirname(java) and not os.path.isabs(java):
+        java = os.path.join(cwd, java)
+    path = shutil.which(java)
+    return os.path.realpath(path) if path else None
+
+def java_fingerprint(java_path):
+    """Identify a Java installation cheaply, without running it"""
+    stat = os.stat(java_path)
+    return {'path': java_path, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+def get_java_version(java_path):
+    """
+    Ask a Java binary for its version
+
+    Returns:
+        tuple: (feature version number, full version line), (None, None) if unknown
+    """
+    try:
+        output = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None, None
+
+    text = output.stderr or output.stdout
+    match = JAVA_VERSION_PATTERN.search(text)
+    if not match:
+        return None, None
+
+    major = int(match.group(1))
+    if major == 1 and match.group(2):
+        # Old scheme: 1.8 is Java 8
+        major = int(match.group(2))
+    return major, text.splitlines()[0].strip()
+
+_java_versions = {}
+
+def get_java_major(java_path):
+    """
+    Get the feature version of a Java binary, asking it only once per binary
+
+    Returns:
+        int: Feature version number, None if unknown
+    """
+    try:
+        key = tuple(java_fingerprint(java_path).values())
+    except OSError:
+        return None
+    if key not in _java_versions:
+        _java_versions[key] = get_java_version(java_path)[0]
+    return _java_versions[key]
+
+def classpath_hash(classpath):
+    """
+    Hash a classpath together with the size and modification time of each entry
+
+    The archive is only valid for the exact classpath it was created with.
+    """
+    digest = hashlib.sha256()
+    for entry in classpath:
+        try:
+            stat = os.stat(entry)
+            digest.update(f"{entry}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{entry}\0missing\n".encode())
+    return digest.hexdigest()
+
+def load_metadata(version_dir):
+    """Load the archive metadata of a version, None if there is none"""
+    try:
+        with open(get_metadata_path(version_dir), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_metadata(version_dir, java_path, java_version, classpath, timings=None):
+    """
+    Record what an archive was created for
+
+    Args:
+        version_dir (str): Version directory
+        java_path (str): Java binary used for the training run
+        java_version (str): Its version line
+        classpath (list): Classpath of the training run
+        timings (dict, optional): Startup times measured with and without the archive
+    """
+    metadata = {
+        'java': java_fingerprint(java_path),
+        'java_version': java_version,
+        'classpath_hash': classpath_hash(classpath),
+        'created': time.time(),
+        'timings': timings or {}
+    }
+    path = get_metadata_path(version_dir)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def get_archive_options(version_dir, java_path, classpath):
+    """
+    Get the JVM options that use a version's CDS archive
+
+    The archive is only used if it was created by the same Java binary for
+    the same classpath; anything else would make the JVM reject it anyway.
+
+    Args:
+        version_dir (str): Version directory
+        java_path (str): Java binary the instance is started with, None if unknown
+        classpath (list): Classpath the instance is started with
+
+    Returns:
+        list: JVM options, empty if there is no valid archive
+    """
+    archive_path = get_archive_path(version_dir)
+    if not os.path.exists(archive_path):
+        return []
+
+    metadata = load_metadata(version_dir)
+    if metadata is None or java_path is None:
+        return []
+
+    try:
+        if metadata.get('java') != java_fingerprint(java_path):
+            return []
+    except OSError:
+        return []
+
+    if metadata.get('classpath_hash') != classpath_hash(classpath):
+        return []
+
+    return [f"-XX:SharedArchiveFile={archive_path}", "-Xshare:auto"]
+
+def remove_archive(version_dir):
+    """Delete a version's archive and its metadata"""
+    for path in (get_archive_path(version_dir), get_metadata_path(version_dir)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,180 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from rich.console import Console
+
+console = Console()
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def get_cache_dir():
+    """Returns the shared cache directory"""
+    return os.path.join(os.path.expanduser("~"), ".fg", "cache")
+
+def get_jar_cache_dir():
+    """Returns the directory of the shared JAR cache"""
+    return os.path.join(get_cache_dir(), "jars")
+
+def get_blob_path(digest):
+    """Returns the path of a cached blob for a SHA-256 digest"""
+    return os.path.join(get_jar_cache_dir(), "blobs", digest[:2], f"{digest}.jar")
+
+def get_ref_path(dep):
+    """Returns the path of the file mapping groupId:artifactId:version to a digest"""
+    return os.path.join(get_jar_cache_dir(), "refs", dep['groupId'], dep['artifactId'],
+                        f"{dep['version']}.sha256")
+
+def sha256_file(path):
+    """
+    Compute the SHA-256 digest of a file
+
+    Args:
+        path (str): File to hash
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _reflink(src, dst):
+    """Clone a file with a copy-on-write reflink (Linux FICLONE)"""
+    import fcntl
+
+    FICLONE = 0x40049409
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+def link_file(src, dst, hard_link=True):
+    """
+    Materialize src at dst without copying data when possible
+
+    Tries a hard link first, then a reflink, and falls back to a plain copy
+    (e.g. when src and dst are on different filesystems).
+
+    Args:
+        src (str): Existing file
+        dst (str): Path to create, replaced if it exists
+        hard_link (bool): Try a hard link; without it dst is always a file
+            of its own, sharing at most copy-on-write data with src
+    """
+    # Unique per thread, parallel installers may link the same destination
+    tmp_path = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    linked = False
+    if hard_link:
+        try:
+            os.link(src, tmp_path)
+            linked = True
+        except OSError:
+            pass
+
+    if not linked:
+        try:
+            _reflink(src, tmp_path)
+        except (OSError, ImportError):
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            shutil.copy2(src, tmp_path)
+
+    os.replace(tmp_path, dst)
+    # Renaming onto another link of the same file leaves both names in place
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+def reuse_file(src, dst):
+    """
+    Materialize a file of one installed version in another
+
+    JARs are never modified in place and are hard-linked. Anything else,
+    such as the manifest or configuration files, gets a file of its own
+    (a reflink or a copy), so editing it in one version leaves the other alone.
+
+    Args:
+        src (str): File of an installed version
+        dst (str): Path to create, replaced if it exists
+    """
+    link_file(src, dst, hard_link=dst.endswith(".jar"))
+
+def lookup_artifact(dep):
+    """
+    Look up a dependency in the shared cache
+
+    Args:
+        dep (dict): Dependency dictionary with groupId, artifactId and version
+
+    Returns:
+        str: Path to the cached JAR or None if not cached
+    """
+    try:
+        with open(get_ref_path(dep), 'r') as f:
+            digest = f.read().strip()
+    except OSError:
+        return None
+
+    blob_path = get_blob_path(digest)
+    if not os.path.exists(blob_path):
+        return None
+    return blob_path
+
+def link_cached_artifact(dep, jar_path):
+    """
+    Materialize a cached dependency at jar_path
+
+    Args:
+        dep (dict): Dependency dictionary
+        jar_path (str): Destination path
+
+    Returns:
+        bool: True if the dependency was served from the cache
+    """
+    blob_path = lookup_artifact(dep)
+    if not blob_path:
+        return False
+
+    try:
+        link_file(blob_path, jar_path)
+        return True
+    except OSError as e:
+        console.print(f"[yellow]Warning: Failed to use cached {dep['artifactId']}: {str(e)}[/yellow]")
+        return False
+
+def store_artifact(dep, jar_path):
+    """
+    Add a downloaded dependency to the shared cache
+
+    The JAR is stored once under its SHA-256 digest and linked back, so every
+    version using the same artifact shares the same file on disk.
+
+    Args:
+        dep (dict): Dependency dictionary
+        jar_path (str): Path to the downloaded JAR
+
+    Returns:
+        str: SHA-256 digest of the JAR
+    """
+    digest = sha256_file(jar_path)
+    blob_path = get_blob_path(digest)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+    if not os.path.exists(blob_path):
+        link_file(jar_path, blob_path)
+    if not os.path.samefile(blob_path, jar_path):
+        link_file(blob_path, jar_path)
+
+    ref_path = get_ref_path(dep)
+    os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(ref_path))
+    with os.fdopen(fd, 'w') as f:
+        f.write(digest)
+    os.replace(tmp_path, ref_path)
+
+    return digest
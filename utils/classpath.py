@@ -0,0 +1,148 @@
+import os
+import shlex
+
+# Java @argfile holding the classpath of a version, kept in the version directory
+CLASSPATH_FILE = "classpath.args"
+
+STAMP_PREFIX = "# fg-classpath libs-mtime="
+
+# java reads @argfiles since JDK 9
+MIN_ARGFILE_JAVA_VERSION = 9
+
+# Options that already set the classpath in a run command
+CLASSPATH_OPTIONS = ("-cp", "-classpath", "--class-path")
+
+def get_classpath_file(version_dir):
+    """Returns the classpath argfile of a version"""
+    return os.path.join(version_dir, CLASSPATH_FILE)
+
+def _libs_stamp(libs_dir):
+    """Modification time of the libs directory, changes when jars are added or removed"""
+    try:
+        return str(os.stat(libs_dir).st_mtime_ns)
+    except FileNotFoundError:
+        return "none"
+
+def build_classpath(version_dir, version, target_dir=None):
+    """
+    List the classpath of a version: its main jar, then the dependency jars
+
+    Args:
+        version_dir (str): Directory to look in
+        version (str): Version
+        target_dir (str, optional): Directory the entries should point to, for
+            a version prepared elsewhere and moved into place later
+
+    Returns:
+        list: Jar paths
+    """
+    target_dir = target_dir or version_dir
+    classpath = []
+
+    # Add main jar
+    jar_name = f"java-app-{version}.jar"
+    if os.path.exists(os.path.join(version_dir, jar_name)):
+        classpath.append(os.path.join(target_dir, jar_name))
+
+    # Add dependency jars, sorted so the classpath is stable
+    libs_dir = os.path.join(version_dir, "libs")
+    if os.path.exists(libs_dir):
+        for jar in sorted(os.listdir(libs_dir)):
+            if jar.endswith(".jar"):
+                classpath.append(os.path.join(target_dir, "libs", jar))
+
+    return classpath
+
+def _quote(value):
+    """Quote an argfile token; java and shlex read the same escapes"""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def write_classpath_file(version_dir, version, target_dir=None):
+    """
+    Precompute the classpath of a version into an @argfile
+
+    The file can be passed to java as @classpath.args. Its first line
+    records the libs directory's modification time, so it can be checked
+    for staleness without listing the directory.
+
+    Args:
+        version_dir (str): Directory to look in
+        version (str): Version
+        target_dir (str, optional): Directory the entries should point to
+
+    Returns:
+        list: The classpath
+    """
+    classpath = build_classpath(version_dir, version, target_dir)
+    path = get_classpath_file(version_dir)
+    with open(path + ".tmp", 'w') as f:
+        f.write(f"{STAMP_PREFIX}{_libs_stamp(os.path.join(version_dir, 'libs'))}\n")
+        f.write(f"-cp {_quote(os.pathsep.join(classpath))}\n")
+    os.replace(path + ".tmp", path)
+    return classpath
+
+def read_classpath_file(version_dir):
+    """
+    Read the precomputed classpath of a version
+
+    Returns:
+        list: The classpath, or None if there is no file or it is stale
+    """
+    try:
+        with open(get_classpath_file(version_dir), 'r') as f:
+            stamp = f.readline().strip()
+            body = f.read()
+    except OSError:
+        return None
+
+    if stamp != STAMP_PREFIX + _libs_stamp(os.path.join(version_dir, "libs")):
+        return None
+
+    # Comments are skipped and quotes removed the way java reads argfiles
+    tokens = shlex.split(body, comments=True)
+    if len(tokens) != 2 or tokens[0] != "-cp":
+        return None
+    return tokens[1].split(os.pathsep) if tokens[1] else []
+
+def get_classpath(version_dir, version):
+    """
+    Get the classpath of a version, from its argfile when that is current
+
+    A missing or stale argfile is rewritten.
+
+    Returns:
+        list: Jar paths
+    """
+    classpath = read_classpath_file(version_dir)
+    if classpath is not None:
+        return classpath
+
+    try:
+        return write_classpath_file(version_dir, version)
+    except OSError:
+        # Read-only installation, compute it every time
+        return build_classpath(version_dir, version)
+
+def has_classpath_option(args):
+    """Check if command arguments already set a classpath"""
+    return any(arg in CLASSPATH_OPTIONS or arg.startswith("--class-path=") for arg in args)
+
+def get_classpath_options(version_dir, classpath, java_version):
+    """
+    Get the java options that set a version's classpath
+
+    Java 9 and later read the classpath from the version's @argfile, which
+    keeps it out of the command line; older ones get it with -cp.
+
+    Args:
+        version_dir (str): Version directory
+        classpath (list): Classpath from get_classpath
+        java_version (int): Feature version of the Java binary, None if unknown
+
+    Returns:
+        list: Options to insert after the java binary
+    """
+    if (java_version is not None and java_version >= MIN_ARGFILE_JAVA_VERSION
+            and read_classpath_file(version_dir) == classpath):
+        return ["@" + get_classpath_file(version_dir)]
+    return ["-cp", os.pathsep.join(classpath)]
@@ -0,0 +1,411 @@
+import os
+import sys
+import json
+import time
+import heapq
+import signal
+import platform
+import selectors
+import threading
+import subprocess
+import socketserver
+
+from utils import process as process_utils
+from utils.daemon_client import get_socket_path, is_daemon_running
+from utils.registry import register_process, unregister_processes, record_exit, list_exits
+from utils.sampler import ProcessSampler
+from utils.metrics import ensure_sampler_running
+
+# Restart settings used when a manifest has no 'restart' section
+DEFAULT_RESTART_POLICY = "on-failure"
+DEFAULT_BACKOFF = "exponential"
+DEFAULT_INITIAL_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_MAX_RESTARTS = 10
+# An instance that ran this long is considered healthy again, its backoff is reset
+DEFAULT_RESET_AFTER = 300.0
+
+RESTART_POLICIES = ("always", "on-failure", "never")
+BACKOFF_POLICIES = ("exponential", "fixed")
+
+def get_restart_policy(manifest):
+    """
+    Get the restart settings of a version
+
+    Args:
+        manifest (dict): Version manifest, may contain a 'restart' section
+
+    Returns:
+        dict: Settings with 'policy', 'backoff', 'initial_delay', 'max_delay',
+            'max_restarts' and 'reset_after' keys
+    """
+    settings = manifest.get('restart', {})
+    policy = settings.get('policy', DEFAULT_RESTART_POLICY)
+    backoff = settings.get('backoff', DEFAULT_BACKOFF)
+    if policy not in RESTART_POLICIES:
+        policy = DEFAULT_RESTART_POLICY
+    if backoff not in BACKOFF_POLICIES:
+        backoff = DEFAULT_BACKOFF
+
+    return {
+        'policy': policy,
+        'backoff': backoff,
+        'initial_delay': float(settings.get('initialDelay', DEFAULT_INITIAL_DELAY)),
+        'max_delay': float(settings.get('maxDelay', DEFAULT_MAX_DELAY)),
+        'max_restarts': int(settings.get('maxRestarts', DEFAULT_MAX_RESTARTS)),
+        'reset_after': float(settings.get('resetAfter', DEFAULT_RESET_AFTER))
+    }
+
+def get_restart_delay(policy, restarts):
+    """Seconds to wait before the next restart after this many restarts in a row"""
+    if policy['backoff'] == "fixed":
+        return policy['initial_delay']
+    return min(policy['max_delay'], policy['initial_delay'] * 2 ** restarts)
+
+class Instance:
+    """A supervised instance, kept across restarts"""
+
+    def __init__(self, launch, log_file):
+        self.launch = launch
+        self.version = launch['version']
+        self.log_file = log_file
+        self.policy = get_restart_policy(launch['manifest'])
+        self.process = None
+        self.start_time = None
+        self.restarts = 0
+        self.stopping = False
+        self.exited = threading.Event()
+
+class Supervisor:
+    """
+    Start instances as children and restart them when they exit
+
+    Exits are noticed through a pidfd per child where the platform has
+    them, otherwise a thread per child blocks in waitpid. Nothing polls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances = {}
+        self._timers = []
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ)
+        self._running = True
+        self._sampler = ProcessSampler()
+        self._use_pidfd = hasattr(os, "pidfd_open")
+
+    def _wakeup(self):
+        try:
+            os.write(self._wakeup_write, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _spawn(self, instance):
+        """Start the process of an instance and watch for its exit"""
+        instance.process = process_utils.spawn_instance(instance.launch, instance.log_file)
+        instance.start_time = time.time()
+        instance.exited.clear()
+        self._instances[instance.process.pid] = instance
+        register_process(instance.process.pid, instance.version, instance.start_time, instance.log_file,
+                         instance.launch.get('port'))
+
+        if self._use_pidfd:
+            try:
+                pidfd = os.pidfd_open(instance.process.pid)
+                self._selector.register(pidfd, selectors.EVENT_READ, instance)
+                self._wakeup()
+                return
+            except OSError:
+                # Kernel without pidfd support
+                self._use_pidfd = False
+
+        threading.Thread(target=self._wait_thread, args=(instance, instance.process),
+                         daemon=True).start()
+
+    def _wait_thread(self, instance, process):
+        process.wait()
+        with self._lock:
+            self._handle_exit(instance, process)
+
+    def start(self, version, variables=None):
+        """
+        Start a supervised instance of a version
+
+        Args:
+            version (str): Version to start
+            variables (dict, optional): Replica placeholder values, kept across restarts
+
+        Returns:
+            dict: 'pid' and 'log_file' of the new instance
+        """
+        launch = process_utils.prepare_launch(version, variables)
+        if launch is None:
+            raise ValueError(f"Version {version} can't be started")
+
+        instance = Instance(launch, process_utils.create_log_file(version))
+        with self._lock:
+            self._spawn(instance)
+
+        try:
+            ensure_sampler_running(process_utils.FG_ROOT)
+        except Exception:
+            pass
+
+        return {'pid': instance.process.pid, 'log_file': instance.log_file}
+
+    def _handle_exit(self, instance, process):
+        """Record an exit and decide whether to restart; called with the lock held"""
+        if self._instances.get(process.pid) is not instance:
+            return
+        del self._instances[process.pid]
+
+        exit_code = process.returncode
+        end_time = time.time()
+        policy = instance.policy
+
+        if end_time - instance.start_time >= policy['reset_after']:
+            instance.restarts = 0
+
+        restart = (
+            self._running
+            and not instance.stopping
+            and policy['policy'] != "never"
+            and (policy['policy'] == "always" or exit_code != 0)
+            and instance.restarts < policy['max_restarts']
+        )
+
+        unregister_processes([process.pid])
+        record_exit(process.pid, instance.version, exit_code, instance.start_time, end_time, restart)
+        instance.exited.set()
+
+        if restart:
+            delay = get_restart_delay(policy, instance.restarts)
+            instance.restarts += 1
+            heapq.heappush(self._timers, (time.monotonic() + delay, id(instance), instance))
+            self._wakeup()
+
+    def _run_due_restarts(self):
+        """Restart instances whose backoff has elapsed; called with the lock held"""
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, instance = heapq.heappop(self._timers)
+            if instance.stopping or not self._running:
+                continue
+            try:
+                self._spawn(instance)
+            except Exception as e:
+                print(f"fg daemon: failed to restart {instance.version}: {e}", file=sys.stderr)
+
+    def run(self):
+        """Wait for child exits and due restarts until shutdown"""
+        while self._running:
+            with self._lock:
+                timeout = max(0, self._timers[0][0] - time.monotonic()) if self._timers else None
+
+            for key, _ in self._selector.select(timeout):
+                if key.fd == self._wakeup_read:
+                    try:
+                        while os.read(self._wakeup_read, 4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                instance = key.data
+                self._selector.unregister(key.fd)
+                os.close(key.fd)
+                # The pidfd is readable once the child exited, so this doesn't block
+                process = instance.process
+                process.wait()
+                with self._lock:
+                    self._handle_exit(instance, process)
+
+            with self._lock:
+                self._run_due_restarts()
+
+    def stop(self, pids, timeout=process_utils.STOP_TIMEOUT):
+        """
+        Stop supervised instances without restarting them
+
+        All instances are signalled at once and share one deadline.
+
+        Args:
+            pids (list): Process IDs to stop
+            timeout (float): Seconds before stragglers are killed
+
+        Returns:
+            dict: PID lists under 'stopped', 'killed' and 'failed'; PIDs in
+                none of them are not children of the daemon
+        """
+        result = {'stopped': [], 'killed': [], 'failed': []}
+        targets = []
+        with self._lock:
+            pending = {instance.process.pid: instance for _, _, instance in self._timers}
+            for pid in pids:
+                instance = self._instances.get(pid)
+                if instance is not None:
+                    instance.stopping = True
+                    targets.append(instance)
+                elif pid in pending:
+                    # Already exited and waiting for its restart
+                    pending[pid].stopping = True
+                    result['stopped'].append(pid)
+
+        for instance in targets:
+            instance.process.terminate()
+
+        deadline = time.monotonic() + timeout
+        stragglers = []
+        for instance in targets:
+            if instance.exited.wait(max(0, deadline - time.monotonic())):
+                result['stopped'].append(instance.process.pid)
+            else:
+                instance.process.kill()
+                stragglers.append(instance)
+
+        deadline = time.monotonic() + process_utils.KILL_TIMEOUT
+        for instance in stragglers:
+            if instance.exited.wait(max(0, deadline - time.monotonic())):
+                result['killed'].append(instance.process.pid)
+            else:
+                result['failed'].append(instance.process.pid)
+
+        return result
+
+    def status(self):
+        """Status of all registered instances, supervised ones with their restart count"""
+        statuses = process_utils.get_process_status(sampler=self._sampler)
+        with self._lock:
+            for status in statuses:
+                instance = self._instances.get(status['pid'])
+                status['supervised'] = instance is not None
+                if instance is not None:
+                    status['restarts'] = instance.restarts
+        return statuses
+
+    def shutdown(self):
+        """Stop supervising; running instances are left running"""
+        with self._lock:
+            self._running = False
+            self._timers.clear()
+        self._wakeup()
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one newline-delimited JSON request"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            message = json.loads(line)
+            result = self.server.dispatch(message.pop('command', None), message)
+            response = {'ok': True, 'result': result}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, supervisor):
+        self.supervisor = supervisor
+        super().__init__(socket_path, RequestHandler)
+
+    def dispatch(self, command, params):
+        supervisor = self.supervisor
+        if command == "ping":
+            return {'pid': os.getpid()}
+        if command == "start":
+            return supervisor.start(params['version'], params.get('variables'))
+        if command == "stop":
+            return supervisor.stop([int(pid) for pid in params['pids']],
+                                   params.get('grace', process_utils.STOP_TIMEOUT))
+        if command == "status":
+            return supervisor.status()
+        if command == "logs":
+            log_file, error = process_utils.get_log_file(params['pid'])
+            return {'log_file': log_file, 'error': error}
+        if command == "history":
+            return list_exits(params.get('version'), params.get('limit', 50))
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'pid': os.getpid()}
+        raise ValueError(f"Unknown request: {command}")
+
+def run_daemon():
+    """
+    Run the daemon in the foreground until shutdown or SIGTERM
+
+    Returns:
+        bool: False if the daemon could not start
+    """
+    if platform.system() == "Windows":
+        print("fg daemon: not supported on Windows", file=sys.stderr)
+        return False
+
+    if is_daemon_running():
+        print("fg daemon: already running", file=sys.stderr)
+        return False
+
+    # The daemon implements the requests the CLI would otherwise forward to it
+    process_utils.DELEGATE_TO_DAEMON = False
+
+    socket_path = get_socket_path()
+    try:
+        os.remove(socket_path)
+    except FileNotFoundError:
+        pass
+
+    supervisor = Supervisor()
+    old_umask = os.umask(0o077)
+    try:
+        server = DaemonServer(socket_path, supervisor)
+    finally:
+        os.umask(old_umask)
+
+    def handle_signal(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    reaper = threading.Thread(target=supervisor.run, daemon=True)
+    reaper.start()
+
+    try:
+        server.serve_forever()
+    finally:
+        # Remove the socket first so clients stop connecting and run locally
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+        supervisor.shutdown()
+        server.server_close()
+        reaper.join(timeout=5)
+
+    return True
+
+def start_daemon(fg_root, log_file):
+    """
+    Start the daemon in the background
+
+    Args:
+        fg_root (str): Directory containing fg.py, the daemon is run from here
+        log_file (str): File receiving the daemon's own output
+
+    Returns:
+        subprocess.Popen: The daemon process
+    """
+    with open(log_file, 'ab') as log:
+        return subprocess.Popen([sys.executable, "-m", "utils.daemon"], cwd=fg_root,
+                                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                start_new_session=True)
+
+if __name__ == "__main__":
+    sys.exit(0 if run_daemon() else 1)
@@ -0,0 +1,72 @@
+import os
+import json
+import socket
+
+from utils.paths import get_fg_dir
+
+# Seconds to wait for a daemon response; stopping instances can take a while
+REQUEST_TIMEOUT = 60
+
+class DaemonError(Exception):
+    """Raised when the daemon reports an error for a request"""
+
+def get_socket_path():
+    """Returns the path of the daemon's UNIX socket"""
+    return os.path.join(get_fg_dir(), "daemon.sock")
+
+def request(command, timeout=REQUEST_TIMEOUT, **params):
+    """
+    Send a request to the fg daemon
+
+    Args:
+        command (str): Request name
+        timeout (float): Seconds to wait for the response
+        **params: Request parameters
+
+    Returns:
+        The response result, or None if no daemon is running
+
+    Raises:
+        DaemonError: If the daemon could not handle the request
+    """
+    socket_path = get_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+    except OSError:
+        # Stale socket left by a daemon that died
+        return None
+
+    try:
+        message = dict(params, command=command)
+        sock.sendall(json.dumps(message).encode() + b"\n")
+
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    except OSError as e:
+        raise DaemonError(f"Lost connection to the daemon: {e}")
+    finally:
+        sock.close()
+
+    if not data:
+        raise DaemonError("Daemon closed the connection")
+
+    response = json.loads(data)
+    if not response.get('ok'):
+        raise DaemonError(response.get('error', 'Unknown error'))
+    return response.get('result')
+
+def is_daemon_running():
+    """Check if the fg daemon is running and answering requests"""
+    try:
+        return request("ping", timeout=2) is not None
+    except (DaemonError, OSError, ValueError):
+        return False
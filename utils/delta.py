@@ -0,0 +1,326 @@
+import os
+import re
+import json
+import struct
+import shutil
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+
+from utils.github import get_download_url, get_download_path, get_release_assets, find_asset
+from utils.downloader import DEFAULT_JOBS, CHUNK_SIZE, get_session, format_size
+from utils.cache import reuse_file
+from utils.fileindex import FileIndex, file_crc32
+from utils.installer import (
+    MANIFEST_NAME,
+    get_versions_dir,
+    get_installed_versions,
+    version_key,
+    plan_extraction,
+    extract_member,
+    create_staging_dir,
+    install_dependencies,
+    commit_version
+)
+
+console = Console()
+
+# Read from the end of the archive: the end of central directory record,
+# its comment (up to 64 KiB) and the ZIP64 records in front of it
+TAIL_SIZE = 128 * 1024
+
+# Changed members closer together than this are fetched with one request
+MERGE_GAP = 64 * 1024
+
+EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+class DeltaUnavailable(Exception):
+    """Raised when a version can't be fetched as a delta"""
+
+def _request_range(session, url, byte_range):
+    """
+    Start a ranged GET request
+
+    Returns:
+        tuple: (response, first byte offset, total size of the file)
+    """
+    response = session.get(url, headers={'Range': f"bytes={byte_range}"}, stream=True, timeout=30)
+    response.raise_for_status()
+
+    match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+    if response.status_code != 206 or not match:
+        response.close()
+        raise DeltaUnavailable("the server does not support range requests")
+    return response, int(match.group(1)), int(match.group(3))
+
+def _find_central_directory(tail, tail_offset):
+    """
+    Locate the central directory from the end of an archive
+
+    Args:
+        tail (bytes): Last bytes of the archive
+        tail_offset (int): Offset of tail in the archive
+
+    Returns:
+        tuple: (offset, size) of the central directory
+    """
+    pos = tail.rfind(EOCD_SIGNATURE)
+    if pos < 0 or len(tail) - pos < 22:
+        raise DeltaUnavailable("no end of central directory record found")
+    cd_size, cd_offset = struct.unpack("<LL", tail[pos + 12:pos + 20])
+
+    if cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        # ZIP64: the real values are in a record found through the locator
+        locator = tail[pos - 20:pos]
+        if len(locator) != 20 or not locator.startswith(ZIP64_LOCATOR_SIGNATURE):
+            raise DeltaUnavailable("malformed ZIP64 archive")
+        record_pos = struct.unpack("<Q", locator[8:16])[0] - tail_offset
+        record = tail[record_pos:record_pos + 56] if record_pos >= 0 else b""
+        if len(record) != 56 or not record.startswith(ZIP64_EOCD_SIGNATURE):
+            raise DeltaUnavailable("ZIP64 end of central directory is out of reach")
+        cd_size, cd_offset = struct.unpack("<QQ", record[40:56])
+
+    return cd_offset, cd_size
+
+def _fetch_to_file(session, url, path, start, end):
+    """Fetch bytes start..end (inclusive) of url into the same offsets of path"""
+    response, offset, _ = _request_range(session, url, f"{start}-{end}")
+    with response, open(path, 'r+b') as f:
+        if offset != start:
+            raise DeltaUnavailable("the server returned the wrong range")
+        f.seek(start)
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            f.write(chunk)
+    return end - start + 1
+
+def read_remote_archive(session, url, partial_path):
+    """
+    Fetch the central directory of a remote zip file into a sparse local copy
+
+    The local file has the size of the remote one but only its tail is
+    filled in; zipfile can list it, and members can be read once their
+    byte ranges are fetched into it too.
+
+    Args:
+        session (requests.Session): Session to fetch with
+        url (str): URL of the zip file
+        partial_path (str): Local file to create
+
+    Returns:
+        tuple: (final URL after redirects, archive size, central directory offset,
+            offset from which the local copy is filled in, bytes fetched)
+    """
+    response, tail_offset, total = _request_range(session, url, f"-{TAIL_SIZE}")
+    with response:
+        tail = response.content
+        url = response.url
+
+    with open(partial_path, 'wb') as f:
+        f.truncate(total)
+        f.seek(tail_offset)
+        f.write(tail)
+    fetched = len(tail)
+
+    cd_offset, cd_size = _find_central_directory(tail, tail_offset)
+    if cd_offset + cd_size > total:
+        raise DeltaUnavailable("central directory lies outside the archive")
+    if cd_offset < tail_offset:
+        fetched += _fetch_to_file(session, url, partial_path, cd_offset, tail_offset - 1)
+        tail_offset = cd_offset
+
+    return url, total, cd_offset, tail_offset, fetched
+
+def _member_spans(infos, cd_offset):
+    """
+    Get the byte range of every member: local header, data and descriptor
+
+    Returns:
+        dict: ZipInfo filename to (start, end) offsets, end exclusive
+    """
+    ordered = sorted(infos, key=lambda info: info.header_offset)
+    spans = {}
+    for info, following in zip(ordered, ordered[1:] + [None]):
+        end = following.header_offset if following is not None else cd_offset
+        spans[info.filename] = (info.header_offset, end)
+    return spans
+
+def _merge_spans(spans):
+    """Merge byte ranges that overlap or are less than MERGE_GAP apart"""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start - merged[-1][1] < MERGE_GAP:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def _is_unchanged(info, base_path):
+    """Check if an installed file has the same size and CRC as a zip member"""
+    try:
+        if os.path.islink(base_path) or os.path.getsize(base_path) != info.file_size:
+            return False
+        return file_crc32(base_path) == info.CRC
+    except OSError:
+        return False
+
+def get_base_version(version):
+    """Newest installed version other than version, None if there is none"""
+    candidates = [installed for installed in get_installed_versions() if installed != version]
+    return max(candidates, key=version_key) if candidates else None
+
+def install_delta(version, base_version=None, jobs=DEFAULT_JOBS):
+    """
+    Install a version by fetching only the files that changed since another version
+
+    The remote archive's central directory is read with HTTP range requests
+    and each member's size and CRC-32 is compared with the file at the same
+    place in the base version, then with the files of all installed versions
+    (see FileIndex). Unchanged files are reused from where they were found:
+    JARs are hard-linked, other files reflinked or copied so the versions
+    never share a file that might be edited. Changed members are fetched by
+    range, nearby ones in a single request, and extracted with their CRC
+    checked as usual. The archive's published SHA-256 can't be checked
+    since it is never downloaded whole; its size is checked against the
+    release asset instead.
+
+    Args:
+        version (str): Version to install
+        base_version (str, optional): Installed version to reuse files from,
+            defaults to the newest installed version
+        jobs (int): Maximum number of concurrent range requests
+
+    Returns:
+        dict: Summary with 'base', 'total', 'fetched', 'reused' and 'changed' keys,
+            or None if the version couldn't be installed this way
+    """
+    base_version = base_version or get_base_version(version)
+    if base_version is None:
+        return None
+    base_dir = os.path.join(get_versions_dir(), base_version)
+
+    session = get_session(jobs)
+    partial_path = get_download_path(version) + ".delta"
+    os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+    staging_dir = None
+
+    try:
+        asset = find_asset(get_release_assets(version), f"java-app-{version}.zip")
+        url, total, cd_offset, filled_from, fetched = read_remote_archive(
+            session, get_download_url(version), partial_path)
+
+        # The archive's digest can't be checked without all of it, but the
+        # central directory offsets are only valid for an archive of the
+        # size the release lists
+        if asset and asset.get('size') is not None and asset['size'] != total:
+            raise DeltaUnavailable(f"the archive is {total} bytes but the release lists {asset['size']}")
+
+        with zipfile.ZipFile(partial_path, 'r') as zip_ref:
+            infos = zip_ref.infolist()
+
+        staging_dir = create_staging_dir(version)
+        plan = plan_extraction(infos, staging_dir)
+        if plan is None:
+            console.print(f"[bold red]Error: fgmanifest.json not found in zip file[/bold red]")
+            return None
+
+        dirs, files = plan
+        for path in dict.fromkeys(dirs):
+            os.makedirs(path, exist_ok=True)
+
+        # Compare with the base version, reading local files in parallel
+        file_index = FileIndex.load(get_versions_dir())
+
+        def compare(item):
+            info, dest_path = item
+            base_path = os.path.join(base_dir, os.path.relpath(dest_path, staging_dir))
+            if _is_unchanged(info, base_path):
+                return base_path
+            return file_index.find(info.file_size, info.CRC)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            matches = list(executor.map(compare, files))
+
+        reused = []
+        changed = []
+        for (info, dest_path), base_path in zip(files, matches):
+            if base_path:
+                reused.append((info, dest_path, base_path))
+            else:
+                changed.append((info, dest_path))
+
+        # Fill in the changed members of the local copy
+        spans = _member_spans(infos, cd_offset)
+        # Bytes from filled_from on came with the central directory
+        ranges = [
+            (start, min(end, filled_from))
+            for start, end in _merge_spans(spans[info.filename] for info, _ in changed)
+            if start < filled_from
+        ]
+        lock = threading.Lock()
+
+        def fetch(byte_range):
+            nonlocal fetched
+            size = _fetch_to_file(session, url, partial_path, byte_range[0], byte_range[1] - 1)
+            with lock:
+                fetched += size
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(fetch, ranges))
+
+        for info, dest_path, base_path in reused:
+            reuse_file(base_path, dest_path)
+            file_index.remember(info, dest_path)
+        with zipfile.ZipFile(partial_path, 'r') as zip_ref:
+            for info, dest_path in changed:
+                extract_member(zip_ref, info, dest_path)
+                file_index.remember(info, dest_path)
+
+        with open(os.path.join(staging_dir, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+
+        # Download dependencies
+        if manifest.get('dependencies'):
+            install_dependencies(manifest['dependencies'], staging_dir, jobs=jobs)
+
+        commit_version(staging_dir, version, file_index)
+        staging_dir = None
+        file_index.save()
+
+        return {
+            'base': base_version,
+            'total': total,
+            'fetched': fetched,
+            'reused': len(reused),
+            'changed': len(changed)
+        }
+
+    except Exception as e:
+        console.print(f"[yellow]Delta update of {version} not possible: {str(e)}[/yellow]")
+        return None
+
+    finally:
+        if staging_dir and os.path.exists(staging_dir):
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+def print_delta_summary(summary):
+    """
+    Print how much a delta update saved compared with a full download
+
+    Args:
+        summary (dict): Summary returned by install_delta
+    """
+    saved = summary['total'] - summary['fetched']
+    percent = 100 * saved / summary['total'] if summary['total'] else 0
+    console.print(
+        f"Reused {summary['reused']} file(s) from {summary['base']}, fetched {summary['changed']} changed "
+        f"file(s): {format_size(summary['fetched'])} of {format_size(summary['total'])} "
+        f"({format_size(saved)} saved, {percent:.0f}%)"
+    )
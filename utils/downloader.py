@@ -0,0 +1,290 @@
+import os
+import time
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rich.console import Console
+
+console = Console()
+
+# Default number of parallel downloads
+DEFAULT_JOBS = 8
+
+# Retry policy for a single artifact
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+BACKOFF_MAX = 10.0
+
+CHUNK_SIZE = 64 * 1024
+
+# HTTP statuses worth retrying; anything else in the 4xx range is final
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+def get_session(pool_size=DEFAULT_JOBS):
+    """
+    Get the shared HTTP session
+
+    All downloads go through one session so TLS connections are kept alive
+    and reused between artifacts instead of being set up for every request.
+
+    Args:
+        pool_size (int): Minimum number of pooled connections per host
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session, _session_pool_size
+
+    # requests is imported on first use to keep CLI startup fast
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers['User-Agent'] = 'fg'
+
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+            _session_pool_size = pool_size
+
+        return _session
+
+def _backoff_delay(attempt):
+    """Exponential backoff with jitter for the given retry attempt"""
+    delay = min(BACKOFF_MAX, BACKOFF_FACTOR * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)
+
+def _is_retryable(error):
+    """Check if a download error is worth retrying"""
+    import requests
+
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = error.response
+        return response is None or response.status_code in RETRY_STATUSES
+    return isinstance(error, (requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+def download_file(url, dest_path, session=None, retries=MAX_RETRIES, timeout=30):
+    """
+    Download a URL to a file, retrying transient failures with backoff
+
+    The file is written to a temporary ``.part`` file and only renamed into
+    place once it is complete.
+
+    Args:
+        url (str): URL to download
+        dest_path (str): Destination file path
+        session (requests.Session, optional): Session to download with
+        retries (int): Number of retries after the first attempt
+        timeout (float): Connect/read timeout in seconds
+
+    Returns:
+        int: Number of bytes written
+    """
+    import requests
+
+    session = session or get_session()
+    part_path = dest_path + ".part"
+    attempt = 0
+
+    while True:
+        try:
+            with session.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+
+                size = 0
+                with open(part_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+
+            os.replace(part_path, dest_path)
+            return size
+        except requests.exceptions.RequestException as e:
+            if attempt >= retries or not _is_retryable(e):
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+
+class ChecksumMismatch(Exception):
+    """Raised when a downloaded file does not match its expected digest"""
+
+def _hash_existing(path):
+    """Hash the bytes already present in a partial download"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+def download_resumable(url, dest_path, expected_sha256=None, session=None, retries=MAX_RETRIES,
+                       timeout=30):
+    """
+    Download a URL to a file, resuming a partial ``.part`` file if present
+
+    Partial data is kept across dropped connections and failed runs and
+    continued with an HTTP Range request. The SHA-256 digest is computed while
+    writing, so verification needs no second pass over the file.
+
+    Args:
+        url (str): URL to download
+        dest_path (str): Destination file path
+        expected_sha256 (str, optional): Digest the file must match
+        session (requests.Session, optional): Session to download with
+        retries (int): Number of retries after the first attempt
+        timeout (float): Connect/read timeout in seconds
+
+    Returns:
+        str: SHA-256 hex digest of the downloaded file
+
+    Raises:
+        ChecksumMismatch: If the file does not match expected_sha256
+    """
+    import requests
+
+    session = session or get_session()
+    part_path = dest_path + ".part"
+    attempt = 0
+
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        digest = _hash_existing(part_path) if offset else hashlib.sha256()
+        headers = {'Range': f"bytes={offset}-"} if offset else {}
+
+        try:
+            with session.get(url, stream=True, headers=headers, timeout=timeout) as response:
+                if response.status_code == 416:
+                    # Nothing left to fetch if the partial file already holds
+                    # every byte, otherwise it is bogus and must be discarded
+                    total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                    if total != str(offset):
+                        os.remove(part_path)
+                        continue
+                else:
+                    response.raise_for_status()
+
+                    if offset and response.status_code == 206:
+                        console.print(f"Resuming download at {format_size(offset)}")
+                        mode = 'ab'
+                    else:
+                        # Server ignored the range, start over
+                        digest = hashlib.sha256()
+                        mode = 'wb'
+
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                            f.write(chunk)
+                            digest.update(chunk)
+        except requests.exceptions.RequestException as e:
+            if attempt >= retries or not _is_retryable(e):
+                raise
+            time.sleep(_backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        actual = digest.hexdigest()
+        if expected_sha256 and actual != expected_sha256.lower():
+            os.remove(part_path)
+            raise ChecksumMismatch(f"SHA-256 mismatch: expected {expected_sha256}, got {actual}")
+
+        os.replace(part_path, dest_path)
+        return actual
+
+def _download_and_process(name, url, dest_path, session, retries, on_complete):
+    """Download a file and run the completion hook in the worker thread"""
+    size = download_file(url, dest_path, session, retries)
+    if on_complete:
+        on_complete(name, dest_path)
+    return size
+
+def download_files(items, jobs=DEFAULT_JOBS, retries=MAX_RETRIES, on_complete=None):
+    """
+    Download several files concurrently with a bounded worker pool
+
+    Args:
+        items (list): List of (name, url, dest_path) tuples
+        jobs (int): Maximum number of concurrent downloads
+        retries (int): Number of retries per file
+        on_complete (callable, optional): Called with (name, dest_path) in the
+            worker thread after each successful download
+
+    Returns:
+        dict: Summary with 'downloaded', 'failed', 'cached', 'bytes' and 'elapsed' keys
+    """
+    jobs = max(1, min(jobs, len(items) or 1))
+    session = get_session(jobs)
+
+    summary = {
+        'downloaded': [],
+        'failed': [],
+        'cached': 0,
+        'bytes': 0,
+        'elapsed': 0.0
+    }
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(_download_and_process, name, url, dest_path, session, retries,
+                            on_complete): name
+            for name, url, dest_path in items
+        }
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                size = future.result()
+                summary['downloaded'].append(name)
+                summary['bytes'] += size
+                console.print(f"[green]Downloaded dependency: {name}[/green]")
+            except Exception as e:
+                summary['failed'].append((name, str(e)))
+                console.print(f"[bold red]Error downloading dependency {name}: {str(e)}[/bold red]")
+
+    summary['elapsed'] = time.monotonic() - started
+    return summary
+
+def format_size(num_bytes):
+    """Format a byte count for display"""
+    size = float(num_bytes)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+        size /= 1024
+
+def print_summary(summary):
+    """
+    Print an aggregated summary of a download run
+
+    Args:
+        summary (dict): Summary returned by download_files
+    """
+    elapsed = summary['elapsed']
+    throughput = summary['bytes'] / elapsed if elapsed > 0 else 0
+
+    if summary['downloaded']:
+        console.print(
+            f"Downloaded {len(summary['downloaded'])} file(s), "
+            f"{format_size(summary['bytes'])} in {elapsed:.1f}s "
+            f"({format_size(throughput)}/s)"
+        )
+
+    if summary['cached']:
+        console.print(f"Reused {summary['cached']} file(s) from the shared cache")
+
+    if summary['failed']:
+        console.print(f"[bold red]{len(summary['failed'])} file(s) failed:[/bold red]")
+        for name, error in summary['failed']:
+            console.print(f"[red]  {name}: {error}[/red]")
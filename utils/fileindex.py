@@ -0,0 +1,210 @@
+import os
+import json
+import zlib
+import tempfile
+import threading
+
+from rich.console import Console
+
+from utils.cache import reuse_file
+
+console = Console()
+
+# Smaller files are cheaper to write than to look up
+MIN_LINK_SIZE = 4 * 1024
+
+CRC_CHUNK_SIZE = 1024 * 1024
+
+def get_file_index_path():
+    """Returns the path of the cached CRC-32s of installed files"""
+    return os.path.join(os.path.expanduser("~"), ".fg", "files.json")
+
+def file_crc32(path):
+    """Compute the CRC-32 of a file the way zip files record it"""
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CRC_CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+def _walk_files(directory):
+    """Yield (path, stat) of regular files below directory, skipping symlinks"""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.path, entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+
+class FileIndex:
+    """
+    Files of the installed versions, looked up by size and CRC-32
+
+    Sizes come from a directory walk; CRC-32s are only computed for files
+    whose size matches something being looked up, and are kept in
+    ~/.fg/files.json as long as the file's size and modification time stay
+    the same. Files written by an install are added with the CRC from the
+    zip, so they never need to be read back.
+    """
+
+    def __init__(self, versions_dir):
+        self.versions_dir = versions_dir
+        self.lock = threading.Lock()
+        self.by_size = {}
+        self.stats = {}
+        self.crcs = {}
+        self.pending = []
+        self.linked = 0
+        self.linked_bytes = 0
+
+    @classmethod
+    def load(cls, versions_dir):
+        """
+        Index the files of every installed version
+
+        Args:
+            versions_dir (str): Directory holding the version directories
+
+        Returns:
+            FileIndex: The index
+        """
+        index = cls(versions_dir)
+
+        try:
+            with open(get_file_index_path(), 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+
+        try:
+            versions = [name for name in os.listdir(versions_dir) if not name.startswith(".")]
+        except FileNotFoundError:
+            versions = []
+
+        for version in versions:
+            for path, stat in _walk_files(os.path.join(versions_dir, version)):
+                if stat.st_size < MIN_LINK_SIZE:
+                    continue
+                key = os.path.relpath(path, versions_dir)
+                index.stats[key] = (stat.st_size, stat.st_mtime_ns)
+                index.by_size.setdefault(stat.st_size, []).append(key)
+
+                entry = cached.get(key)
+                if entry and tuple(entry[:2]) == index.stats[key]:
+                    index.crcs[key] = entry[2]
+
+        return index
+
+    def _crc(self, key):
+        with self.lock:
+            crc = self.crcs.get(key)
+        if crc is not None:
+            return crc
+
+        path = os.path.join(self.versions_dir, key)
+        try:
+            crc = file_crc32(path)
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != self.stats[key]:
+            # Changed while it was read
+            return None
+
+        with self.lock:
+            self.crcs[key] = crc
+        return crc
+
+    def find(self, size, crc):
+        """
+        Find an installed file with the given size and CRC-32
+
+        Returns:
+            str: Path of the file, or None if there is none
+        """
+        if size < MIN_LINK_SIZE:
+            return None
+        for key in self.by_size.get(size, ()):
+            if self._crc(key) == crc:
+                return os.path.join(self.versions_dir, key)
+        return None
+
+    def link_member(self, info, dest_path):
+        """
+        Materialize a zip member from an installed file with the same contents
+
+        JARs are hard-linked; other files are reflinked or copied (see reuse_file).
+
+        Args:
+            info (zipfile.ZipInfo): Member to materialize
+            dest_path (str): Path to create
+
+        Returns:
+            bool: True if the member was linked, False if it has to be extracted
+        """
+        source = self.find(info.file_size, info.CRC)
+        if source is None:
+            return False
+
+        try:
+            reuse_file(source, dest_path)
+        except OSError:
+            return False
+
+        with self.lock:
+            self.linked += 1
+            self.linked_bytes += info.file_size
+        self.remember(info, dest_path)
+        return True
+
+    def remember(self, info, dest_path):
+        """Note the CRC-32 of an extracted member, recorded once it is in place"""
+        if info.file_size >= MIN_LINK_SIZE:
+            with self.lock:
+                self.pending.append((dest_path, info.CRC))
+
+    def _record(self, path, crc):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        key = os.path.relpath(path, self.versions_dir)
+        with self.lock:
+            self.stats[key] = (stat.st_size, stat.st_mtime_ns)
+            self.crcs[key] = crc
+
+    def moved(self, staging_dir, version_dir):
+        """Record the members remembered in staging_dir, now that it became version_dir"""
+        prefix = os.path.join(staging_dir, "")
+        with self.lock:
+            moved = [(path, crc) for path, crc in self.pending if path.startswith(prefix)]
+            self.pending = [(path, crc) for path, crc in self.pending if not path.startswith(prefix)]
+
+        for path, crc in moved:
+            self._record(os.path.join(version_dir, os.path.relpath(path, staging_dir)), crc)
+
+    def save(self):
+        """Write the known CRC-32s to ~/.fg/files.json"""
+        with self.lock:
+            entries = {
+                key: [size, mtime_ns, self.crcs[key]]
+                for key, (size, mtime_ns) in self.stats.items()
+                if key in self.crcs
+            }
+
+        path = get_file_index_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            console.print(f"[yellow]Warning: Failed to save the file index: {str(e)}[/yellow]")
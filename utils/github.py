@@ -1,44 +1,308 @@
 import os
 import json
+import time
+import tempfile
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from rich.console import Console
 
+from utils.cache import get_cache_dir, sha256_file
+from utils.downloader import get_session, download_resumable, ChecksumMismatch
+
 console = Console()
 
-GITHUB_API_URL = "https://api.github.com/repos/douglasedurocha/java-app/releases"
-GITHUB_DOWNLOAD_URL = "https://github.com/douglasedurocha/java-app/releases/download"
+# Both URLs can be overridden, e.g. to point fg at a local stand-in server
+GITHUB_API_URL = os.environ.get(
+    "FG_RELEASES_URL", "https://api.github.com/repos/douglasedurocha/java-app/releases")
+GITHUB_DOWNLOAD_URL = os.environ.get(
+    "FG_DOWNLOAD_URL", "https://github.com/douglasedurocha/java-app/releases/download")
+
+# Seconds a cached release listing is served without revalidation,
+# FG_RELEASES_TTL overrides it
+DEFAULT_RELEASES_CACHE_TTL = 300
+
+RELEASES_PER_PAGE = 100
+MAX_PAGE_WORKERS = 4
+
+def get_releases_cache_ttl():
+    """Returns the release cache lifetime in seconds, from FG_RELEASES_TTL if it is valid"""
+    value = os.environ.get("FG_RELEASES_TTL")
+    if value is None:
+        return DEFAULT_RELEASES_CACHE_TTL
+    
+    try:
+        return int(value)
+    except ValueError:
+        console.print(f"[yellow]Warning: Invalid FG_RELEASES_TTL {value!r}, "
+                      f"using {DEFAULT_RELEASES_CACHE_TTL} seconds[/yellow]")
+        return DEFAULT_RELEASES_CACHE_TTL
+
+def get_releases_cache_path():
+    """Returns the path of the on-disk release listing cache"""
+    return os.path.join(get_cache_dir(), "releases.json")
+
+def load_releases_cache():
+    """
+    Load the cached release listing
+    
+    Returns:
+        dict: Cache entry or None if missing, unreadable or for another URL
+    """
+    try:
+        with open(get_releases_cache_path(), 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if cache.get('url') != GITHUB_API_URL:
+        return None
+    return cache
+
+def save_releases_cache(versions, etag):
+    """Atomically write the release listing cache"""
+    cache_path = get_releases_cache_path()
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    
+    cache = {
+        'url': GITHUB_API_URL,
+        'etag': etag,
+        'fetched_at': time.time(),
+        'versions': versions
+    }
+    
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        console.print(f"[yellow]Warning: Failed to save release cache: {str(e)}[/yellow]")
+
+def parse_releases(releases):
+    """Convert GitHub release objects into version dictionaries"""
+    versions = []
+    for release in releases:
+        # Extract version from tag_name (removing 'v' prefix if present)
+        version = release['tag_name']
+        if version.startswith('v'):
+            version = version[1:]
+        
+        versions.append({
+            'version': version,
+            'published_at': release['published_at'],
+            'assets': release['assets']
+        })
+    
+    return versions
+
+def _get_last_page(response):
+    """Get the number of the last page from a response's Link header"""
+    last = response.links.get('last')
+    if not last:
+        return 1
+    
+    query = parse_qs(urlparse(last['url']).query)
+    try:
+        return int(query['page'][0])
+    except (KeyError, ValueError):
+        return 1
+
+def _fetch_page(session, page):
+    """Fetch a single page of releases"""
+    response = session.get(GITHUB_API_URL, params={'per_page': RELEASES_PER_PAGE, 'page': page},
+                           timeout=30)
+    response.raise_for_status()
+    return response.json()
 
-def get_available_versions():
+def fetch_releases(etag=None):
+    """
+    Fetch all releases, following pagination
+    
+    The first page is requested conditionally with If-None-Match, so an
+    unchanged listing costs a single 304 that does not count against the
+    GitHub rate limit. Remaining pages are fetched concurrently.
+    
+    Args:
+        etag (str, optional): ETag of the cached listing
+    
+    Returns:
+        tuple: (releases, etag), releases is None if the listing is unchanged
+    """
+    session = get_session(MAX_PAGE_WORKERS)
+    headers = {'Accept': 'application/vnd.github+json'}
+    if etag:
+        headers['If-None-Match'] = etag
+    
+    response = session.get(GITHUB_API_URL, params={'per_page': RELEASES_PER_PAGE, 'page': 1},
+                           headers=headers, timeout=30)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    
+    releases = response.json()
+    last_page = _get_last_page(response)
+    
+    if last_page > 1:
+        with ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS) as executor:
+            pages = executor.map(lambda page: _fetch_page(session, page), range(2, last_page + 1))
+            for page_releases in pages:
+                releases.extend(page_releases)
+    
+    return releases, response.headers.get('ETag')
+
+def get_available_versions(offline=False, refresh=False):
     """
     Get all available versions from GitHub releases.
+    
+    Args:
+        offline (bool): Only use the last known listing, never hit the network
+        refresh (bool): Revalidate the cached listing even if it is still fresh
+    
+    Returns:
+        list: List of version dictionaries
     """
+    cache = load_releases_cache()
+    
+    if offline:
+        if cache is None:
+            console.print("[bold yellow]No cached release listing available offline[/bold yellow]")
+            return []
+        return cache['versions']
+    
+    if cache and not refresh and time.time() - cache.get('fetched_at', 0) < get_releases_cache_ttl():
+        return cache['versions']
+    
     try:
-        response = requests.get(GITHUB_API_URL)
-        response.raise_for_status()
-        releases = response.json()
+        releases, etag = fetch_releases(cache.get('etag') if cache else None)
         
-        versions = []
-        for release in releases:
-            # Extract version from tag_name (removing 'v' prefix if present)
-            version = release['tag_name']
-            if version.startswith('v'):
-                version = version[1:]
-            
-            versions.append({
-                'version': version,
-                'published_at': release['published_at'],
-                'assets': release['assets']
-            })
+        if releases is None:
+            # Not modified, just extend the cache lifetime
+            versions = cache['versions']
+        else:
+            versions = parse_releases(releases)
         
+        save_releases_cache(versions, etag)
         return versions
     except requests.exceptions.RequestException as e:
+        if cache:
+            console.print(f"[yellow]Warning: Error fetching available versions, using cached listing: {str(e)}[/yellow]")
+            return cache['versions']
         console.print(f"[bold red]Error fetching available versions: {str(e)}[/bold red]")
         return []
 
+def get_download_url(version):
+    """Returns the URL of a version's zip file"""
+    return f"{GITHUB_DOWNLOAD_URL}/v{version}/java-app-{version}.zip"
+
+def get_download_path(version):
+    """Returns the local path of a version's zip file"""
+    return os.path.join(os.path.expanduser("~"), ".fg", "downloads", f"java-app-{version}.zip")
+
+def fetch_release(version):
+    """
+    Fetch the metadata of a single release by its tag
+    
+    Args:
+        version (str): Version to look up
+    
+    Returns:
+        dict: Version dictionary as in the listing, or None if it can't be fetched
+    """
+    try:
+        response = get_session().get(f"{GITHUB_API_URL}/tags/v{version}",
+                                     headers={'Accept': 'application/vnd.github+json'}, timeout=30)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return parse_releases([response.json()])[0]
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        console.print(f"[yellow]Warning: Failed to fetch release {version}: {str(e)}[/yellow]")
+        return None
+
+def get_release_assets(version):
+    """
+    Get the assets of a release, from the cached listing or else from GitHub
+    
+    Args:
+        version (str): Version to look up
+    
+    Returns:
+        list: Asset dictionaries, empty if the release can't be found
+    """
+    cache = load_releases_cache()
+    for version_info in (cache or {}).get('versions', []):
+        if version_info['version'] == version:
+            return version_info.get('assets', [])
+    
+    release = fetch_release(version)
+    return release['assets'] if release else []
+
+def find_asset(assets, name):
+    """Find an asset by file name, None if there is none"""
+    for asset in assets:
+        if asset.get('name') == name:
+            return asset
+    return None
+
+def get_expected_digest(version, assets=None):
+    """
+    Get the published SHA-256 digest of a version's zip file
+    
+    Uses the digest GitHub publishes for the release asset, or a sidecar
+    ``<zip>.sha256`` asset when the release has one.
+    
+    Args:
+        version (str): Version to look up
+        assets (list, optional): Assets of the release, looked up if not given
+    
+    Returns:
+        str: Hex digest or None if no digest is published
+    """
+    zip_filename = f"java-app-{version}.zip"
+    if assets is None:
+        assets = get_release_assets(version)
+    
+    asset = find_asset(assets, zip_filename)
+    if asset and str(asset.get('digest', '')).startswith('sha256:'):
+        return asset['digest'].split(':', 1)[1]
+    
+    sidecar = find_asset(assets, f"{zip_filename}.sha256")
+    if not sidecar:
+        return None
+    
+    try:
+        response = get_session().get(sidecar['browser_download_url'], timeout=30)
+        response.raise_for_status()
+        return response.text.split()[0].lower()
+    except (requests.exceptions.RequestException, IndexError, KeyError) as e:
+        console.print(f"[yellow]Warning: Failed to fetch checksum for {version}: {str(e)}[/yellow]")
+        return None
+
+def _read_local_digest(zip_path):
+    """Read the digest recorded when an archive was downloaded"""
+    try:
+        with open(zip_path + ".sha256", 'r') as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+def _is_verified_archive(zip_path, expected_digest):
+    """Check if an existing archive matches its expected or recorded digest"""
+    if not os.path.exists(zip_path):
+        return False
+    
+    digest = expected_digest or _read_local_digest(zip_path)
+    return digest is not None and sha256_file(zip_path) == digest
+
 def download_version(version):
     """
     Download a specific version zip file.
     
+    A verified archive that is already present is reused, and an interrupted
+    download is resumed from its ``.part`` file.
+    
     Args:
         version (str): Version to download
         
@@ -46,23 +310,40 @@ def download_version(version):
         str: Path to downloaded file or None if failed
     """
     zip_filename = f"java-app-{version}.zip"
-    download_url = f"{GITHUB_DOWNLOAD_URL}/v{version}/{zip_filename}"
-    download_path = os.path.join(os.path.expanduser("~"), ".fg", "downloads", zip_filename)
+    download_url = get_download_url(version)
+    download_path = get_download_path(version)
     
     # Create downloads directory if it doesn't exist
     os.makedirs(os.path.dirname(download_path), exist_ok=True)
     
+    expected_digest = get_expected_digest(version)
+    
+    if _is_verified_archive(download_path, expected_digest):
+        console.print(f"Using verified archive for [bold cyan]{version}[/bold cyan] from {download_path}")
+        return download_path
+    
+    # Drop an archive that failed verification along with its recorded digest
+    for stale_path in (download_path, download_path + ".sha256"):
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+    
     try:
         console.print(f"Downloading [bold cyan]{version}[/bold cyan] from GitHub...")
-        response = requests.get(download_url, stream=True)
-        response.raise_for_status()
-        
-        with open(download_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        digest = download_resumable(download_url, download_path, expected_digest)
         
+        # Only a digest checked against a published one marks the archive as verified
+        if expected_digest:
+            with open(download_path + ".sha256", 'w') as f:
+                f.write(f"{digest}  {zip_filename}\n")
+            console.print(f"Verified SHA-256 checksum of {zip_filename}")
+        else:
+            console.print(f"[yellow]Warning: No published checksum for {zip_filename}, "
+                          f"the download is not verified[/yellow]")
         console.print(f"Downloaded [bold green]{version}[/bold green] successfully")
         return download_path
+    except ChecksumMismatch as e:
+        console.print(f"[bold red]Error downloading version {version}: {str(e)}[/bold red]")
+        return None
     except requests.exceptions.RequestException as e:
         console.print(f"[bold red]Error downloading version {version}: {str(e)}[/bold red]")
-        return None 
\ No newline at end of file
+        return None
@@ -1,130 +1,470 @@
 import os
+import re
 import json
+import time
 import shutil
 import zipfile
-import subprocess
+import tempfile
 import platform
-import requests
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 
-console = Console()
+# Path helpers live in utils.paths so light modules can use them without this one
+from utils.paths import get_fg_dir, get_versions_dir, get_logs_dir, get_manifest_path
+from utils.downloader import DEFAULT_JOBS, download_files, print_summary, format_size
+from utils.cache import link_cached_artifact, store_artifact, sha256_file
+from utils.classpath import write_classpath_file
+from utils.fileindex import FileIndex
 
-def get_fg_dir():
-    """Returns the fg directory in user's home"""
-    return os.path.join(os.path.expanduser("~"), ".fg")
+console = Console()
 
-def get_versions_dir():
-    """Returns the versions directory"""
-    return os.path.join(get_fg_dir(), "versions")
+MAVEN_CENTRAL_URL = "https://repo1.maven.org/maven2"
 
-def get_logs_dir():
-    """Returns the logs directory"""
-    return os.path.join(get_fg_dir(), "logs")
+MANIFEST_NAME = "fgmanifest.json"
 
-def get_manifest_path(version):
-    """Returns the path to the manifest file for a specific version"""
-    return os.path.join(get_versions_dir(), version, "fgmanifest.json")
+# Archives with more uncompressed data than this are extracted in parallel
+PARALLEL_EXTRACT_THRESHOLD = 32 * 1024 * 1024
+EXTRACT_CHUNK_SIZE = 1024 * 1024
 
 def is_version_installed(version):
     """Check if a specific version is installed"""
     manifest_path = get_manifest_path(version)
     return os.path.exists(manifest_path)
 
-def get_installed_versions():
-    """Get all installed versions"""
+def scan_installed_versions():
+    """List installed versions by looking at the versions directory"""
     versions_dir = get_versions_dir()
     if not os.path.exists(versions_dir):
         return []
     
     versions = []
     for version_dir in os.listdir(versions_dir):
+        # Skip staging and backup directories
+        if version_dir.startswith("."):
+            continue
         manifest_path = os.path.join(versions_dir, version_dir, "fgmanifest.json")
         if os.path.exists(manifest_path):
             versions.append(version_dir)
     
     return sorted(versions)
 
-def find_file_in_dir(directory, filename):
+def get_index_path():
+    """Returns the index of installed versions"""
+    return os.path.join(get_fg_dir(), "installed.json")
+
+@contextmanager
+def _index_lock():
+    """Serialize index updates between fg processes"""
+    os.makedirs(get_fg_dir(), exist_ok=True)
+    with open(get_index_path() + ".lock", 'a+') as f:
+        if platform.system() == "Windows":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        yield
+
+def _versions_dir_stamp():
+    try:
+        return os.stat(get_versions_dir()).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def describe_version(version_dir, version):
     """
-    Find a file recursively in a directory
+    Collect the index entry of a version directory
     
     Args:
-        directory (str): Directory to search in
-        filename (str): Filename to find
-        
+        version_dir (str): Directory holding the version
+        version (str): Version
+    
     Returns:
-        str: Full path to the file if found, None otherwise
+        dict: Entry with 'installed_at', 'size', 'manifest_sha256',
+            'dependencies' and 'main_jar_sha256' keys
     """
-    for root, dirs, files in os.walk(directory):
-        if filename in files:
-            return os.path.join(root, filename)
-    return None
+    size = 0
+    for root, _, files in os.walk(version_dir):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    
+    manifest_path = os.path.join(version_dir, MANIFEST_NAME)
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    
+    jar_path = os.path.join(version_dir, f"java-app-{version}.jar")
+    return {
+        'installed_at': os.path.getmtime(manifest_path),
+        'size': size,
+        'manifest_sha256': sha256_file(manifest_path),
+        'dependencies': len(manifest.get('dependencies') or []),
+        'main_jar_sha256': sha256_file(jar_path) if os.path.exists(jar_path) else None
+    }
+
+def _write_index(versions):
+    path = get_index_path()
+    with open(path + ".tmp", 'w') as f:
+        json.dump({'stamp': _versions_dir_stamp(), 'versions': versions}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _read_index():
+    try:
+        with open(get_index_path(), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
-def install_from_zip(zip_path, version):
+def _scan_index(known):
+    """Describe the installed versions, reusing the known entries"""
+    versions = {}
+    for version in scan_installed_versions():
+        entry = known.get(version)
+        if entry is None:
+            try:
+                entry = describe_version(os.path.join(get_versions_dir(), version), version)
+            except (OSError, ValueError):
+                continue
+        versions[version] = entry
+    return versions
+
+def rebuild_index():
     """
-    Install a version from a zip file
+    Bring the index in line with the versions directory
+    
+    Entries of versions that are still installed are kept as they are,
+    only versions added by hand are described from scratch.
+    
+    Returns:
+        dict: Index entries by version
+    """
+    with _index_lock():
+        index = _read_index() or {}
+        versions = _scan_index(index.get('versions', {}))
+        _write_index(versions)
+        return versions
+
+def load_index():
+    """
+    Load the index of installed versions
+    
+    The index is rebuilt if it is missing or the versions directory changed
+    behind fg's back, which costs one stat per call.
+    
+    Returns:
+        dict: Index entries by version
+    """
+    index = _read_index()
+    if index is None or index.get('stamp') != _versions_dir_stamp():
+        return rebuild_index()
+    return index['versions']
+
+def update_index(version, entry=None):
+    """
+    Add, replace or (without entry) remove a version in the index
     
     Args:
-        zip_path (str): Path to the zip file
-        version (str): Version to install
+        version (str): Version
+        entry (dict, optional): Entry from describe_version
+    """
+    with _index_lock():
+        index = _read_index()
+        versions = index['versions'] if index else _scan_index({})
+        if entry is None:
+            versions.pop(version, None)
+        else:
+            versions[version] = entry
+        _write_index(versions)
+
+def version_key(version):
+    """Sort key ordering versions numerically, e.g. 1.10.0 after 1.9.2"""
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part)
+            for part in re.split(r'[.\-+]', version)]
+
+def get_installed_versions():
+    """Get all installed versions"""
+    return sorted(load_index())
+
+def _find_member_prefix(infos):
+    """
+    Find the directory prefix of the application inside a zip file
+    
+    Args:
+        infos (list): ZipInfo objects from the central directory
     
     Returns:
-        bool: True if installation was successful
+        str: Prefix of the directory holding fgmanifest.json ('' for the root),
+            or None if the zip has no manifest
     """
-    try:
-        version_dir = os.path.join(get_versions_dir(), version)
+    prefixes = [
+        info.filename[:-len(MANIFEST_NAME)]
+        for info in infos
+        if info.filename == MANIFEST_NAME or info.filename.endswith("/" + MANIFEST_NAME)
+    ]
+    if not prefixes:
+        return None
+    
+    # Prefer the shallowest manifest
+    return min(prefixes, key=lambda prefix: prefix.count("/"))
+
+def _get_member_path(info, prefix, dest_dir):
+    """
+    Get the destination path of a zip member relative to the manifest directory
+    
+    Returns:
+        str: Destination path, or None if the member is outside the prefix or unsafe
+    """
+    if not info.filename.startswith(prefix):
+        return None
+    
+    relative_path = info.filename[len(prefix):].rstrip("/")
+    if not relative_path:
+        return None
+    
+    parts = relative_path.split("/")
+    if ".." in parts or os.path.isabs(relative_path):
+        return None
+    
+    return os.path.join(dest_dir, *parts)
+
+def extract_member(zip_ref, info, dest_path):
+    """Extract a single zip member to dest_path"""
+    with zip_ref.open(info) as src, open(dest_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, EXTRACT_CHUNK_SIZE)
+
+def _materialize_member(zip_ref, info, dest_path, file_index):
+    """Link a member from an installed file with the same contents, or extract it"""
+    if file_index is None:
+        extract_member(zip_ref, info, dest_path)
+    elif not file_index.link_member(info, dest_path):
+        extract_member(zip_ref, info, dest_path)
+        file_index.remember(info, dest_path)
+
+def plan_extraction(infos, dest_dir):
+    """
+    Map the members of a zip file to their destination paths
+    
+    Members are placed relative to the directory holding fgmanifest.json;
+    members outside it or with unsafe paths are skipped.
+    
+    Args:
+        infos (list): ZipInfo objects from the central directory
+        dest_dir (str): Directory the version is extracted to
+    
+    Returns:
+        tuple: (directory paths, list of (ZipInfo, destination path) for files),
+            or None if the zip has no manifest
+    """
+    prefix = _find_member_prefix(infos)
+    if prefix is None:
+        return None
+    
+    dirs = []
+    files = []
+    for info in infos:
+        dest_path = _get_member_path(info, prefix, dest_dir)
+        if dest_path is None:
+            continue
         
-        # Remove existing version if present
-        if os.path.exists(version_dir):
-            shutil.rmtree(version_dir)
+        if info.is_dir():
+            dirs.append(dest_path)
+        else:
+            dirs.append(os.path.dirname(dest_path))
+            files.append((info, dest_path))
+    
+    return dirs, files
+
+def extract_to_staging(zip_path, staging_dir, jobs=DEFAULT_JOBS, file_index=None):
+    """
+    Extract the application from a zip file in a single pass
+    
+    The central directory is read once, the directory holding fgmanifest.json
+    is located from it, and each member below it is written straight to its
+    final relative path in staging_dir. Large archives are extracted with a
+    thread pool.
+    
+    With a file index, members whose size and CRC-32 match a file of an
+    installed version are hard-linked (or reflinked) from it instead of
+    being decompressed.
+    
+    Args:
+        zip_path (str): Path to the zip file
+        staging_dir (str): Directory to extract to
+        jobs (int): Maximum number of extraction threads
+        file_index (FileIndex, optional): Installed files to reuse
+    
+    Returns:
+        bool: True if the zip contained a manifest and was extracted
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        plan = plan_extraction(zip_ref.infolist(), staging_dir)
+        if plan is None:
+            return False
         
-        # Create version directory
-        os.makedirs(version_dir, exist_ok=True)
+        dirs, files = plan
+        for path in dict.fromkeys(dirs):
+            os.makedirs(path, exist_ok=True)
         
-        # Extract zip contents
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(version_dir)
+        total_size = sum(info.file_size for info, _ in files)
+        if jobs > 1 and len(files) > 1 and total_size >= PARALLEL_EXTRACT_THRESHOLD:
+            # ZipFile serializes reads internally, decompression runs in parallel
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = [executor.submit(_materialize_member, zip_ref, info, dest_path, file_index)
+                           for info, dest_path in files]
+                for future in futures:
+                    future.result()
+        else:
+            for info, dest_path in files:
+                _materialize_member(zip_ref, info, dest_path, file_index)
+    
+    return True
+
+def _exchange_paths(path_a, path_b):
+    """
+    Atomically swap two paths with renameat2(RENAME_EXCHANGE)
+    
+    Returns:
+        bool: True if the paths were swapped, False if unsupported
+    """
+    if platform.system() != "Linux":
+        return False
+    
+    try:
+        import ctypes
         
-        # Find the manifest file recursively
-        manifest_file = find_file_in_dir(version_dir, "fgmanifest.json")
-        if not manifest_file:
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+    
+    AT_FDCWD = -100
+    RENAME_EXCHANGE = 2
+    result = renameat2(AT_FDCWD, os.fsencode(path_a), AT_FDCWD, os.fsencode(path_b), RENAME_EXCHANGE)
+    return result == 0
+
+def commit_staging(staging_dir, version_dir):
+    """
+    Move a fully prepared staging directory into place
+    
+    An existing version directory is swapped out atomically where the
+    platform supports it, so the version is never missing during a reinstall.
+    
+    Args:
+        staging_dir (str): Prepared version directory
+        version_dir (str): Final version directory
+    """
+    if not os.path.exists(version_dir):
+        os.rename(staging_dir, version_dir)
+        return
+    
+    if _exchange_paths(staging_dir, version_dir):
+        # staging_dir now holds the previous installation
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return
+    
+    old_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(version_dir)}.old-",
+                               dir=os.path.dirname(version_dir))
+    os.rmdir(old_dir)
+    os.rename(version_dir, old_dir)
+    os.rename(staging_dir, version_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def create_staging_dir(version):
+    """Create a hidden staging directory next to the version directories"""
+    versions_dir = get_versions_dir()
+    os.makedirs(versions_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=f".{version}.staging-", dir=versions_dir)
+    # mkdtemp creates the directory private to the user
+    os.chmod(staging_dir, 0o755)
+    return staging_dir
+
+def stage_version(zip_path, version, jobs=DEFAULT_JOBS, file_index=None):
+    """
+    Extract a version's zip file into a new staging directory
+    
+    Args:
+        zip_path (str): Path to the zip file
+        version (str): Version being installed
+        jobs (int): Maximum number of extraction threads
+        file_index (FileIndex, optional): Installed files to reuse
+    
+    Returns:
+        tuple: (staging directory, manifest), or (None, None) if the zip has no manifest
+    """
+    staging_dir = create_staging_dir(version)
+    try:
+        if not extract_to_staging(zip_path, staging_dir, jobs=jobs, file_index=file_index):
             console.print(f"[bold red]Error: fgmanifest.json not found in zip file[/bold red]")
-            return False
-        
-        # Move files to the version directory if they're in a subdirectory
-        manifest_dir = os.path.dirname(manifest_file)
-        if manifest_dir != version_dir:
-            # This means the files are in a subdirectory, move them up
-            for item in os.listdir(manifest_dir):
-                src_path = os.path.join(manifest_dir, item)
-                dst_path = os.path.join(version_dir, item)
-                if os.path.exists(dst_path) and dst_path != src_path:
-                    if os.path.isdir(dst_path):
-                        shutil.rmtree(dst_path)
-                    else:
-                        os.remove(dst_path)
-                shutil.move(src_path, version_dir)
-            
-            # Clean up empty directories
-            for root, dirs, files in os.walk(version_dir, topdown=False):
-                for dir in dirs:
-                    dir_path = os.path.join(root, dir)
-                    if not os.listdir(dir_path):
-                        os.rmdir(dir_path)
-        
-        # Read manifest from the new location
-        manifest_path = get_manifest_path(version)
-        if not os.path.exists(manifest_path):
-            console.print(f"[bold red]Error: Failed to move fgmanifest.json to the correct location[/bold red]")
-            return False
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return None, None
         
         # Load manifest
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
+        with open(os.path.join(staging_dir, MANIFEST_NAME), 'r') as f:
+            return staging_dir, json.load(f)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+def commit_version(staging_dir, version, file_index=None):
+    """
+    Move a prepared staging directory into place as an installed version
+    
+    Args:
+        staging_dir (str): Staging directory with the version and its dependencies
+        version (str): Version being installed
+        file_index (FileIndex, optional): Index the version was staged with,
+            told about the new location of its files
+    """
+    version_dir = os.path.join(get_versions_dir(), version)
+    
+    # Precompute the classpath, pointing at where the version will live
+    write_classpath_file(staging_dir, version, target_dir=version_dir)
+    entry = describe_version(staging_dir, version)
+    entry['installed_at'] = time.time()
+    
+    commit_staging(staging_dir, version_dir)
+    update_index(version, entry)
+    if file_index is not None:
+        file_index.moved(staging_dir, version_dir)
+
+def install_from_zip(zip_path, version, jobs=DEFAULT_JOBS, incremental=False):
+    """
+    Install a version from a zip file
+    
+    The version is prepared in a staging directory, including its
+    dependencies, and only then moved into place.
+    
+    Args:
+        zip_path (str): Path to the zip file
+        version (str): Version to install
+        jobs (int): Maximum number of concurrent dependency downloads
+        incremental (bool): Link files that already exist in installed
+            versions instead of extracting them
+    
+    Returns:
+        bool: True if installation was successful
+    """
+    staging_dir = None
+    file_index = FileIndex.load(get_versions_dir()) if incremental else None
+    
+    try:
+        staging_dir, manifest = stage_version(zip_path, version, jobs=jobs, file_index=file_index)
+        if staging_dir is None:
+            return False
         
         # Download dependencies
         if 'dependencies' in manifest and manifest['dependencies']:
-            install_dependencies(manifest['dependencies'], version_dir)
+            install_dependencies(manifest['dependencies'], staging_dir, jobs=jobs)
+        
+        commit_version(staging_dir, version, file_index)
+        staging_dir = None
+        
+        if file_index is not None:
+            print_reuse_summary(file_index)
+            file_index.save()
         
         # Success message moved to command handler
         return True
@@ -132,47 +472,66 @@ def install_from_zip(zip_path, version):
     except Exception as e:
         console.print(f"[bold red]Error installing version {version}: {str(e)}[/bold red]")
         return False
+    
+    finally:
+        if staging_dir and os.path.exists(staging_dir):
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+def print_reuse_summary(file_index):
+    """Print how much an incremental install reused from installed versions"""
+    if file_index.linked:
+        console.print(f"Reused {file_index.linked} unchanged file(s) ({format_size(file_index.linked_bytes)}) "
+                      f"from installed versions")
 
-def install_dependencies(dependencies, version_dir):
+def get_dependency_url(dep):
+    """Returns the Maven Central URL of a dependency JAR"""
+    group_path = dep['groupId'].replace('.', '/')
+    artifact_id = dep['artifactId']
+    version = dep['version']
+    return f"{MAVEN_CENTRAL_URL}/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.jar"
+
+def install_dependencies(dependencies, version_dir, jobs=DEFAULT_JOBS):
     """
     Install Maven dependencies
     
     Args:
         dependencies (list): List of dependency dictionaries
         version_dir (str): Directory to install dependencies to
+        jobs (int): Maximum number of concurrent downloads
+    
+    Returns:
+        dict: Download summary
     """
     libs_dir = os.path.join(version_dir, "libs")
     os.makedirs(libs_dir, exist_ok=True)
     
-    console.print("Installing dependencies...")
+    console.print(f"Installing {len(dependencies)} dependencies ({jobs} parallel jobs)...")
     
+    items = []
+    pending = {}
+    cached = 0
     for dep in dependencies:
-        group_id = dep['groupId']
-        artifact_id = dep['artifactId']
-        version = dep['version']
-        
-        # Convert group_id to path format
-        group_path = group_id.replace('.', '/')
-        
-        # Maven Central URL
-        url = f"https://repo1.maven.org/maven2/{group_path}/{artifact_id}/{version}/{artifact_id}-{version}.jar"
-        
-        # Download JAR
-        jar_name = f"{artifact_id}-{version}.jar"
+        jar_name = f"{dep['artifactId']}-{dep['version']}.jar"
         jar_path = os.path.join(libs_dir, jar_name)
         
+        # Serve from the shared cache when possible
+        if link_cached_artifact(dep, jar_path):
+            cached += 1
+            continue
+        
+        items.append((jar_name, get_dependency_url(dep), jar_path))
+        pending[jar_name] = dep
+    
+    def cache_download(jar_name, jar_path):
         try:
-            console.print(f"Downloading dependency: {artifact_id} {version}")
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            with open(jar_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    
-            console.print(f"[green]Downloaded dependency: {jar_name}[/green]")
-        except Exception as e:
-            console.print(f"[bold red]Error downloading dependency {jar_name}: {str(e)}[/bold red]")
+            store_artifact(pending[jar_name], jar_path)
+        except OSError as e:
+            console.print(f"[yellow]Warning: Failed to cache {jar_name}: {str(e)}[/yellow]")
+    
+    summary = download_files(items, jobs=jobs, on_complete=cache_download)
+    summary['cached'] = cached
+    print_summary(summary)
+    return summary
 
 def uninstall_version(version):
     """
@@ -192,6 +551,7 @@ def uninstall_version(version):
     
     try:
         shutil.rmtree(version_dir)
+        update_index(version)
         # Success message moved to command handler
         return True
     except Exception as e:
@@ -0,0 +1,258 @@
+import os
+import sys
+import gzip
+import time
+import queue
+import shutil
+import argparse
+import threading
+
+from utils.logtail import get_log_segments, get_segment_number
+
+# Rotate the active log once it grows past this size
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+# Rotate the active log once it is older than this many seconds
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# Rotated segments kept per instance log
+DEFAULT_BACKUP_COUNT = 10
+
+# Total size of ~/.fg/logs above which the oldest rotated segments are deleted
+LOG_RETENTION_BYTES = int(os.environ.get("FG_LOG_RETENTION_BYTES", str(1024 * 1024 * 1024)))
+
+# Seconds an active log nobody owns is left alone, covering instances
+# between creating their log and registering, or waiting for a restart
+ORPHAN_LOG_GRACE = 10 * 60
+
+READ_CHUNK_SIZE = 64 * 1024
+
+def get_rotation_settings(manifest):
+    """
+    Get the log rotation settings of a version
+
+    Args:
+        manifest (dict): Version manifest, may contain a 'logRotation' section
+
+    Returns:
+        dict: Settings with 'max_bytes', 'max_age' and 'backup_count' keys
+    """
+    settings = manifest.get('logRotation', {})
+    return {
+        'max_bytes': int(settings.get('maxBytes', DEFAULT_MAX_BYTES)),
+        'max_age': int(settings.get('maxAgeSeconds', DEFAULT_MAX_AGE)),
+        'backup_count': int(settings.get('backupCount', DEFAULT_BACKUP_COUNT))
+    }
+
+def build_writer_command(log_file, settings):
+    """
+    Build the command running the log writer for a log file
+
+    Args:
+        log_file (str): Path of the active log file
+        settings (dict): Settings from get_rotation_settings
+
+    Returns:
+        list: Command arguments
+    """
+    return [
+        sys.executable, "-m", "utils.logrotate",
+        "--max-bytes", str(settings['max_bytes']),
+        "--max-age", str(settings['max_age']),
+        "--backup-count", str(settings['backup_count']),
+        log_file
+    ]
+
+def compress_segment(path):
+    """Gzip a rotated segment and remove the uncompressed file"""
+    with open(path, 'rb') as src, gzip.open(path + ".gz.tmp", 'wb') as dst:
+        shutil.copyfileobj(src, dst, READ_CHUNK_SIZE)
+    os.replace(path + ".gz.tmp", path + ".gz")
+    os.remove(path)
+
+def _live_log_files():
+    """Log files of registered instances that are still running, None if unknown"""
+    from utils.registry import list_processes
+
+    try:
+        return {entry['log_file'] for entry in list_processes()}
+    except Exception:
+        return None
+
+def enforce_retention(log_file, backup_count, budget=LOG_RETENTION_BYTES):
+    """
+    Delete rotated segments beyond the per-log count and the global size budget
+
+    Over budget, the oldest rotated segments go first. Active logs that no
+    running instance owns, left by stopped or crashed instances, are deleted
+    with their segments too once they haven't been written for a while.
+    log_file itself is never deleted.
+
+    Args:
+        log_file (str): Path of the active log file
+        backup_count (int): Rotated segments to keep for this log
+        budget (int): Maximum total size of the logs directory in bytes
+    """
+    rotated = get_log_segments(log_file)[:-1]
+    for segment in rotated[:max(0, len(rotated) - backup_count)]:
+        try:
+            os.remove(segment)
+        except OSError:
+            pass
+
+    logs_dir = os.path.dirname(log_file)
+    files = []
+    active = []
+    total = 0
+    for entry in os.scandir(logs_dir):
+        if not entry.is_file():
+            continue
+        stat = entry.stat()
+        total += stat.st_size
+        if get_segment_number(entry.name) is not None:
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        elif entry.name.endswith(".log") and entry.path != log_file:
+            active.append((stat.st_mtime, stat.st_size, entry.path))
+
+    if total <= budget:
+        return
+
+    # Active logs are only deleted once the registry says nobody owns them
+    orphans = set()
+    live = _live_log_files()
+    if live is not None:
+        idle_since = time.time() - ORPHAN_LOG_GRACE
+        for mtime, size, path in active:
+            if path not in live and mtime < idle_since:
+                files.append((mtime, size, path))
+                orphans.add(path)
+
+    for _, size, path in sorted(files):
+        if total <= budget:
+            break
+        segments = get_log_segments(path)[:-1] if path in orphans else []
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
+        for segment in segments:
+            try:
+                size = os.path.getsize(segment)
+                os.remove(segment)
+                total -= size
+            except OSError:
+                pass
+
+class RotatingWriter:
+    """
+    Copy a stream into a log file, rotating it by size and age
+
+    Rotated segments are named ``<log>.<n>`` with increasing n and are
+    compressed to ``<log>.<n>.gz`` by a background thread.
+    """
+
+    def __init__(self, log_file, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 backup_count=DEFAULT_BACKUP_COUNT):
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+
+        # Held from moving the active log aside until its successor is open
+        self._rotate_lock = threading.Lock()
+        self._compress_queue = queue.Queue()
+        self._compressor = threading.Thread(target=self._compress_loop, daemon=True)
+        self._compressor.start()
+
+        self._open()
+
+    def _open(self):
+        self.file = open(self.log_file, 'ab')
+        self.size = self.file.tell()
+        self.opened_at = time.time()
+
+    def _compress_loop(self):
+        while True:
+            path = self._compress_queue.get()
+            if path is None:
+                return
+            try:
+                compress_segment(path)
+                with self._rotate_lock:
+                    enforce_retention(self.log_file, self.backup_count)
+            except OSError as e:
+                print(f"fg: failed to compress {path}: {e}", file=sys.stderr)
+
+    def should_rotate(self):
+        if self.size == 0:
+            return False
+        return self.size >= self.max_bytes or time.time() - self.opened_at >= self.max_age
+
+    def rotate(self):
+        """Move the active log aside and start a new one"""
+        self.file.close()
+
+        numbers = [get_segment_number(os.path.basename(path))
+                   for path in get_log_segments(self.log_file)[:-1]]
+        segment = f"{self.log_file}.{max(numbers, default=0) + 1}"
+        with self._rotate_lock:
+            os.rename(self.log_file, segment)
+            self._open()
+        self._compress_queue.put(segment)
+
+    def write(self, data):
+        if self.should_rotate():
+            # Finish the current line first so segments end on line boundaries
+            newline = data.find(b"\n")
+            if newline != -1:
+                self._write(data[:newline + 1])
+                data = data[newline + 1:]
+            self.rotate()
+        if data:
+            self._write(data)
+
+    def _write(self, data):
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+
+    def close(self):
+        """Close the log and wait for pending compression"""
+        self.file.close()
+        self._compress_queue.put(None)
+        self._compressor.join()
+
+def run_writer(log_file, max_bytes, max_age, backup_count, input_fd=0):
+    """
+    Copy input_fd into a rotating log until end of file
+
+    Args:
+        log_file (str): Path of the active log file
+        max_bytes (int): Rotation size
+        max_age (int): Rotation age in seconds
+        backup_count (int): Rotated segments to keep
+        input_fd (int): File descriptor to read from
+    """
+    writer = RotatingWriter(log_file, max_bytes, max_age, backup_count)
+    try:
+        while True:
+            data = os.read(input_fd, READ_CHUNK_SIZE)
+            if not data:
+                break
+            writer.write(data)
+    finally:
+        writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Write stdin to a rotating log file")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE)
+    parser.add_argument("--backup-count", type=int, default=DEFAULT_BACKUP_COUNT)
+    parser.add_argument("log_file")
+    args = parser.parse_args()
+
+    run_writer(args.log_file, args.max_bytes, args.max_age, args.backup_count)
+
+if __name__ == "__main__":
+    main()
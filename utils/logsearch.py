@@ -0,0 +1,283 @@
+import os
+import re
+import mmap
+import queue
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.installer import get_logs_dir
+from utils.logtail import get_log_segments, get_segment_number, open_segment
+
+# Timestamp at the start of a log line, e.g. "2024-05-01 12:00:00" or "[2024-05-01T12:00:00"
+TIMESTAMP_PATTERN = re.compile(rb"\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})")
+
+# Start time encoded in log file names: <version>_<YYYYmmdd_HHMMSS>[_<n>].log
+LOG_NAME_PATTERN = re.compile(r"^(?P<version>.+)_(?P<started>\d{8}_\d{6})(?:_\d+)?\.log")
+
+DEFAULT_SEARCH_JOBS = 4
+
+RELATIVE_TIME_PATTERN = re.compile(r"^(\d+)([smhdw])$")
+RELATIVE_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+def parse_time(value):
+    """
+    Parse a --since/--until value
+
+    Args:
+        value (str): Relative duration ("30m", "2h", "7d") or ISO date/time
+
+    Returns:
+        datetime: Absolute local time
+
+    Raises:
+        ValueError: If the value can't be parsed
+    """
+    match = RELATIVE_TIME_PATTERN.match(value.strip())
+    if match:
+        amount, unit = match.groups()
+        return datetime.now() - timedelta(**{RELATIVE_UNITS[unit]: int(amount)})
+    return datetime.fromisoformat(value.strip())
+
+def _parse_line_time(buffer, position, end):
+    """Parse the timestamp at the start of the line at position"""
+    match = TIMESTAMP_PATTERN.match(buffer, position, end)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(f"{match.group(1).decode()} {match.group(2).decode()}",
+                                 "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+def _next_timestamp(buffer, position, end):
+    """
+    Find the first timestamped line starting at position
+
+    Lines without a timestamp are skipped however many there are, so a long
+    stack trace can't hide the entries after it.
+
+    Returns:
+        tuple: (timestamp, offset of that line, offset after it) or (None, None, None)
+    """
+    while position < end:
+        newline = buffer.find(b"\n", position, end)
+        line_end = end if newline == -1 else newline + 1
+        timestamp = _parse_line_time(buffer, position, line_end)
+        if timestamp is not None:
+            return timestamp, position, line_end
+        position = line_end
+    return None, None, None
+
+def find_time_offset(buffer, size, target, after=False):
+    """
+    Binary search a log for the first line at (or after) a time
+
+    Log lines are assumed to be in time order; lines without a timestamp,
+    such as stack traces, belong to the entry before them.
+
+    Args:
+        buffer: mmap or bytes holding the log
+        size (int): Length of the buffer
+        target (datetime): Time to search for
+        after (bool): Find the first line strictly after target instead
+
+    Returns:
+        int: Byte offset of the first matching line (size if none)
+    """
+    # low and high are line starts; timestamped lines before low don't
+    # match, and the first match is found at or before high
+    low, high = 0, size
+    found = size
+    while low < high:
+        middle = (low + high) // 2
+        start = buffer.rfind(b"\n", low, middle) + 1 or low
+        timestamp, line_start, line_end = _next_timestamp(buffer, start, high)
+
+        if timestamp is None:
+            # Nothing timestamped from start on, the match is before it
+            high = start
+        elif timestamp > target if after else timestamp >= target:
+            found = high = line_start
+        else:
+            low = line_end
+
+    return found
+
+def _log_start_time(path):
+    """Get the start time encoded in a log file name"""
+    match = LOG_NAME_PATTERN.match(os.path.basename(path))
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group('started'), "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+def find_log_files(version=None, log_file=None, since=None, until=None):
+    """
+    Select the log files to search
+
+    Args:
+        version (str, optional): Only logs of this version
+        log_file (str, optional): Only this log and its rotated segments
+        since (datetime, optional): Skip files last written before this
+        until (datetime, optional): Skip logs started after this
+
+    Returns:
+        list: Paths of log files and segments
+    """
+    if log_file:
+        candidates = get_log_segments(log_file)
+    else:
+        logs_dir = get_logs_dir()
+        try:
+            names = sorted(os.listdir(logs_dir))
+        except OSError:
+            return []
+        candidates = [
+            os.path.join(logs_dir, name) for name in names
+            if name.endswith(".log") or get_segment_number(name) is not None
+        ]
+
+    files = []
+    for path in candidates:
+        match = LOG_NAME_PATTERN.match(os.path.basename(path))
+        if version and (not match or match.group('version') != version):
+            continue
+
+        started = _log_start_time(path)
+        if until and started and started > until:
+            continue
+
+        try:
+            if since and datetime.fromtimestamp(os.path.getmtime(path)) < since:
+                continue
+        except OSError:
+            continue
+
+        files.append(path)
+
+    return files
+
+def _open_buffer(path):
+    """
+    Open a log for searching
+
+    Plain files are memory-mapped, compressed segments are decompressed.
+
+    Returns:
+        tuple: (buffer, size, closer)
+    """
+    if path.endswith(".gz"):
+        with open_segment(path) as f:
+            data = f.read()
+        return data, len(data), lambda: None
+
+    f = open(path, 'rb')
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        f.close()
+        return b"", 0, lambda: None
+
+    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close():
+        buffer.close()
+        f.close()
+
+    return buffer, size, close
+
+def search_file(path, regex, since=None, until=None):
+    """
+    Search one log file
+
+    Args:
+        path (str): Log file or segment
+        regex (re.Pattern): Compiled bytes pattern
+        since (datetime, optional): Only lines at or after this time
+        until (datetime, optional): Only lines at or before this time
+
+    Yields:
+        str: Matching lines without their newline
+    """
+    buffer, size, close = _open_buffer(path)
+    try:
+        start = find_time_offset(buffer, size, since) if since else 0
+        end = find_time_offset(buffer, size, until, after=True) if until else size
+
+        position = start
+        while position < end:
+            match = regex.search(buffer, position, end)
+            if not match:
+                break
+
+            line_start = buffer.rfind(b"\n", start, match.start()) + 1
+            line_start = max(line_start, start)
+            newline = buffer.find(b"\n", match.end(), end)
+            line_end = end if newline == -1 else newline
+
+            yield buffer[line_start:line_end].decode('utf-8', errors='replace').rstrip("\r")
+            position = line_end + 1
+    finally:
+        close()
+
+def search_logs(pattern, files, since=None, until=None, ignore_case=False, jobs=DEFAULT_SEARCH_JOBS):
+    """
+    Search log files in parallel, streaming matches as they are found
+
+    Args:
+        pattern (str): Regular expression
+        files (list): Log files to search
+        since (datetime, optional): Only lines at or after this time
+        until (datetime, optional): Only lines at or before this time
+        ignore_case (bool): Case-insensitive matching
+        jobs (int): Number of files searched concurrently
+
+    Yields:
+        tuple: (path, line) for every matching line
+    """
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    regex = re.compile(pattern.encode('utf-8'), flags)
+
+    # Bounded so fast workers can't buffer unlimited matches ahead of the reader
+    results = queue.Queue(maxsize=1000)
+    cancelled = threading.Event()
+    done = object()
+
+    def worker(path):
+        try:
+            if cancelled.is_set():
+                return
+            for line in search_file(path, regex, since, until):
+                if cancelled.is_set():
+                    return
+                results.put((path, line))
+        except (OSError, ValueError):
+            pass
+        finally:
+            results.put(done)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+    futures = [executor.submit(worker, path) for path in files]
+
+    remaining = len(files)
+    try:
+        while remaining:
+            item = results.get()
+            if item is done:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        cancelled.set()
+        # Files not started yet are skipped; their workers never report done
+        remaining -= sum(future.cancel() for future in futures)
+        # Unblock workers waiting on a full queue
+        while remaining:
+            try:
+                if results.get(timeout=0.1) is done:
+                    remaining -= 1
+            except queue.Empty:
+                pass
+        executor.shutdown(wait=True)
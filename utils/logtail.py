@@ -0,0 +1,295 @@
+import os
+import re
+import sys
+import gzip
+import time
+import select
+import struct
+import platform
+
+# Bytes read per step when scanning a log backwards
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Seconds between checks when inotify is not available
+POLL_INTERVAL = 0.5
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Rotated segments are named <log>.<n> or <log>.<n>.gz, higher n is newer
+SEGMENT_PATTERN = re.compile(r"\.log\.(\d+)(\.gz)?$")
+
+def get_segment_number(name):
+    """
+    Get the sequence number of a rotated log segment
+
+    Returns:
+        int: Segment number or None if name is not a rotated segment
+    """
+    match = SEGMENT_PATTERN.search(name)
+    return int(match.group(1)) if match else None
+
+def get_log_segments(log_file):
+    """
+    List all segments of a log, oldest first
+
+    Args:
+        log_file (str): Path of the active log file
+
+    Returns:
+        list: Paths of the rotated segments followed by the active log
+    """
+    directory = os.path.dirname(log_file)
+    prefix = os.path.basename(log_file) + "."
+    segments = {}
+
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        names = []
+
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        number = get_segment_number(name)
+        # Prefer the uncompressed file while compression is in progress
+        if number is not None and (number not in segments or not name.endswith(".gz")):
+            segments[number] = os.path.join(directory, name)
+
+    paths = [segments[number] for number in sorted(segments)]
+    if os.path.exists(log_file):
+        paths.append(log_file)
+    return paths
+
+def open_segment(path):
+    """Open a log segment for binary reading, decompressing if needed"""
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+def tail_lines(path, lines):
+    """
+    Read the last lines of a file without reading the whole file
+
+    The file is read backwards in blocks until enough newlines are found,
+    so the cost depends on the size of the tail, not of the file.
+
+    Args:
+        path (str): File to read
+        lines (int): Number of lines to return
+
+    Returns:
+        str: The last lines of the file
+    """
+    if lines <= 0:
+        return ""
+
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        blocks = []
+        newlines = 0
+
+        # One newline more than requested guarantees the first wanted line is complete
+        while position > 0 and newlines <= lines:
+            size = min(TAIL_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(reversed(blocks))
+    return b"".join(data.splitlines(keepends=True)[-lines:]).decode('utf-8', errors='replace')
+
+def tail_log(log_file, lines):
+    """
+    Read the last lines of a log, across rotated segments if needed
+
+    Args:
+        log_file (str): Path of the active log file
+        lines (int): Number of lines to return
+
+    Returns:
+        str: The last lines of the log
+    """
+    parts = []
+    remaining = lines
+    for segment in reversed(get_log_segments(log_file)):
+        if remaining <= 0:
+            break
+
+        if segment.endswith(".gz"):
+            # Compressed segments can't be read backwards, they are size-capped though
+            with open_segment(segment) as f:
+                text = f.read().decode('utf-8', errors='replace')
+            text = "".join(text.splitlines(keepends=True)[-remaining:])
+        else:
+            text = tail_lines(segment, remaining)
+
+        if text and not text.endswith("\n") and parts:
+            text += "\n"
+        parts.append(text)
+        remaining -= len(text.splitlines())
+
+    return "".join(reversed(parts))
+
+def iter_log_chunks(log_file):
+    """
+    Stream the whole log, oldest segment first
+
+    Yields:
+        bytes: Chunks of log data
+    """
+    for segment in get_log_segments(log_file):
+        try:
+            with open_segment(segment) as f:
+                for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+                    yield chunk
+        except FileNotFoundError:
+            # Removed by retention or replaced by its compressed version meanwhile
+            continue
+
+class PollingWatcher:
+    """Wait for file changes by sleeping between checks"""
+
+    def __init__(self, path, interval=POLL_INTERVAL):
+        self.interval = interval
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Wait for changes of a file and its directory entry using Linux inotify"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, path):
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Watch the directory, so renames and re-creation by log rotation are seen too
+        directory = os.path.dirname(os.path.abspath(path)) or "."
+        mask = (self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO
+                | self.IN_CREATE | self.IN_DELETE)
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+        self.name = os.fsencode(os.path.basename(path))
+
+    def _drain(self):
+        """Read pending events and check if any concerns the watched file"""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return relevant
+
+            offset = 0
+            while offset + self.EVENT_HEADER.size <= len(data):
+                _, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if name.startswith(self.name):
+                    relevant = True
+
+    def wait(self, timeout=None):
+        """Block until the watched file changes or the timeout expires"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready or self._drain():
+                return
+
+    def close(self):
+        os.close(self.fd)
+
+def create_watcher(path):
+    """Create the most efficient file watcher available for path"""
+    if platform.system() == "Linux":
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(path)
+
+def follow(path, from_start=False, should_stop=None):
+    """
+    Stream lines appended to a file, like ``tail -f``
+
+    Rotation is handled: when the path is replaced by a new file, the rest of
+    the old file is read before switching, and truncation restarts from the
+    beginning.
+
+    Args:
+        path (str): File to follow
+        from_start (bool): Stream existing content too instead of only new lines
+        should_stop (callable, optional): Returns True to end the stream
+
+    Yields:
+        str: Complete lines, including their newline
+    """
+    watcher = create_watcher(path)
+    f = open(path, 'rb')
+    if not from_start:
+        f.seek(0, os.SEEK_END)
+
+    pending = b""
+    try:
+        while should_stop is None or not should_stop():
+            chunk = f.read(READ_CHUNK_SIZE)
+            if chunk:
+                pending += chunk
+                *complete, pending = pending.split(b"\n")
+                for line in complete:
+                    yield line.decode('utf-8', errors='replace') + "\n"
+                continue
+
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+
+            if current is not None and current.st_ino != os.fstat(f.fileno()).st_ino:
+                # Rotated: the old file is fully read, continue with the new one
+                if pending:
+                    yield pending.decode('utf-8', errors='replace') + "\n"
+                    pending = b""
+                f.close()
+                f = open(path, 'rb')
+                continue
+
+            if current is not None and current.st_size < f.tell():
+                # Truncated in place
+                f.seek(0)
+                continue
+
+            watcher.wait(POLL_INTERVAL * 2)
+    finally:
+        f.close()
+        watcher.close()
+
+def copy_to_stdout(log_file):
+    """Write a whole log to stdout without decoding or buffering it in memory"""
+    out = sys.stdout.buffer
+    for chunk in iter_log_chunks(log_file):
+        out.write(chunk)
+    out.flush()
@@ -0,0 +1,300 @@
+import os
+import re
+import sys
+import mmap
+import time
+import struct
+import platform
+import subprocess
+
+from utils.paths import get_fg_dir
+
+# Seconds between samples taken by the background sampler
+DEFAULT_SAMPLE_INTERVAL = 10
+
+# Samples kept per instance, one week at the default interval
+DEFAULT_CAPACITY = 7 * 24 * 60 * 60 // DEFAULT_SAMPLE_INTERVAL
+
+# Metric files not written for this many seconds are deleted
+METRICS_RETENTION = 30 * 24 * 60 * 60
+
+# The sampler exits after the registry has been empty for this many seconds
+SAMPLER_IDLE_EXIT = 60
+
+# File layout: header followed by a ring of fixed-size records
+# header: magic, capacity, interval (ms), next index, count, create time, version
+HEADER = struct.Struct("<8sIIQQd64s")
+# record: timestamp, CPU percent, RSS bytes
+RECORD = struct.Struct("<dfQ")
+MAGIC = b"FGRING01"
+
+DURATION_PATTERN = re.compile(r"^(\d+)([smhdw])$")
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+def get_metrics_dir():
+    """Returns the directory holding the metric files"""
+    return os.path.join(get_fg_dir(), "metrics")
+
+def get_metrics_path(pid, create_time):
+    """Returns the metric file of a process instance"""
+    return os.path.join(get_metrics_dir(), f"{pid}_{int((create_time or 0) * 1000)}.ring")
+
+class RingBuffer:
+    """
+    Fixed-size time series of CPU and RSS samples in a memory-mapped file
+
+    The file never grows: once full, the oldest sample is overwritten.
+    """
+
+    def __init__(self, path, version=None, create_time=None, capacity=DEFAULT_CAPACITY,
+                 interval=DEFAULT_SAMPLE_INTERVAL, writable=False):
+        self.path = path
+        exists = os.path.exists(path)
+        if not exists and not writable:
+            raise FileNotFoundError(path)
+
+        mode = 'r+b' if exists else 'w+b'
+        self._file = open(path, mode if writable else 'rb')
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, capacity, int(interval * 1000), 0, 0,
+                                         create_time or 0, (version or "").encode()[:64]))
+            self._file.truncate(HEADER.size + capacity * RECORD.size)
+
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+        magic, self.capacity, interval_ms, _, _, self.create_time, version_bytes = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a metrics file: {path}")
+        self.interval = interval_ms / 1000
+        self.version = version_bytes.rstrip(b"\0").decode()
+
+    def _position(self):
+        return HEADER.unpack_from(self._map, 0)[3:5]
+
+    def append(self, timestamp, cpu_percent, rss):
+        """Add a sample, overwriting the oldest one when full"""
+        index, count = self._position()
+        RECORD.pack_into(self._map, HEADER.size + index * RECORD.size, timestamp, cpu_percent, rss)
+        # Update the header after the record so readers never see an unwritten slot
+        struct.pack_into("<QQ", self._map, 16, (index + 1) % self.capacity, min(count + 1, self.capacity))
+
+    def samples(self, since=None):
+        """
+        Read samples in chronological order
+
+        Args:
+            since (float, optional): Only samples taken at or after this timestamp
+
+        Returns:
+            list: (timestamp, cpu_percent, rss) tuples
+        """
+        index, count = self._position()
+        start = (index - count) % self.capacity
+        records = memoryview(self._map)[HEADER.size:HEADER.size + self.capacity * RECORD.size]
+        ordered = list(RECORD.iter_unpack(records))
+        records.release()
+
+        if count < self.capacity:
+            ordered = ordered[:count]
+        else:
+            ordered = ordered[start:] + ordered[:start]
+
+        if since is not None:
+            ordered = [sample for sample in ordered if sample[0] >= since]
+        return ordered
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def list_metric_files(pid=None, version=None):
+    """
+    Find the metric files of a process or version
+
+    Args:
+        pid (int, optional): Only files of this PID
+        version (str, optional): Only files of this version
+
+    Returns:
+        list: (path, version, create_time) tuples, newest first
+    """
+    try:
+        names = os.listdir(get_metrics_dir())
+    except OSError:
+        return []
+
+    files = []
+    for name in names:
+        if not name.endswith(".ring"):
+            continue
+        if pid is not None and not name.startswith(f"{pid}_"):
+            continue
+
+        path = os.path.join(get_metrics_dir(), name)
+        try:
+            ring = RingBuffer(path)
+        except (OSError, ValueError, struct.error):
+            continue
+        try:
+            if version is None or ring.version == version:
+                files.append((path, ring.version, ring.create_time))
+        finally:
+            ring.close()
+
+    return sorted(files, key=lambda item: item[2], reverse=True)
+
+def parse_duration(value):
+    """
+    Parse a window such as "5m", "1h" or "7d"
+
+    Returns:
+        int: Seconds
+
+    Raises:
+        ValueError: If the value can't be parsed
+    """
+    match = DURATION_PATTERN.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {value}")
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+def summarize(values):
+    """
+    Summarize a series
+
+    Returns:
+        dict: 'min', 'avg', 'p95' and 'max', or None for an empty series
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        'min': ordered[0],
+        'avg': sum(ordered) / len(ordered),
+        'p95': percentile(ordered, 0.95),
+        'max': ordered[-1]
+    }
+
+def _try_lock(f):
+    """Take an exclusive non-blocking lock on an open file"""
+    try:
+        if platform.system() == "Windows":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def get_sampler_lock_path():
+    """Returns the lock file held by the running sampler"""
+    return os.path.join(get_metrics_dir(), "sampler.lock")
+
+def is_sampler_running():
+    """Check if a background sampler holds the lock"""
+    os.makedirs(get_metrics_dir(), exist_ok=True)
+    with open(get_sampler_lock_path(), 'a+') as f:
+        # Closing the file releases the lock again if we got it
+        return not _try_lock(f)
+
+def ensure_sampler_running(fg_root):
+    """
+    Start the background sampler unless one is already running
+
+    Args:
+        fg_root (str): Directory containing fg.py, the sampler is run from here
+    """
+    if is_sampler_running():
+        return
+
+    kwargs = {'start_new_session': True} if platform.system() != "Windows" else {}
+    subprocess.Popen([sys.executable, "-m", "utils.metrics"], cwd=fg_root,
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, **kwargs)
+
+def prune_metric_files(retention=METRICS_RETENTION):
+    """Delete metric files that have not been written to for a long time"""
+    cutoff = time.time() - retention
+    for name in os.listdir(get_metrics_dir()):
+        path = os.path.join(get_metrics_dir(), name)
+        try:
+            if name.endswith(".ring") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def run_sampler(interval=DEFAULT_SAMPLE_INTERVAL, idle_exit=SAMPLER_IDLE_EXIT):
+    """
+    Record CPU and RSS of every registered instance until none are left
+
+    Only one sampler runs at a time, a second one exits immediately.
+
+    Args:
+        interval (float): Seconds between samples
+        idle_exit (float): Exit once no instance has been running this long
+    """
+    from utils.registry import list_processes
+    from utils.sampler import ProcessSampler
+
+    os.makedirs(get_metrics_dir(), exist_ok=True)
+    lock_file = open(get_sampler_lock_path(), 'a+')
+    if not _try_lock(lock_file):
+        return
+
+    prune_metric_files()
+    sampler = ProcessSampler()
+    rings = {}
+    idle_since = None
+
+    try:
+        while True:
+            started = time.time()
+            entries = list_processes()
+
+            if entries:
+                idle_since = None
+            elif idle_since is None:
+                idle_since = started
+            elif started - idle_since >= idle_exit:
+                return
+
+            samples = sampler.sample(entries, interval=0)
+            active = set()
+            for entry in entries:
+                sample = samples.get(entry['pid'])
+                if sample is None:
+                    continue
+
+                key = (entry['pid'], entry.get('create_time'))
+                active.add(key)
+                ring = rings.get(key)
+                if ring is None:
+                    ring = RingBuffer(get_metrics_path(*key), version=entry['version'],
+                                      create_time=entry.get('create_time'), interval=interval,
+                                      writable=True)
+                    rings[key] = ring
+                ring.append(started, sample['cpu_percent'], sample['rss'])
+
+            for key in list(rings):
+                if key not in active:
+                    rings.pop(key).close()
+
+            time.sleep(max(0, interval - (time.time() - started)))
+    finally:
+        for ring in rings.values():
+            ring.close()
+        lock_file.close()
+
+if __name__ == "__main__":
+    run_sampler()
@@ -0,0 +1,133 @@
+import os
+import time
+
+from rich.console import Console
+
+from utils.appcds import (
+    MIN_JAVA_VERSION,
+    get_java_version,
+    get_archive_path,
+    save_metadata,
+    remove_archive
+)
+from utils.process import prepare_launch, spawn_instance, create_log_file, stop_applications
+from utils.readiness import get_readiness_probe, wait_until_ready
+from utils.registry import register_process
+from utils.replicas import allocate_replicas, load_manifest
+
+console = Console()
+
+# Seconds the training run keeps going after it became ready
+DEFAULT_TRAINING_DURATION = 10
+
+# The JVM writes the archive while exiting, which can take a while
+TRAINING_STOP_TIMEOUT = 120
+
+def run_instance(version, probe, duration, jvm_options=None, use_archive=True):
+    """
+    Run an instance until it is ready (or for a fixed time) and stop it
+
+    Args:
+        version (str): Version to run
+        probe (dict): Readiness probe, or None to just run for duration
+        duration (float): Seconds to keep running after becoming ready
+        jvm_options (list, optional): Extra options passed to java
+        use_archive (bool): Use the version's CDS archive
+
+    Returns:
+        tuple: (seconds to ready or None, error message or None)
+    """
+    slot, port = allocate_replicas(load_manifest(version), 1)[0]
+    variables = {'replica': slot, 'port': port, 'version': version}
+    launch = prepare_launch(version, variables, jvm_options, use_archive)
+    if launch is None:
+        return None, "can't be started"
+
+    log_file = create_log_file(version)
+    started = time.monotonic()
+    process = spawn_instance(launch, log_file)
+    register_process(process.pid, version, time.time(), log_file, port)
+
+    try:
+        if probe is not None:
+            ready, error = wait_until_ready(probe, process.pid, variables)
+            if not ready:
+                return None, error
+        elapsed = time.monotonic() - started
+        time.sleep(duration)
+        return elapsed, None
+    finally:
+        stop_applications([process.pid], timeout=TRAINING_STOP_TIMEOUT)
+
+def optimize_version(version, duration=DEFAULT_TRAINING_DURATION, measure=True):
+    """
+    Create an AppCDS archive for a version with a training run
+
+    The training run starts the version with -XX:ArchiveClassesAtExit, lets
+    it become ready and run for a while, then stops it; the JVM writes the
+    classes it loaded into the archive on exit. Later starts with the same
+    Java and classpath map the archive instead of loading those classes.
+
+    Args:
+        version (str): Version to optimize
+        duration (float): Seconds the training run keeps going after it became ready
+        measure (bool): Measure startup time without and with the archive
+
+    Returns:
+        dict: Startup timings ('before' and 'after' seconds), or None on failure
+    """
+    launch = prepare_launch(version, use_archive=False)
+    if launch is None:
+        return None
+
+    java_path = launch['java']
+    if java_path is None:
+        console.print(f"[bold red]No Java binary found in the run command of version {version}[/bold red]")
+        return None
+
+    major, java_version = get_java_version(java_path)
+    if major is None or major < MIN_JAVA_VERSION:
+        console.print(f"[bold red]Class data sharing archives need Java {MIN_JAVA_VERSION} or later "
+                      f"(found: {java_version or 'unknown'})[/bold red]")
+        return None
+
+    probe = get_readiness_probe(launch['manifest'])
+    if probe is None and measure:
+        console.print("[yellow]No readiness probe in the manifest, startup time is not measured[/yellow]")
+        measure = False
+
+    timings = {}
+    if measure:
+        console.print("Measuring startup time without archive...", style="cyan")
+        timings['before'], error = run_instance(version, probe, 0, use_archive=False)
+        if error:
+            console.print(f"[bold red]Instance did not start: {error}[/bold red]")
+            return None
+
+    version_dir = launch['version_dir']
+    new_archive = get_archive_path(version_dir) + ".new"
+    console.print("Training run...", style="cyan")
+    _, error = run_instance(version, probe, duration,
+                            jvm_options=[f"-XX:ArchiveClassesAtExit={new_archive}"], use_archive=False)
+    if error or not os.path.exists(new_archive):
+        console.print(f"[bold red]Training run failed: {error or 'no archive was written'}[/bold red]")
+        try:
+            os.remove(new_archive)
+        except FileNotFoundError:
+            pass
+        return None
+
+    remove_archive(version_dir)
+    os.replace(new_archive, get_archive_path(version_dir))
+    save_metadata(version_dir, java_path, java_version, launch['classpath'], timings)
+
+    if measure:
+        console.print("Measuring startup time with archive...", style="cyan")
+        timings['after'], error = run_instance(version, probe, 0)
+        if error:
+            console.print(f"[bold red]Instance did not start with the archive: {error}[/bold red]")
+            remove_archive(version_dir)
+            return None
+        save_metadata(version_dir, java_path, java_version, launch['classpath'], timings)
+
+    return timings
@@ -0,0 +1,17 @@
+import os
+
+def get_fg_dir():
+    """Returns the fg directory in user's home"""
+    return os.path.join(os.path.expanduser("~"), ".fg")
+
+def get_versions_dir():
+    """Returns the versions directory"""
+    return os.path.join(get_fg_dir(), "versions")
+
+def get_logs_dir():
+    """Returns the logs directory"""
+    return os.path.join(get_fg_dir(), "logs")
+
+def get_manifest_path(version):
+    """Returns the path to the manifest file for a specific version"""
+    return os.path.join(get_versions_dir(), version, "fgmanifest.json")
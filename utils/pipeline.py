@@ -0,0 +1,267 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from rich.console import Console
+from rich.progress import Progress, TextColumn, BarColumn, TimeElapsedColumn
+
+from utils.github import download_version
+from utils.downloader import DEFAULT_JOBS, download_file, get_session
+from utils.cache import get_jar_cache_dir, get_blob_path, lookup_artifact, store_artifact, link_file
+from utils.installer import (
+    get_versions_dir,
+    stage_version,
+    commit_version,
+    get_dependency_url,
+    print_reuse_summary
+)
+from utils.fileindex import FileIndex
+
+console = Console()
+
+# Concurrent version downloads and extractions; dependency downloads use --jobs
+DEFAULT_DOWNLOAD_JOBS = 2
+DEFAULT_EXTRACT_JOBS = 2
+
+def _artifact_key(dep):
+    return (dep['groupId'], dep['artifactId'], dep['version'])
+
+def _jar_name(dep):
+    return f"{dep['artifactId']}-{dep['version']}.jar"
+
+class InstallPipeline:
+    """
+    Installs several versions with their stages overlapping
+
+    Each version goes through download, extraction and dependency fetch,
+    and each stage has its own worker pool, so one version can be extracted
+    while the next is still downloading and a third fetches its jars.
+    Dependencies are fetched once per artifact: a jar wanted by several
+    versions is downloaded by the first and the others wait for the same
+    download, then link it from the shared cache.
+    """
+
+    def __init__(self, progress, jobs=DEFAULT_JOBS, download_jobs=DEFAULT_DOWNLOAD_JOBS,
+                 extract_jobs=DEFAULT_EXTRACT_JOBS, file_index=None):
+        self.progress = progress
+        self.file_index = file_index
+        self.downloads = ThreadPoolExecutor(max_workers=download_jobs, thread_name_prefix="fg-download")
+        self.extractions = ThreadPoolExecutor(max_workers=extract_jobs, thread_name_prefix="fg-extract")
+        self.artifacts = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="fg-artifact")
+        self.session = get_session(jobs)
+
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.artifact_downloads = 0
+        self.tasks = {}
+        self.results = {}
+        self.remaining = 0
+        self.finished = threading.Event()
+        self.stats = {'downloaded': 0, 'cached': 0, 'shared': 0, 'failed': []}
+
+        # Jars are downloaded next to the cache so they can be hard-linked into it
+        os.makedirs(get_jar_cache_dir(), exist_ok=True)
+        self.incoming_dir = tempfile.mkdtemp(prefix=".incoming-", dir=get_jar_cache_dir())
+        self.artifacts_task = progress.add_task("dependencies", total=0, stage="")
+
+    def run(self, versions):
+        """
+        Install versions and wait for all of them
+
+        Returns:
+            dict: Version to True if it was installed
+        """
+        self.remaining = len(versions)
+        for version in versions:
+            self.tasks[version] = self.progress.add_task(version, total=3, stage="queued")
+            self.downloads.submit(self._download, version)
+
+        try:
+            if versions:
+                self.finished.wait()
+        finally:
+            for executor in (self.downloads, self.extractions, self.artifacts):
+                executor.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(self.incoming_dir, ignore_errors=True)
+        return self.results
+
+    def _set_stage(self, version, stage, advance=0):
+        self.progress.update(self.tasks[version], stage=stage, advance=advance)
+
+    def _update_artifacts(self):
+        stats = self.stats
+        stage = f"{stats['downloaded']} downloaded, {stats['cached']} cached, {stats['shared']} shared"
+        if stats['failed']:
+            stage += f", [red]{len(stats['failed'])} failed[/red]"
+        self.progress.update(self.artifacts_task, stage=stage)
+
+    def _finish(self, version, success, staging_dir=None):
+        if staging_dir and os.path.exists(staging_dir):
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+        self._set_stage(version, "[green]installed[/green]" if success else "[bold red]failed[/bold red]")
+        with self.lock:
+            self.results[version] = success
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.finished.set()
+
+    def _download(self, version):
+        try:
+            self._set_stage(version, "downloading")
+            zip_path = download_version(version)
+        except Exception as e:
+            console.print(f"[bold red]Error downloading version {version}: {str(e)}[/bold red]")
+            zip_path = None
+
+        if not zip_path:
+            self._finish(version, False)
+            return
+        self._set_stage(version, "waiting to extract", advance=1)
+        self.extractions.submit(self._extract, version, zip_path)
+
+    def _extract(self, version, zip_path):
+        staging_dir = None
+        try:
+            self._set_stage(version, "extracting")
+            staging_dir, manifest = stage_version(zip_path, version, jobs=1, file_index=self.file_index)
+            if staging_dir is None:
+                self._finish(version, False)
+                return
+            dependencies = manifest.get('dependencies') or []
+        except Exception as e:
+            console.print(f"[bold red]Error installing version {version}: {str(e)}[/bold red]")
+            self._finish(version, False, staging_dir)
+            return
+
+        self.progress.update(self.tasks[version], total=3 + len(dependencies), advance=1)
+        if not dependencies:
+            self.extractions.submit(self._commit, version, staging_dir)
+            return
+
+        self._set_stage(version, f"dependencies 0/{len(dependencies)}")
+        libs_dir = os.path.join(staging_dir, "libs")
+        os.makedirs(libs_dir, exist_ok=True)
+
+        state = {'left': len(dependencies)}
+
+        def on_artifact(dep, future):
+            self._link_artifact(version, dep, future, os.path.join(libs_dir, _jar_name(dep)))
+            with self.lock:
+                state['left'] -= 1
+                left = state['left']
+            self._set_stage(version, f"dependencies {len(dependencies) - left}/{len(dependencies)}",
+                            advance=1)
+            if left == 0:
+                self.extractions.submit(self._commit, version, staging_dir)
+
+        for dep in dependencies:
+            future = self._fetch_artifact(dep)
+            future.add_done_callback(lambda future, dep=dep: on_artifact(dep, future))
+
+    def _fetch_artifact(self, dep):
+        """Get the future of an artifact, joining a download already in flight"""
+        key = _artifact_key(dep)
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.stats['shared'] += 1
+            else:
+                cached_path = lookup_artifact(dep)
+                if cached_path:
+                    self.stats['cached'] += 1
+                    future = Future()
+                    future.set_result(cached_path)
+                else:
+                    future = self.artifacts.submit(self._download_artifact, dep)
+                    self.artifact_downloads += 1
+                    self.progress.update(self.artifacts_task, total=self.artifact_downloads)
+                self.in_flight[key] = future
+        self._update_artifacts()
+        return future
+
+    def _download_artifact(self, dep):
+        """Download a jar into the shared cache, returning the path to link from"""
+        incoming_path = os.path.join(self.incoming_dir, "-".join(_artifact_key(dep)) + ".jar")
+        try:
+            download_file(get_dependency_url(dep), incoming_path, self.session)
+        finally:
+            self.progress.update(self.artifacts_task, advance=1)
+
+        with self.lock:
+            self.stats['downloaded'] += 1
+        self._update_artifacts()
+
+        try:
+            return get_blob_path(store_artifact(dep, incoming_path))
+        except OSError as e:
+            console.print(f"[yellow]Warning: Failed to cache {_jar_name(dep)}: {str(e)}[/yellow]")
+            return incoming_path
+
+    def _link_artifact(self, version, dep, future, jar_path):
+        """Put a fetched artifact into a version; failures are reported like install_dependencies does"""
+        try:
+            link_file(future.result(), jar_path)
+        except Exception as e:
+            with self.lock:
+                self.stats['failed'].append((version, _jar_name(dep), str(e)))
+            self._update_artifacts()
+            console.print(f"[bold red]Error downloading dependency {_jar_name(dep)} "
+                          f"for {version}: {str(e)}[/bold red]")
+
+    def _commit(self, version, staging_dir):
+        try:
+            self._set_stage(version, "committing")
+            commit_version(staging_dir, version, self.file_index)
+        except Exception as e:
+            console.print(f"[bold red]Error installing version {version}: {str(e)}[/bold red]")
+            self._finish(version, False, staging_dir)
+            return
+        self.progress.update(self.tasks[version], advance=1)
+        self._finish(version, True)
+
+def install_versions(versions, jobs=DEFAULT_JOBS, download_jobs=DEFAULT_DOWNLOAD_JOBS,
+                     extract_jobs=DEFAULT_EXTRACT_JOBS, incremental=False):
+    """
+    Install several versions at once with a pipelined install
+
+    Args:
+        versions (list): Versions to install
+        jobs (int): Maximum number of concurrent dependency downloads
+        download_jobs (int): Maximum number of concurrent version downloads
+        extract_jobs (int): Maximum number of concurrent extractions
+        incremental (bool): Link files that already exist in installed
+            versions instead of extracting them
+
+    Returns:
+        dict: Summary with 'installed', 'failed', 'artifacts' and 'elapsed' keys
+    """
+    versions = list(dict.fromkeys(versions))
+    started = time.monotonic()
+    file_index = FileIndex.load(get_versions_dir()) if incremental else None
+
+    progress = Progress(
+        TextColumn("[bold cyan]{task.description:<14}"),
+        BarColumn(),
+        TextColumn("{task.completed:.0f}/{task.total:.0f}"),
+        TextColumn("{task.fields[stage]}"),
+        TimeElapsedColumn(),
+        console=console
+    )
+    with progress:
+        pipeline = InstallPipeline(progress, jobs, download_jobs, extract_jobs, file_index)
+        results = pipeline.run(versions)
+
+    if file_index is not None:
+        print_reuse_summary(file_index)
+        file_index.save()
+
+    return {
+        'installed': [version for version in versions if results.get(version)],
+        'failed': [version for version in versions if not results.get(version)],
+        'artifacts': pipeline.stats,
+        'elapsed': time.monotonic() - started
+    }
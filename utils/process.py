@@ -1,63 +1,168 @@
 import os
 import json
 import time
-import psutil
+import shlex
 import platform
 import subprocess
 from datetime import datetime
 from rich.console import Console
 
-from utils.installer import get_fg_dir, get_versions_dir, get_logs_dir, get_manifest_path
+from utils.paths import get_versions_dir, get_logs_dir, get_manifest_path
+from utils.registry import (
+    register_process,
+    unregister_processes,
+    get_process,
+    list_processes,
+    is_alive
+)
+from utils.sampler import DEFAULT_INTERVAL, get_default_sampler
+from utils.logtail import tail_log, iter_log_chunks
 
 console = Console()
 
-# File to store running processes information
-PROCESSES_FILE = os.path.join(get_fg_dir(), "processes.json")
+# Directory containing fg.py, helper processes are run from here
+FG_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-def load_processes():
-    """Load information about running processes"""
-    if os.path.exists(PROCESSES_FILE):
-        try:
-            with open(PROCESSES_FILE, 'r') as f:
-                processes = json.load(f)
-            
-            # Filter out processes that are no longer running
-            valid_processes = {}
-            for pid_str, process_info in processes.items():
-                pid = int(pid_str)
-                if psutil.pid_exists(pid):
-                    try:
-                        # Check if it's our process
-                        proc = psutil.Process(pid)
-                        if proc.is_running():
-                            valid_processes[pid_str] = process_info
-                    except:
-                        pass
-            
-            return valid_processes
-        except Exception as e:
-            console.print(f"[yellow]Warning: Failed to load processes file: {str(e)}[/yellow]")
-    
-    return {}
+# Forward start/stop/status/logs to the fg daemon when it is running.
+# The daemon itself turns this off, it implements those requests.
+DELEGATE_TO_DAEMON = True
+
+# Seconds instances get to exit after SIGTERM before they are killed
+STOP_TIMEOUT = 5
+
+# Seconds to wait for killed instances to go away
+KILL_TIMEOUT = 2
+
+# Seconds between checks for instances that exited but were not reaped
+WAIT_SLICE = 0.2
 
-def save_processes(processes):
-    """Save information about running processes"""
+def load_processes(version=None):
+    """
+    Load information about running processes
+    
+    Args:
+        version (str, optional): Only load processes of this version
+    
+    Returns:
+        dict: Registry entries keyed by PID string
+    """
     try:
-        with open(PROCESSES_FILE, 'w') as f:
-            json.dump(processes, f, indent=2)
+        return {str(entry['pid']): entry for entry in list_processes(version)}
     except Exception as e:
-        console.print(f"[yellow]Warning: Failed to save processes file: {str(e)}[/yellow]")
+        console.print(f"[yellow]Warning: Failed to load process registry: {str(e)}[/yellow]")
+        return {}
 
-def start_application(version):
+def start_log_writer(log_file, settings):
     """
-    Start the application for a specific version
+    Start the process writing an instance's output to its rotating log
     
     Args:
-        version (str): Version to start
-        
+        log_file (str): Path of the active log file
+        settings (dict): Log rotation settings
+    
     Returns:
-        int: Process ID if successful, None otherwise
+        int: Write end of the pipe to pass to the application as stdout
+    """
+    from utils.logrotate import build_writer_command
+    
+    read_fd, write_fd = os.pipe()
+    try:
+        # Detached, so it outlives fg and is not hit by Ctrl+C in the terminal
+        kwargs = {'start_new_session': True} if platform.system() != "Windows" else {}
+        subprocess.Popen(build_writer_command(log_file, settings), stdin=read_fd,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                         cwd=FG_ROOT, **kwargs)
+    except Exception:
+        os.close(write_fd)
+        raise
+    finally:
+        os.close(read_fd)
+    
+    return write_fd
+
+def create_log_file(version):
+    """
+    Create a new, uniquely named log file for an instance
+    
+    Args:
+        version (str): Version of the instance
+    
+    Returns:
+        str: Path of the log file
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(get_logs_dir(), f"{version}_{timestamp}")
+    
+    attempt = 1
+    while True:
+        # Several instances may start within the same second
+        log_file = f"{base}.log" if attempt == 1 else f"{base}_{attempt}.log"
+        try:
+            os.close(os.open(log_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return log_file
+        except FileExistsError:
+            attempt += 1
+
+def split_command(command):
+    """
+    Split a run command into arguments, the way the platform's shell would
+    
+    Args:
+        command (str): Command line
+    
+    Returns:
+        list: Arguments, without their quotes
+    """
+    if platform.system() != "Windows":
+        return shlex.split(command)
+    
+    args = []
+    for arg in shlex.split(command, posix=False):
+        if len(arg) >= 2 and arg[0] == arg[-1] == '"':
+            arg = arg[1:-1]
+        args.append(arg)
+    return args
+
+def join_command(args):
+    """Quote arguments back into a command line for the platform's parser"""
+    if platform.system() == "Windows":
+        return subprocess.list2cmdline(args)
+    return shlex.join(args)
+
+def render_template(value, variables):
+    """
+    Replace {name} placeholders of known variables, other braces are left alone
+    
+    Args:
+        value (str): Template
+        variables (dict): Placeholder values
+    
+    Returns:
+        str: Rendered value
+    """
+    for name, replacement in variables.items():
+        value = value.replace("{" + name + "}", str(replacement))
+    return value
+
+def prepare_launch(version, variables=None, jvm_options=None, use_archive=True):
+    """
+    Work out how to run a version
+    
+    Args:
+        version (str): Version to run
+        variables (dict, optional): Values for placeholders such as {port} in
+            the run command and the manifest's replica environment
+        jvm_options (list, optional): Extra options passed to java
+        use_archive (bool): Use the version's class data sharing archive if it is valid
+    
+    Returns:
+        dict: Launch description with 'version', 'version_dir', 'manifest',
+            'args', 'run_command', 'java', 'classpath', 'env' and 'port' keys,
+            or None if the version can't be started
     """
+    from utils.appcds import find_java, find_java_index, get_java_major, get_archive_options
+    from utils.classpath import get_classpath, get_classpath_options, has_classpath_option
+    
     version_dir = os.path.join(get_versions_dir(), version)
     manifest_path = get_manifest_path(version)
     
@@ -65,62 +170,123 @@ def start_application(version):
         console.print(f"[bold red]Version {version} is not installed[/bold red]")
         return None
     
+    # Load manifest
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    
+    # Get run command from manifest
+    run_command = manifest.get('runCommand')
+    if not run_command:
+        console.print(f"[bold red]No run command found in manifest for version {version}[/bold red]")
+        return None
+    
+    args = split_command(run_command)
+    java_index = find_java_index(args)
+    java_path = find_java(args, version_dir)
+    
+    # Classpath including dependencies, precomputed at install time
+    classpath = get_classpath(version_dir, version)
+    
+    if java_index is not None:
+        options = []
+        if not has_classpath_option(args[java_index + 1:]):
+            java_version = get_java_major(java_path) if java_path else None
+            options.extend(get_classpath_options(version_dir, classpath, java_version))
+        options.extend(jvm_options or [])
+        # Class data sharing archive from `fg optimize`
+        if use_archive:
+            options.extend(get_archive_options(version_dir, java_path, classpath))
+        args[java_index + 1:java_index + 1] = options
+    
+    # Per-replica settings, e.g. {"SERVER_PORT": "{port}"}
+    env = {}
+    if variables:
+        args = [render_template(arg, variables) for arg in args]
+        for name, value in manifest.get('replicas', {}).get('env', {}).items():
+            env[name] = render_template(str(value), variables)
+    
+    return {
+        'version': version,
+        'version_dir': version_dir,
+        'manifest': manifest,
+        'args': args,
+        'run_command': join_command(args),
+        'java': java_path,
+        'classpath': classpath,
+        'env': env,
+        'port': (variables or {}).get('port')
+    }
+
+def spawn_instance(launch, log_file):
+    """
+    Start an instance with its output going to a rotating log
+    
+    Args:
+        launch (dict): Launch description from prepare_launch
+        log_file (str): Path of the instance log file
+    
+    Returns:
+        subprocess.Popen: The started process
+    """
+    from utils.logrotate import get_rotation_settings
+    
+    # The application writes into a pipe, the log writer owns the file and rotates it
+    log_pipe = start_log_writer(log_file, get_rotation_settings(launch['manifest']))
+    
+    env = dict(os.environ, **launch['env']) if launch.get('env') else None
+    
     try:
-        # Load manifest
-        with open(manifest_path, 'r') as f:
-            manifest = json.load(f)
+        if platform.system() == "Windows":
+            return subprocess.Popen(launch['run_command'], shell=True, cwd=launch['version_dir'],
+                                    stdout=log_pipe, stderr=subprocess.STDOUT, env=env)
+        else:
+            return subprocess.Popen(launch['args'], cwd=launch['version_dir'],
+                                    stdout=log_pipe, stderr=subprocess.STDOUT, env=env)
+    finally:
+        # Only the application keeps the write end, the writer stops at end of file
+        os.close(log_pipe)
+
+def start_application(version, variables=None):
+    """
+    Start the application for a specific version
+    
+    When the fg daemon is running, it starts and supervises the instance.
+    
+    Args:
+        version (str): Version to start
+        variables (dict, optional): Replica placeholder values, see prepare_launch
         
-        # Get run command from manifest
-        run_command = manifest.get('runCommand')
-        if not run_command:
-            console.print(f"[bold red]No run command found in manifest for version {version}[/bold red]")
+    Returns:
+        int: Process ID if successful, None otherwise
+    """
+    from utils.daemon_client import request as daemon_request, DaemonError
+    from utils.metrics import ensure_sampler_running
+    
+    if DELEGATE_TO_DAEMON:
+        try:
+            result = daemon_request("start", version=version, variables=variables)
+            if result is not None:
+                return result['pid']
+        except DaemonError as e:
+            console.print(f"[bold red]Error starting version {version}: {str(e)}[/bold red]")
+            return None
+    
+    try:
+        launch = prepare_launch(version, variables)
+        if launch is None:
             return None
         
-        # Create log file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = os.path.join(get_logs_dir(), f"{version}_{timestamp}.log")
-        
-        # Build classpath including dependencies
-        classpath = []
-        
-        # Add main jar
-        jar_name = f"java-app-{version}.jar"
-        jar_path = os.path.join(version_dir, jar_name)
-        if os.path.exists(jar_path):
-            classpath.append(jar_path)
-        
-        # Add dependency jars
-        libs_dir = os.path.join(version_dir, "libs")
-        if os.path.exists(libs_dir):
-            for jar in os.listdir(libs_dir):
-                if jar.endswith(".jar"):
-                    classpath.append(os.path.join(libs_dir, jar))
-        
-        # Modify the run command to include the classpath if it doesn't already
-        if "-cp" not in run_command and "-classpath" not in run_command:
-            classpath_str = os.pathsep.join(classpath)
-            run_command = run_command.replace("java ", f"java -cp {classpath_str} ")
-        
-        # Open log file
-        log_file_handle = open(log_file, 'w')
-        
-        # Split command into args for subprocess
-        if platform.system() == "Windows":
-            process = subprocess.Popen(run_command, shell=True, cwd=version_dir,
-                                      stdout=log_file_handle, stderr=subprocess.STDOUT)
-        else:
-            args = run_command.split()
-            process = subprocess.Popen(args, cwd=version_dir,
-                                      stdout=log_file_handle, stderr=subprocess.STDOUT)
+        log_file = create_log_file(version)
+        process = spawn_instance(launch, log_file)
         
         # Store process information
-        processes = load_processes()
-        processes[str(process.pid)] = {
-            'version': version,
-            'start_time': time.time(),
-            'log_file': log_file
-        }
-        save_processes(processes)
+        register_process(process.pid, version, time.time(), log_file, launch.get('port'))
+        
+        # Record resource usage history in the background
+        try:
+            ensure_sampler_running(FG_ROOT)
+        except Exception as e:
+            console.print(f"[yellow]Warning: Failed to start metrics sampler: {str(e)}[/yellow]")
         
         # Success message moved to command handler
         return process.pid
@@ -129,89 +295,245 @@ def start_application(version):
         console.print(f"[bold red]Error starting version {version}: {str(e)}[/bold red]")
         return None
 
-def stop_application(pid):
+def _wait_all(processes, timeout):
     """
-    Stop a running application
+    Wait for processes to exit with one shared deadline
+    
+    Processes that exited but were not reaped by their parent (e.g. an
+    instance orphaned to an init that doesn't reap) count as gone.
     
-    Args:
-        pid (int or str): Process ID to stop
-        
     Returns:
-        bool: True if successful
+        tuple: (gone, alive) lists of psutil.Process
     """
-    try:
-        pid = int(pid)
-        processes = load_processes()
+    import psutil
+    
+    deadline = time.monotonic() + timeout
+    gone, alive = [], list(processes)
+    while alive:
+        remaining = deadline - time.monotonic()
+        finished, alive = psutil.wait_procs(alive, timeout=max(0, min(WAIT_SLICE, remaining)))
+        gone.extend(finished)
         
-        if str(pid) not in processes:
-            console.print(f"[bold yellow]PID {pid} is not a managed application[/bold yellow]")
-            return False
+        still_alive = []
+        for process in alive:
+            try:
+                if process.status() == psutil.STATUS_ZOMBIE:
+                    gone.append(process)
+                    continue
+            except psutil.NoSuchProcess:
+                gone.append(process)
+                continue
+            still_alive.append(process)
+        alive = still_alive
         
-        # Try to terminate the process
+        if remaining <= 0:
+            break
+    
+    return gone, alive
+
+def _terminate_all(entries, timeout):
+    """
+    Stop processes we don't supervise: signal them all, then wait on them together
+    
+    Args:
+        entries (list): Registry entries
+        timeout (float): Shared deadline in seconds before stragglers are killed
+    
+    Returns:
+        dict: PID lists under 'stopped', 'killed', 'not_running' and 'failed'
+    """
+    import psutil
+    
+    result = {'stopped': [], 'killed': [], 'not_running': [], 'failed': []}
+    processes = []
+    
+    for info in entries:
         try:
-            process = psutil.Process(pid)
+            # Making sure the PID was not reused
+            if not is_alive(info):
+                raise psutil.NoSuchProcess(info['pid'])
+            process = psutil.Process(info['pid'])
             process.terminate()
-            process.wait(timeout=5)
-            
-            # If still running, force kill
-            if process.is_running():
-                process.kill()
-            
-            # Success message moved to command handler
+            processes.append(process)
         except psutil.NoSuchProcess:
-            console.print(f"[bold yellow]Process {pid} is no longer running[/bold yellow]")
-        except Exception as e:
-            console.print(f"[bold red]Error stopping process {pid}: {str(e)}[/bold red]")
-            return False
-        
-        # Remove from processes file
-        if str(pid) in processes:
-            del processes[str(pid)]
-            save_processes(processes)
+            result['not_running'].append(info['pid'])
+        except psutil.Error as e:
+            console.print(f"[bold red]Error stopping process {info['pid']}: {str(e)}[/bold red]")
+            result['failed'].append(info['pid'])
+    
+    gone, alive = _wait_all(processes, timeout)
+    result['stopped'].extend(process.pid for process in gone)
+    
+    # Force kill whatever ignored SIGTERM
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+    gone, alive = _wait_all(alive, KILL_TIMEOUT)
+    result['killed'].extend(process.pid for process in gone)
+    result['failed'].extend(process.pid for process in alive)
+    
+    return result
+
+def stop_applications(pids=None, version=None, timeout=STOP_TIMEOUT):
+    """
+    Stop several applications at once
+    
+    All targets are signalled together and share one deadline, so stopping
+    many instances takes about as long as stopping the slowest one.
+    
+    Args:
+        pids (list, optional): Process IDs to stop
+        version (str, optional): Stop all instances of this version
+        timeout (float): Seconds instances get to exit before they are killed
+    
+    Returns:
+        dict: PID lists under 'stopped', 'killed', 'not_running', 'failed'
+            and 'unknown' (not managed by fg)
+    """
+    from utils.daemon_client import request as daemon_request, DaemonError, REQUEST_TIMEOUT
+    
+    result = {'stopped': [], 'killed': [], 'not_running': [], 'failed': [], 'unknown': []}
+    
+    if pids is None:
+        entries = list_processes(version, validate=False)
+    else:
+        entries = []
+        for pid in pids:
+            info = get_process(pid)
+            if info is None or (version and info['version'] != version):
+                result['unknown'].append(int(pid))
+            else:
+                entries.append(info)
+    
+    if DELEGATE_TO_DAEMON and entries:
+        try:
+            # The daemon stops supervised instances without restarting them
+            response = daemon_request("stop", timeout=timeout + REQUEST_TIMEOUT,
+                                      pids=[info['pid'] for info in entries], grace=timeout)
+        except DaemonError as e:
+            console.print(f"[bold red]Error stopping processes: {str(e)}[/bold red]")
+            response = {'stopped': [], 'killed': [], 'failed': [info['pid'] for info in entries]}
         
-        return True
+        if response is not None:
+            for key in ('stopped', 'killed', 'failed'):
+                result[key].extend(response[key])
+            handled = set(response['stopped'] + response['killed'] + response['failed'])
+            entries = [info for info in entries if info['pid'] not in handled]
+    
+    local = _terminate_all(entries, timeout)
+    for key, values in local.items():
+        result[key].extend(values)
+    
+    # Remove from the registry in one transaction
+    unregister_processes(result['stopped'] + result['killed'] + result['not_running'])
+    
+    return result
+
+def stop_application(pid, timeout=STOP_TIMEOUT):
+    """
+    Stop a running application
     
+    Args:
+        pid (int or str): Process ID to stop
+        timeout (float): Seconds it gets to exit before it is killed
+        
+    Returns:
+        bool: True if successful
+    """
+    try:
+        pid = int(pid)
     except ValueError:
         console.print(f"[bold red]Invalid PID: {pid}[/bold red]")
         return False
+    
+    result = stop_applications([pid], timeout=timeout)
+    
+    if result['unknown']:
+        console.print(f"[bold yellow]PID {pid} is not a managed application[/bold yellow]")
+        return False
+    if result['not_running']:
+        console.print(f"[bold yellow]Process {pid} is no longer running[/bold yellow]")
+    
+    # Success message moved to command handler
+    return not result['failed']
 
-def get_process_status():
+def get_process_status(interval=DEFAULT_INTERVAL, sampler=None):
     """
     Get status of all running applications
     
+    Args:
+        interval (float): Seconds to measure CPU usage over for processes
+            that have not been sampled before
+        sampler (ProcessSampler, optional): Sampler keeping CPU baselines
+            between calls, defaults to the one shared in this process
+    
     Returns:
         list: List of process status dictionaries
     """
-    processes = load_processes()
-    status_list = []
+    from utils.daemon_client import request as daemon_request, DaemonError
     
-    for pid_str, info in processes.items():
-        pid = int(pid_str)
+    if DELEGATE_TO_DAEMON and sampler is None:
+        # The daemon keeps CPU baselines, so no need to measure over an interval
         try:
-            proc = psutil.Process(pid)
-            if proc.is_running():
-                status = {
-                    'pid': pid,
-                    'version': info['version'],
-                    'running': True,
-                    'start_time': datetime.fromtimestamp(info['start_time']).strftime("%Y-%m-%d %H:%M:%S"),
-                    'cpu_percent': proc.cpu_percent(interval=0.1),
-                    'memory_mb': proc.memory_info().rss / (1024 * 1024)
-                }
-            else:
-                status = {
-                    'pid': pid,
-                    'version': info['version'],
-                    'running': False,
-                    'start_time': datetime.fromtimestamp(info['start_time']).strftime("%Y-%m-%d %H:%M:%S"),
-                }
-            status_list.append(status)
-        except:
-            # Process no longer exists, will be cleaned up on next load_processes call
+            result = daemon_request("status")
+            if result is not None:
+                return result
+        except DaemonError:
             pass
     
+    entries = list_processes()
+    sampler = sampler or get_default_sampler()
+    samples = sampler.sample(entries, interval)
+    status_list = []
+    
+    for info in entries:
+        status = {
+            'pid': info['pid'],
+            'version': info['version'],
+            'running': info['pid'] in samples,
+            'start_time': datetime.fromtimestamp(info['start_time']).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        status.update(samples.get(info['pid'], {}))
+        status_list.append(status)
+    
     return status_list
 
+def get_log_file(pid):
+    """
+    Get the log file of a specific process
+    
+    Args:
+        pid (int or str): Process ID
+    
+    Returns:
+        tuple: (log file path, None) or (None, error message)
+    """
+    from utils.daemon_client import request as daemon_request, DaemonError
+    
+    if DELEGATE_TO_DAEMON:
+        try:
+            result = daemon_request("logs", pid=pid)
+            if result is not None:
+                return result['log_file'], result['error']
+        except DaemonError:
+            pass
+    
+    try:
+        info = get_process(pid)
+    except ValueError:
+        return None, f"Invalid PID: {pid}"
+    
+    if info is None:
+        return None, f"No logs found for PID {pid}"
+    
+    log_file = info.get('log_file')
+    if not log_file or not os.path.exists(log_file):
+        return None, f"Log file not found for PID {pid}"
+    
+    return log_file, None
+
 def get_logs(pid, tail=None):
     """
     Get logs for a specific process
@@ -224,24 +546,15 @@ def get_logs(pid, tail=None):
         str: Log content
     """
     try:
-        pid = str(pid)
-        processes = load_processes()
+        log_file, error = get_log_file(pid)
+        if error:
+            return error
         
-        if pid not in processes:
-            return f"No logs found for PID {pid}"
+        if tail:
+            # Only read the blocks at the end of the log
+            return tail_log(log_file, tail)
         
-        log_file = processes[pid].get('log_file')
-        if not log_file or not os.path.exists(log_file):
-            return f"Log file not found for PID {pid}"
-        
-        with open(log_file, 'r') as f:
-            if tail:
-                # Read the last 'tail' lines
-                lines = f.readlines()
-                return ''.join(lines[-tail:])
-            else:
-                # Read the entire file
-                return f.read()
+        return b"".join(iter_log_chunks(log_file)).decode('utf-8', errors='replace')
     
     except Exception as e:
-        return f"Error reading logs: {str(e)}" 
\ No newline at end of file
+        return f"Error reading logs: {str(e)}"
@@ -0,0 +1,113 @@
+import re
+import time
+import socket
+
+from utils.process import render_template, get_log_file
+from utils.registry import get_process, is_alive
+from utils.logtail import follow
+
+# Seconds an instance gets to become ready unless the manifest says otherwise
+DEFAULT_READY_TIMEOUT = 120
+
+# Seconds between TCP/HTTP probe attempts
+DEFAULT_PROBE_INTERVAL = 0.5
+
+PROBE_TYPES = ("tcp", "http", "log")
+
+def get_readiness_probe(manifest):
+    """
+    Get the readiness probe of a version
+
+    The manifest's 'readiness' section is one of:
+        {"type": "tcp", "host": "127.0.0.1", "port": "{port}"}
+        {"type": "http", "url": "http://127.0.0.1:{port}/health"}
+        {"type": "log", "pattern": "Started .* in [0-9.]+ seconds"}
+    each optionally with "timeout" and "interval" in seconds.
+
+    Args:
+        manifest (dict): Version manifest
+
+    Returns:
+        dict: Probe settings, or None if the version defines no probe
+
+    Raises:
+        ValueError: If the probe type is unknown
+    """
+    probe = manifest.get('readiness')
+    if not probe:
+        return None
+
+    probe_type = probe.get('type')
+    if probe_type not in PROBE_TYPES:
+        raise ValueError(f"Unknown readiness probe type: {probe_type}")
+
+    return dict(probe, timeout=float(probe.get('timeout', DEFAULT_READY_TIMEOUT)),
+                interval=float(probe.get('interval', DEFAULT_PROBE_INTERVAL)))
+
+def check_tcp(host, port, timeout):
+    """Check if a TCP connection can be opened"""
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def check_http(url, timeout):
+    """Check if a GET request succeeds with a non-error status"""
+    import requests
+
+    try:
+        return requests.get(url, timeout=timeout).status_code < 400
+    except requests.exceptions.RequestException:
+        return False
+
+def _process_running(pid):
+    info = get_process(pid)
+    return info is not None and is_alive(info)
+
+def wait_until_ready(probe, pid, variables=None, timeout=None):
+    """
+    Wait for an instance to pass its readiness probe
+
+    Args:
+        probe (dict): Probe settings from get_readiness_probe
+        pid (int): Process ID of the instance
+        variables (dict, optional): Placeholder values for the probe, e.g. {port}
+        timeout (float, optional): Seconds to wait, defaults to the probe's timeout
+
+    Returns:
+        tuple: (True, None) once ready, or (False, reason)
+    """
+    variables = variables or {}
+    deadline = time.monotonic() + (probe['timeout'] if timeout is None else timeout)
+
+    if probe['type'] == "log":
+        log_file, error = get_log_file(pid)
+        if error:
+            return False, error
+
+        pattern = re.compile(render_template(probe['pattern'], variables))
+
+        def should_stop():
+            return time.monotonic() >= deadline or not _process_running(pid)
+
+        for line in follow(log_file, from_start=True, should_stop=should_stop):
+            if pattern.search(line):
+                return True, None
+    else:
+        while time.monotonic() < deadline and _process_running(pid):
+            remaining = max(0.1, deadline - time.monotonic())
+            if probe['type'] == "tcp":
+                ready = check_tcp(render_template(str(probe.get('host', "127.0.0.1")), variables),
+                                  render_template(str(probe['port']), variables),
+                                  min(probe['interval'] * 2, remaining))
+            else:
+                ready = check_http(render_template(probe['url'], variables),
+                                   min(probe['interval'] * 4, remaining))
+            if ready:
+                return True, None
+            time.sleep(min(probe['interval'], max(0, deadline - time.monotonic())))
+
+    if not _process_running(pid):
+        return False, "exited before becoming ready"
+    return False, "not ready before the deadline"
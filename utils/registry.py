@@ -0,0 +1,299 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from rich.console import Console
+
+from utils.paths import get_fg_dir
+
+console = Console()
+
+# SQLite database holding the managed processes
+REGISTRY_FILE = os.path.join(get_fg_dir(), "registry.db")
+
+# JSON file used by earlier versions, imported once and then renamed
+LEGACY_PROCESSES_FILE = os.path.join(get_fg_dir(), "processes.json")
+
+# Seconds to wait for another writer to release the database
+BUSY_TIMEOUT = 30
+
+# Tolerance when comparing process creation times
+CREATE_TIME_TOLERANCE = 0.01
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version
+MIGRATIONS = [
+    """
+    CREATE TABLE processes (
+        pid INTEGER PRIMARY KEY,
+        version TEXT NOT NULL,
+        start_time REAL NOT NULL,
+        create_time REAL,
+        log_file TEXT
+    );
+    CREATE INDEX processes_version ON processes (version);
+    """,
+    """
+    CREATE TABLE exits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pid INTEGER NOT NULL,
+        version TEXT NOT NULL,
+        exit_code INTEGER,
+        start_time REAL NOT NULL,
+        end_time REAL NOT NULL,
+        restarted INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX exits_version ON exits (version, end_time);
+    """,
+    """
+    ALTER TABLE processes ADD COLUMN port INTEGER;
+    """,
+]
+
+_local = threading.local()
+
+def _migrate(conn):
+    """Bring the database schema up to date"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return
+
+    with transaction(conn):
+        # Re-read inside the write lock in case another process migrated
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS[version:]:
+            for statement in migration.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+
+def _import_legacy_file(conn):
+    """Import processes.json written by earlier versions of fg"""
+    if not os.path.exists(LEGACY_PROCESSES_FILE):
+        return
+
+    try:
+        with open(LEGACY_PROCESSES_FILE, 'r') as f:
+            processes = json.load(f)
+
+        with transaction(conn):
+            for pid_str, info in processes.items():
+                pid = int(pid_str)
+                conn.execute(
+                    "INSERT OR IGNORE INTO processes (pid, version, start_time, create_time, log_file) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (pid, info['version'], info['start_time'], get_create_time(pid), info.get('log_file'))
+                )
+
+        os.replace(LEGACY_PROCESSES_FILE, LEGACY_PROCESSES_FILE + ".migrated")
+    except Exception as e:
+        console.print(f"[yellow]Warning: Failed to import processes file: {str(e)}[/yellow]")
+
+def get_connection():
+    """
+    Get this thread's connection to the registry
+
+    The database runs in WAL mode so readers never block writers and several
+    fg processes can update it concurrently.
+
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        return conn
+
+    os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
+    conn = sqlite3.connect(REGISTRY_FILE, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    _migrate(conn)
+    _import_legacy_file(conn)
+
+    _local.conn = conn
+    return conn
+
+@contextmanager
+def transaction(conn=None):
+    """
+    Run a write transaction that takes the write lock up front
+
+    Args:
+        conn (sqlite3.Connection, optional): Connection, defaults to this thread's
+
+    Yields:
+        sqlite3.Connection: Connection inside the transaction
+    """
+    conn = conn or get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def get_create_time(pid):
+    """
+    Get the creation time of a process
+
+    Returns:
+        float: Creation time or None if the process does not exist
+    """
+    import psutil
+
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+def is_alive(info):
+    """
+    Check if a registered process is still the one we started
+
+    Comparing the creation time makes this safe against PID reuse with a
+    single lookup per process.
+
+    Args:
+        info (dict): Registry entry
+
+    Returns:
+        bool: True if the process is running
+    """
+    import psutil
+
+    try:
+        proc = psutil.Process(info['pid'])
+        if info.get('create_time') is None:
+            return proc.is_running()
+        return (abs(proc.create_time() - info['create_time']) < CREATE_TIME_TOLERANCE
+                and proc.status() != psutil.STATUS_ZOMBIE)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
+def register_process(pid, version, start_time, log_file, port=None):
+    """
+    Add a started process to the registry
+
+    Args:
+        pid (int): Process ID
+        version (str): Version the process runs
+        start_time (float): Start timestamp
+        log_file (str): Path of the process log file
+        port (int, optional): Port assigned to the instance
+    """
+    conn = get_connection()
+    with transaction(conn):
+        conn.execute(
+            "INSERT OR REPLACE INTO processes (pid, version, start_time, create_time, log_file, port) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (pid, version, start_time, get_create_time(pid), log_file, port)
+        )
+
+def unregister_processes(pids):
+    """
+    Remove processes from the registry in a single transaction
+
+    Args:
+        pids (iterable): Process IDs to remove
+    """
+    pids = [int(pid) for pid in pids]
+    if not pids:
+        return
+
+    conn = get_connection()
+    with transaction(conn):
+        conn.executemany("DELETE FROM processes WHERE pid = ?", [(pid,) for pid in pids])
+
+def get_process(pid):
+    """
+    Look up a process in the registry
+
+    Args:
+        pid (int or str): Process ID
+
+    Returns:
+        dict: Registry entry or None if not registered
+    """
+    row = get_connection().execute("SELECT * FROM processes WHERE pid = ?", (int(pid),)).fetchone()
+    return dict(row) if row else None
+
+def list_processes(version=None, validate=True):
+    """
+    List registered processes
+
+    Args:
+        version (str, optional): Only list processes of this version
+        validate (bool): Drop entries whose process is no longer running
+
+    Returns:
+        list: Registry entries ordered by start time
+    """
+    conn = get_connection()
+    if version is None:
+        rows = conn.execute("SELECT * FROM processes ORDER BY start_time").fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM processes WHERE version = ? ORDER BY start_time",
+                            (version,)).fetchall()
+
+    entries = [dict(row) for row in rows]
+    if not validate:
+        return entries
+
+    alive = []
+    stale = []
+    for entry in entries:
+        if is_alive(entry):
+            alive.append(entry)
+        else:
+            stale.append(entry)
+
+    if stale:
+        # Only delete the exact entries found dead, not a newer process
+        # registered under a reused PID in the meantime
+        with transaction(conn):
+            conn.executemany("DELETE FROM processes WHERE pid = ? AND create_time IS ?",
+                             [(entry['pid'], entry['create_time']) for entry in stale])
+
+    return alive
+
+def record_exit(pid, version, exit_code, start_time, end_time, restarted):
+    """
+    Record the exit of a supervised process
+
+    Args:
+        pid (int): Process ID
+        version (str): Version the process ran
+        exit_code (int): Exit code, negative for a terminating signal
+        start_time (float): Start timestamp
+        end_time (float): Exit timestamp
+        restarted (bool): Whether the supervisor restarted it
+    """
+    conn = get_connection()
+    with transaction(conn):
+        conn.execute(
+            "INSERT INTO exits (pid, version, exit_code, start_time, end_time, restarted) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (pid, version, exit_code, start_time, end_time, int(restarted))
+        )
+
+def list_exits(version=None, limit=50):
+    """
+    List recorded process exits, most recent first
+
+    Args:
+        version (str, optional): Only exits of this version
+        limit (int): Maximum number of entries
+
+    Returns:
+        list: Exit entries
+    """
+    conn = get_connection()
+    if version is None:
+        rows = conn.execute("SELECT * FROM exits ORDER BY end_time DESC LIMIT ?", (limit,)).fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM exits WHERE version = ? ORDER BY end_time DESC LIMIT ?",
+                            (version, limit)).fetchall()
+    return [dict(row) for row in rows]
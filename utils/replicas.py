@@ -0,0 +1,119 @@
+import json
+import time
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.installer import get_manifest_path
+from utils.process import start_application
+from utils.readiness import get_readiness_probe, wait_until_ready
+from utils.registry import list_processes
+
+# Replicas launched at the same time
+MAX_LAUNCH_WORKERS = 32
+
+# Ports tried past the base port when looking for free ones
+PORT_SEARCH_LIMIT = 1000
+
+def load_manifest(version):
+    """Load the manifest of an installed version"""
+    with open(get_manifest_path(version), 'r') as f:
+        return json.load(f)
+
+def _port_free(port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        # Like the servers themselves, ignore connections lingering in TIME_WAIT
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("0.0.0.0", port))
+            return True
+        except OSError:
+            return False
+
+def _ephemeral_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("0.0.0.0", 0))
+        return sock.getsockname()[1]
+
+def allocate_replicas(manifest, count):
+    """
+    Pick the replica slots for new instances
+
+    With a 'basePort' in the manifest's 'replicas' section, slot n listens on
+    basePort + n. Slots whose port is assigned to a registered instance (it
+    may not have bound it yet) or is in use are skipped. Without a base
+    port, each replica gets a free port from the OS.
+
+    Args:
+        manifest (dict): Version manifest
+        count (int): Number of replicas
+
+    Returns:
+        list: (slot, port) tuples
+
+    Raises:
+        RuntimeError: If not enough free ports were found
+    """
+    base_port = manifest.get('replicas', {}).get('basePort')
+    if base_port is None:
+        return [(slot, _ephemeral_port()) for slot in range(count)]
+
+    base_port = int(base_port)
+    assigned = {entry['port'] for entry in list_processes() if entry.get('port')}
+    slots = []
+    for slot in range(PORT_SEARCH_LIMIT):
+        if len(slots) == count:
+            break
+        if base_port + slot not in assigned and _port_free(base_port + slot):
+            slots.append((slot, base_port + slot))
+
+    if len(slots) < count:
+        raise RuntimeError(f"Only {len(slots)} free ports found from {base_port}")
+    return slots
+
+def start_replicas(version, count, wait=True, timeout=None, on_result=None):
+    """
+    Start replicas of a version concurrently and wait for them to become ready
+
+    Each replica's run command and 'replicas.env' entries are rendered with
+    {replica}, {port} and {version}.
+
+    Args:
+        version (str): Version to start
+        count (int): Number of replicas
+        wait (bool): Wait for the manifest's readiness probe
+        timeout (float, optional): Overrides the probe's timeout
+        on_result (callable, optional): Called with each result as it completes
+
+    Returns:
+        list: Result dicts with 'replica', 'port', 'pid', 'ready', 'seconds'
+            and 'error' keys, ordered by replica
+    """
+    manifest = load_manifest(version)
+    probe = get_readiness_probe(manifest) if wait else None
+    slots = allocate_replicas(manifest, count)
+
+    def launch(slot, port):
+        variables = {'replica': slot, 'port': port, 'version': version}
+        started = time.monotonic()
+        result = {'replica': slot, 'port': port, 'pid': None, 'ready': False,
+                  'seconds': None, 'error': None}
+
+        pid = start_application(version, variables)
+        if pid is None:
+            result['error'] = "failed to start"
+        else:
+            result['pid'] = pid
+            if probe is None:
+                result['ready'] = True
+            else:
+                result['ready'], result['error'] = wait_until_ready(probe, pid, variables, timeout)
+            if result['ready']:
+                result['seconds'] = time.monotonic() - started
+
+        if on_result:
+            on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=min(count, MAX_LAUNCH_WORKERS)) as executor:
+        futures = [executor.submit(launch, slot, port) for slot, port in slots]
+        return [future.result() for future in futures]
@@ -0,0 +1,108 @@
+from collections import Counter
+
+from rich.console import Console
+
+from utils.registry import list_processes
+from utils.process import stop_applications
+from utils.replicas import start_replicas
+
+console = Console()
+
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_MAX_SURGE = 1
+
+def _rollback(started, stopped):
+    """
+    Undo a rollout: stop the new instances and bring back the stopped ones
+
+    Args:
+        started (list): PIDs of new instances
+        stopped (list): Registry entries of old instances that were stopped
+    """
+    console.print("Rolling back...", style="bold yellow")
+    if started:
+        stop_applications(started)
+
+    for version, count in Counter(entry['version'] for entry in stopped).items():
+        results = start_replicas(version, count)
+        ready = sum(1 for result in results if result['ready'])
+        style = "green" if ready == count else "bold red"
+        console.print(f"Restored {ready} of {count} instance(s) of {version}", style=style)
+
+def rolling_update(version, from_version=None, batch_size=DEFAULT_BATCH_SIZE,
+                   max_surge=DEFAULT_MAX_SURGE, timeout=None):
+    """
+    Replace running instances with instances of another version, batch by batch
+
+    Each batch starts its new instances and waits for their readiness probe
+    before old instances are stopped, so capacity never drops by more than
+    batch_size - max_surge. If a batch doesn't become ready in time, all new
+    instances are stopped and the stopped old ones are started again.
+
+    Args:
+        version (str): Version to roll out, must be installed
+        from_version (str, optional): Only replace instances of this version,
+            defaults to all instances of other versions
+        batch_size (int): Instances replaced per batch
+        max_surge (int): Extra instances allowed above the original count
+        timeout (float, optional): Seconds each batch gets to become ready,
+            defaults to the readiness probe's timeout
+
+    Returns:
+        bool: True if every instance was replaced
+    """
+    old = [
+        entry for entry in list_processes(from_version)
+        if entry['version'] != version
+    ]
+    if not old:
+        console.print("No running instances to replace", style="yellow")
+        return True
+
+    console.print(f"Replacing {len(old)} instance(s) with version {version} "
+                  f"(batch size {batch_size}, max surge {max_surge})", style="cyan")
+
+    started = []
+    stopped = []
+    remaining = list(old)
+    batch_number = 0
+
+    while remaining:
+        batch_number += 1
+        batch = remaining[:batch_size]
+        remaining = remaining[batch_size:]
+
+        # Without enough surge, some old instances have to go before the new ones start
+        surge = min(len(batch), max_surge)
+        stop_first, stop_after = batch[:len(batch) - surge], batch[len(batch) - surge:]
+
+        if stop_first:
+            stop_applications([entry['pid'] for entry in stop_first])
+            stopped.extend(stop_first)
+
+        console.print(f"Batch {batch_number}: starting {len(batch)} instance(s) of {version}", style="cyan")
+        try:
+            results = start_replicas(version, len(batch), timeout=timeout)
+        except (RuntimeError, ValueError) as e:
+            console.print(f"[bold red]Error starting version {version}: {str(e)}[/bold red]")
+            _rollback(started, stopped)
+            return False
+        started.extend(result['pid'] for result in results if result['pid'])
+
+        failed = [result for result in results if not result['ready']]
+        if failed:
+            for result in failed:
+                console.print(f"[bold red]Replica {result['replica']} (PID: {result['pid']}): "
+                              f"{result['error']}[/bold red]")
+            _rollback(started, stopped)
+            return False
+
+        for result in results:
+            console.print(f"  PID {result['pid']} ready in {result['seconds']:.2f}s", style="green")
+
+        if stop_after:
+            stop_applications([entry['pid'] for entry in stop_after])
+            stopped.extend(stop_after)
+
+    console.print(f"All {len(old)} instance(s) now run version {version}", style="bold green")
+    return True
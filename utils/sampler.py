@@ -0,0 +1,113 @@
+import time
+import threading
+
+# Default time to measure CPU usage over when processes are first seen
+DEFAULT_INTERVAL = 0.1
+
+class ProcessSampler:
+    """
+    Sample resource usage of many processes at once
+
+    psutil computes CPU usage from the delta since the previous call on the
+    same Process object, so the sampler keeps those objects between calls.
+    Processes it has not seen before are primed together and measured after a
+    single sleep, instead of sleeping once per process. Later calls reuse the
+    previous sample as the baseline and do not sleep at all.
+    """
+
+    def __init__(self):
+        self._procs = {}
+        self._lock = threading.Lock()
+
+    def _get_process(self, entry):
+        """Get the cached psutil.Process for a registry entry"""
+        import psutil
+
+        key = (entry['pid'], entry.get('create_time'))
+        proc = self._procs.get(key)
+        if proc is None:
+            proc = psutil.Process(entry['pid'])
+            self._procs[key] = proc
+        return key, proc
+
+    def _snapshot(self, proc):
+        """Collect everything we report about a process in one pass"""
+        import psutil
+
+        with proc.oneshot():
+            memory = proc.memory_info()
+            snapshot = {
+                'cpu_percent': proc.cpu_percent(None),
+                'memory_mb': memory.rss / (1024 * 1024),
+                'rss': memory.rss,
+                'threads': proc.num_threads(),
+                'status': proc.status()
+            }
+
+            try:
+                snapshot['open_fds'] = proc.num_fds() if hasattr(proc, 'num_fds') else proc.num_handles()
+            except (psutil.AccessDenied, NotImplementedError):
+                snapshot['open_fds'] = None
+
+            try:
+                io = proc.io_counters()
+                snapshot['io_read_bytes'] = io.read_bytes
+                snapshot['io_write_bytes'] = io.write_bytes
+            except (psutil.AccessDenied, NotImplementedError, AttributeError):
+                snapshot['io_read_bytes'] = None
+                snapshot['io_write_bytes'] = None
+
+        return snapshot
+
+    def sample(self, entries, interval=DEFAULT_INTERVAL):
+        """
+        Sample a set of processes
+
+        Args:
+            entries (list): Registry entries with 'pid' and 'create_time'
+            interval (float): Seconds to measure CPU usage over for processes
+                without a previous sample
+
+        Returns:
+            dict: Snapshot dictionaries keyed by PID, missing for processes
+                that are gone
+        """
+        import psutil
+
+        with self._lock:
+            procs = {}
+            primed = False
+            for entry in entries:
+                try:
+                    known = (entry['pid'], entry.get('create_time')) in self._procs
+                    key, proc = self._get_process(entry)
+                    if not known:
+                        proc.cpu_percent(None)
+                        primed = True
+                    procs[key] = proc
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+
+            # Forget processes that are no longer requested
+            self._procs = procs
+
+            if primed and interval:
+                time.sleep(interval)
+
+            samples = {}
+            for (pid, _), proc in procs.items():
+                try:
+                    samples[pid] = self._snapshot(proc)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+
+            return samples
+
+_default_sampler = None
+
+def get_default_sampler():
+    """Returns the sampler shared by callers in this process"""
+    global _default_sampler
+    if _default_sampler is None:
+        _default_sampler = ProcessSampler()
+    return _default_sampler
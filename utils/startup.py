@@ -0,0 +1,89 @@
+import sys
+import time
+import builtins
+import importlib.util
+
+# This module is imported before anything else when profiling startup,
+# so it must only depend on the standard library modules above.
+
+class ImportProfiler:
+    """
+    Measure where interpreter startup time goes
+
+    Wraps ``builtins.__import__`` and attributes the exclusive time spent
+    loading modules to their top-level package.
+    """
+
+    def __init__(self):
+        self.started = None
+        self.package_times = {}
+        self.phases = []
+        self._original_import = None
+        self._stack = []
+
+    def start(self):
+        """Start recording imports"""
+        self.started = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def stop(self):
+        """Stop recording imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def add_phase(self, name, seconds):
+        """Record the duration of a named startup phase"""
+        self.phases.append((name, seconds))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        package = globals.get('__package__') if globals else None
+        try:
+            full_name = importlib.util.resolve_name('.' * level + name, package) if level else name
+        except (ImportError, ValueError):
+            full_name = name
+
+        if full_name in sys.modules and not fromlist:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+
+            top_level = full_name.split('.')[0]
+            self.package_times[top_level] = self.package_times.get(top_level, 0.0) + elapsed - children
+
+    def report(self, limit=15):
+        """
+        Print the import-time breakdown to stderr
+
+        Args:
+            limit (int): Maximum number of packages to list
+        """
+        self.stop()
+        total = time.perf_counter() - self.started
+        import_total = sum(self.package_times.values())
+
+        lines = ["", "Startup profile", "---------------"]
+        lines.append(f"{'Package':<24}{'Import (ms)':>12}")
+        ranked = sorted(self.package_times.items(), key=lambda item: item[1], reverse=True)
+        for package, seconds in ranked[:limit]:
+            lines.append(f"{package:<24}{seconds * 1000:>12.1f}")
+        if len(ranked) > limit:
+            rest = sum(seconds for _, seconds in ranked[limit:])
+            lines.append(f"{f'({len(ranked) - limit} others)':<24}{rest * 1000:>12.1f}")
+
+        lines.append("")
+        for name, seconds in self.phases:
+            lines.append(f"{name:<36}{seconds * 1000:>10.1f} ms")
+        lines.append(f"{'Total import time':<36}{import_total * 1000:>10.1f} ms")
+        lines.append(f"{'Total time (including command)':<36}{total * 1000:>10.1f} ms")
+
+        print("\n".join(lines), file=sys.stderr)